@@ -1,10 +1,20 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
+import glob
+import os
 import time
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+from contextlib import nullcontext
+from dataclasses import replace
+
+from screener import DEFAULT_PARAMS
+from screener.alerts import AlertEngine, FileSink, WebhookSink, load_rules
+from screener.history import InstrumentHistory
+from screener.live import LiveSession
+from screener.pipeline import LivePipeline, ReplaySource
+from screener.profiling import RunProfile, stage
+from screener.ranking import TopKRanker
+from screener.store import SnapshotStore
+from screener.ui import render_diagnostics, render_rankings, render_table
 
 # ---------- App setup ----------
 st.set_page_config(page_title="Ketan Verma- Options Strategy Screener", layout="wide")
@@ -12,203 +22,125 @@ st.markdown("<h1 style='text-align:center;'>Options Strategy Screener</h1>", uns
 st.markdown("<h4 style='text-align:center;'>by Ketan</h4>", unsafe_allow_html=True)
 st.markdown('<div style="text-align:center;"><a href="https://web.sensibull.com/options-screener?view=table" target="_blank">Sensibull Options Screener</a></div>', unsafe_allow_html=True)
 
-# ---------- Utility helpers ----------
-NUM_COLS = [
-    'FuturePrice','MaxPain','PCR','FuturePercentChange','ATMIV',
-    'ATMIVChange','IVPercentile','VolumeMultiple','FutureOIPercentChange'
-]
-
-def to_num(df: pd.DataFrame) -> pd.DataFrame:
-    for c in NUM_COLS:
-        if c in df.columns:
-            df[c] = pd.to_numeric(df[c], errors='coerce')
-    return df
-
-def safe_rr(potential: float, risk_pts: float) -> float:
-    risk_pts = abs(risk_pts)
-    if risk_pts <= 0 or np.isnan(risk_pts):
-        return 0.0
-    return round(potential / risk_pts, 2)
-
-def directional_levels(fut: float, maxpain: float):
-    dist = abs(maxpain - fut)
-    if not np.isfinite(dist) or dist < 1e-6:
-        dist = max(1.0, fut * 0.005)
-    long_sl  = fut - 0.5 * dist
-    short_sl = fut + 0.5 * dist
-    tgt      = maxpain
-    potential = abs(maxpain - fut)
-    return tgt, long_sl, short_sl, potential
-
-def neutral_range(fut: float, maxpain: float, ivp: float):
-    base = max(1.0, fut * 0.004)
-    widen = 1.0 + (ivp/100.0)
-    half_width = base * widen
-    return fut - half_width, fut + half_width, half_width
-
-def bucket_iv(ivr: float, iv: float):
-    if np.isfinite(ivr):
-        if ivr >= 70: return "HIGH"
-        if ivr <= 30: return "LOW"
-        return "MEDIUM"
+# ---------- Background pipeline ----------
+@st.cache_resource
+def get_live_session():
+    # one logged-in browser per server process, shared by reruns and sessions
+    return LiveSession(profile_dir=os.environ.get("SENSIBULL_PROFILE_DIR"))
+
+@st.cache_resource
+def get_snapshot_store():
+    # one Parquet history per server process; finished days are compacted on startup
+    try:
+        store = SnapshotStore()
+        store.compact_closed_days()
+        return store
+    except ImportError:
+        return None      # pyarrow not installed: screen without keeping history
+
+@st.cache_resource
+def get_alert_engine():
+    # SCREENER_ALERTS=<rules.json> turns on watchlist alerts, appended to SCREENER_ALERTS_LOG
+    # and POSTed to SCREENER_ALERTS_WEBHOOK when set
+    rules = os.environ.get("SCREENER_ALERTS")
+    if not rules:
+        return None
+    sinks = [FileSink(os.environ.get("SCREENER_ALERTS_LOG", "alerts.jsonl"))]
+    if os.environ.get("SCREENER_ALERTS_WEBHOOK"):
+        sinks.append(WebhookSink(os.environ["SCREENER_ALERTS_WEBHOOK"]))
+    return AlertEngine(load_rules(rules), sinks=sinks)
+
+@st.cache_resource
+def get_pipeline():
+    # one fetch -> parse -> screen -> publish loop per server process; every session
+    # only reads its latest result. SENSIBULL_REPLAY=<dir> replays saved tables instead.
+    replay = os.environ.get("SENSIBULL_REPLAY")
+    if replay:
+        source = ReplaySource(sorted(glob.glob(os.path.join(replay, '*.html'))
+                                     + glob.glob(os.path.join(replay, '*.csv'))))
     else:
-        if iv >= 30: return "HIGH"
-        if iv <= 15: return "LOW"
-        return "MEDIUM"
-
-def bias_from_pcr_maxpain(pcr: float, fut: float, maxpain: float):
-    if np.isfinite(pcr) and np.isfinite(fut) and np.isfinite(maxpain):
-        if pcr < 0.6 and maxpain > fut: return "BULLISH"
-        if pcr > 0.8 and maxpain < fut: return "BEARISH"
-    if maxpain > fut: return "BULLISH"
-    if maxpain < fut: return "BEARISH"
-    return "NEUTRAL"
-
-def add_strategy(rows, instrument, cat, name, entry, exit_price, sl, potential, rr, details, comments):
-    rows.append({
-        "Instrument": instrument,
-        "Category": cat,
-        "Strategy": name,
-        "Entry": round(entry, 2),
-        "Exit": round(exit_price, 2),
-        "StopLoss": round(sl, 2) if np.isfinite(sl) else 0.0,
-        "RiskReward": round(rr, 2),
-        "PotentialPoints": round(potential, 2),
-        "TradeDetails": details,
-        "Comments": comments
-    })
-
-def generate_strategies(row):
-    i = row['Instrument']
-    fut = row['FuturePrice']
-    maxpain = row['MaxPain']
-    pcr = row['PCR']
-    iv = row['ATMIV']
-    ivp = row['IVPercentile']
-
-    rows = []
-    if not np.isfinite(fut) or not np.isfinite(maxpain):
-        return rows
-
-    iv_regime = bucket_iv(ivp, iv)
-    bias = bias_from_pcr_maxpain(pcr, fut, maxpain)
-    tgt, long_sl, short_sl, potential = directional_levels(fut, maxpain)
-    n_lo, n_hi, half_w = neutral_range(fut, maxpain, ivp if np.isfinite(ivp) else 50.0)
-
-    if iv_regime in ("LOW", "MEDIUM"):
-        if bias == "BULLISH":
-            add_strategy(rows, i, "CALL", "Bull Call Spread", fut, tgt, long_sl,
-                         potential*0.6, safe_rr(potential*0.6, 0.5*abs(fut-long_sl)),
-                         f"Buy ATM CE ~{fut:.0f}, Sell OTM CE ~{tgt:.0f}",
-                         "Low IV + bullish bias → debit spread.")
-        elif bias == "BEARISH":
-            add_strategy(rows, i, "PUT", "Bear Put Spread", fut, tgt, short_sl,
-                         potential*0.6, safe_rr(potential*0.6, 0.5*abs(short_sl-fut)),
-                         f"Buy ATM PE ~{fut:.0f}, Sell OTM PE ~{tgt:.0f}",
-                         "Low IV + bearish bias → debit spread.")
-        else:
-            add_strategy(rows, i, "LONGVOL", "Long Straddle", fut, tgt, np.nan,
-                         max(potential, fut*0.005),
-                         safe_rr(potential, 0.5*potential),
-                         "Buy ATM CE + ATM PE",
-                         "Low IV + neutral bias → buy vol for breakout.")
-    elif iv_regime == "HIGH":
-        if bias == "BULLISH":
-            add_strategy(rows, i, "PUT", "Bull Put Spread (Credit)", fut, n_hi, n_lo,
-                         potential*0.4, safe_rr(potential*0.4, half_w),
-                         f"Sell OTM PE ~{n_lo:.0f}, Buy lower PE",
-                         "High IV + bullish bias → sell puts for premium.")
-        elif bias == "BEARISH":
-            add_strategy(rows, i, "CALL", "Bear Call Spread (Credit)", fut, n_lo, n_hi,
-                         potential*0.4, safe_rr(potential*0.4, half_w),
-                         f"Sell OTM CE ~{n_hi:.0f}, Buy higher CE",
-                         "High IV + bearish bias → sell calls for premium.")
+        source = get_live_session()
+    store = get_snapshot_store()
+    # tick history seeded from today's stored snapshots after a restart
+    history = InstrumentHistory()
+    if store is not None:
+        history.replay(store.read(start=pd.Timestamp.now().normalize(),
+                                  columns=['Instrument', 'FuturePrice', 'MaxPain', 'PCR', 'ATMIV']))
+    alerts = get_alert_engine()
+    # SCREENER_INTERVAL / SCREENER_DAYS_TO_EXPIRY set the server's starting settings
+    p = replace(DEFAULT_PARAMS, days_to_expiry=float(os.environ.get("SCREENER_DAYS_TO_EXPIRY", 0)))
+    return LivePipeline(source, interval=float(os.environ.get("SCREENER_INTERVAL", 30)), p=p,
+                        history=history, store=store, ranker=TopKRanker(k=10),
+                        on_publish=[alerts] if alerts is not None else None)
+
+# ---------- Controls ----------
+pipe = get_pipeline()
+col_run, col_fetch, col_refresh = st.columns([1, 1, 1])
+if pipe.running:
+    if col_run.button("Stop live updates"):
+        pipe.stop()
+elif col_run.button("Start live updates"):
+    pipe.start()
+if col_fetch.button("Fetch now"):
+    pipe.start()
+    pipe.fetch_now()
+auto_refresh = col_refresh.checkbox("Auto-refresh view", value=True)
+
+# The pipeline is shared by every session: settings start from its current values and
+# only change it when someone applies them, not on each (auto-)rerun.
+with st.sidebar.form("pipeline_settings"):
+    st.caption("Pipeline settings (shared by all viewers)")
+    interval = st.number_input("Fetch every (seconds)", min_value=5, value=int(pipe.interval), step=5)
+    days_to_expiry = st.number_input("Days to expiry (0 = proxies)", min_value=0.0,
+                                     value=float(pipe.params.days_to_expiry), step=1.0)
+    if st.form_submit_button("Apply"):
+        pipe.interval = interval
+        pipe.set_params(replace(pipe.params, days_to_expiry=days_to_expiry))
+diagnostics = st.sidebar.checkbox("Diagnostics (stage timings)")
+if diagnostics and st.sidebar.button("cProfile next snapshot"):
+    pipe.profile_next()
+
+if pipe.store is None:
+    st.caption("Snapshot history disabled (pyarrow not installed).")
+
+# ---------- Latest result ----------
+prof = RunProfile('view') if diagnostics else None
+with prof.activate() if prof else nullcontext():
+    result = pipe.latest
+    if result is None:
+        if pipe.running:
+            st.info("Waiting for the first table... log in manually in the browser window if it opens.")
         else:
-            add_strategy(rows, i, "NEUTRAL", "Iron Condor", fut, fut, fut,
-                         potential*0.3, safe_rr(potential*0.3, half_w),
-                         "Sell OTM CE & PE, hedge with wings",
-                         "High IV + near MaxPain → condor best.")
-    return rows
-
-def highlight_row(row):
-    cat = row.get('Category', '')
-    if cat == 'CALL':
-        return ['background-color: #b6fcd5'] * len(row)
-    if cat == 'PUT':
-        return ['background-color: #ffb3b3'] * len(row)
-    if cat == 'NEUTRAL':
-        return ['background-color: #c9d7ff'] * len(row)
-    if cat == 'LONGVOL':
-        return ['background-color: #f7e7a9'] * len(row)
-    if cat == 'SHORTVOL':
-        return ['background-color: #e6d4ff'] * len(row)
-    return [''] * len(row)
-
-# ---------- Fetch live table ----------
-def fetch_live_sensibull_table():
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-
-    driver = webdriver.Chrome(ChromeDriverManager().install(), options=chrome_options)
-    driver.get("https://web.sensibull.com/options-screener?view=table")
-
-    st.info("Please log in manually in the browser window that opens...")
-    time.sleep(30)  # give time to login manually
-    time.sleep(10)  # wait for table to load fully
-
-    tables = pd.read_html(driver.page_source)
-    driver.quit()
-    return tables[0]
-
-# ---------- Main Run ----------
-if st.button("Fetch Live Options Data"):
-    try:
-        raw = fetch_live_sensibull_table()
-        st.success("Data fetched successfully!")
-        df = to_num(raw.copy())
-
-        # Generate all strategies
-        all_rows = []
-        for _, r in df.iterrows():
-            all_rows.extend(generate_strategies(r))
-        out = pd.DataFrame(all_rows)
-
-        if out.empty:
-            st.warning("No strategies generated. Please check the data.")
-            st.stop()
-
-        keep_cols = ['Instrument','FuturePrice','MaxPain','PCR','FuturePercentChange',
-                     'ATMIV','ATMIVChange','IVPercentile','Event','VolumeMultiple','FutureOIPercentChange']
-        ref = df[keep_cols].drop_duplicates(subset=['Instrument'])
-        out = out.merge(ref, on='Instrument', how='left')
-
-        columns_order = [
-            'Instrument','Category','Strategy','TradeDetails','Comments',
-            'Entry','Exit','StopLoss','RiskReward','PotentialPoints',
-            'FuturePrice','MaxPain','PCR','FuturePercentChange',
-            'ATMIV','ATMIVChange','IVPercentile','Event','VolumeMultiple','FutureOIPercentChange'
-        ]
-        out = out[columns_order]
-
-        df_top = out[out['Instrument'].isin(['NIFTY','BANKNIFTY'])].copy()
-        df_rest = out[~out['Instrument'].isin(['NIFTY','BANKNIFTY'])].copy()
-        df_top10 = df_rest.dropna(subset=['PotentialPoints']).sort_values('PotentialPoints', ascending=False).head(10)
-        df_all = df_rest.sort_values(['Instrument','Category','Strategy'])
+            st.info("Press Start live updates (or Fetch now) to begin.")
+    elif result.out.empty:
+        st.warning("No strategies generated. Please check the data.")
+    else:
+        stats = result.stats
+        latency = " · ".join(f"{k} {v * 1000:.0f} ms" for k, v in result.latency.items())
+        st.caption(f"Snapshot #{result.version} at {result.time:%H:%M:%S} · {latency}")
+        st.caption(f"Recomputed {stats['recomputed']} of {stats['instruments']} instruments "
+                   f"({stats['added']} added, {stats['removed']} removed).")
 
         st.markdown("### NIFTY & BANKNIFTY")
-        st.dataframe(df_top.style.apply(highlight_row, axis=1))
+        render_table(result.df_top, key="top")
 
         st.markdown("### Top 10 Trades (by Potential Points)")
-        st.dataframe(df_top10.style.apply(highlight_row, axis=1))
+        render_table(result.df_top10, key="top10")
 
         st.markdown("### All Trades (every strategy for every symbol)")
-        st.dataframe(df_all.style.apply(highlight_row, axis=1))
+        render_table(result.df_all, key="all")
 
+        st.markdown("### Top Ranked (composite of RR, potential, IV regime fit, PCR extremity)")
+        render_rankings(result.ranked, key="ranked")
+
+        # the export is rebuilt once per published snapshot, not on every refresh
+        if st.session_state.get('csv_version') != result.version:
+            with stage('csv_export', rows=len(result.out)):
+                st.session_state['csv'] = result.out.to_csv(index=False).encode('utf-8')
+            st.session_state['csv_version'] = result.version
         st.download_button(
             "Download full results (CSV)",
-            data=out.to_csv(index=False).encode('utf-8'),
+            data=st.session_state['csv'],
             file_name="options_strategy_screener_results.csv",
             mime="text/csv"
         )
@@ -216,11 +148,35 @@ if st.button("Fetch Live Options Data"):
         with st.expander("Notes / Assumptions"):
             st.write("""
 - Heuristics only: PotentialPoints uses distance to MaxPain and IV bands.
+- With Days to expiry set, legs are priced with Black-76 at ATM IV and PotentialPoints/RiskReward use real max profit/loss.
 - IV logic: IVP ≤ 30 → debit; IVP ≥ 70 → credit.
 - Risk/Reward uses fraction of distance to MaxPain or neutral half-width.
 - Neutral setups prefer instruments near MaxPain.
+- Top Ranked keeps each instrument-expiry separate; boards are per category and per index group.
 - Credit strategies need active management.
 """)
 
-    except Exception as e:
-        st.error(f"Error fetching or processing data: {e}")
+if diagnostics:
+    with st.expander("Diagnostics", expanded=True):
+        latest = pipe.latest
+        if latest is not None and latest.cprofile:
+            st.session_state['cprofile'] = latest.cprofile    # keep it past the next snapshot
+        render_diagnostics({"Background snapshot": latest.profile if latest else None,
+                            "This view": prof},
+                           st.session_state.get('cprofile'))
+
+alerts = get_alert_engine()
+if alerts is not None:
+    with st.expander(f"Alerts ({len(alerts.rules)} rules)"):
+        if alerts.recent.empty:
+            st.write("No alerts yet.")
+        else:
+            st.dataframe(alerts.recent.iloc[::-1])
+
+with st.expander("Pipeline status"):
+    st.dataframe(pipe.metrics())
+
+# Re-read the shared result periodically; fetching and screening happen in the background
+if auto_refresh and pipe.running:
+    time.sleep(2)
+    st.rerun()
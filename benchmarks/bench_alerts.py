@@ -0,0 +1,80 @@
+"""Benchmark alert evaluation per snapshot as the number of watchlist rules grows.
+
+    python benchmarks/bench_alerts.py                       # 2000 rows, 10..1000 rules
+    python benchmarks/bench_alerts.py --rows 5000 --rules 10 100 500 2000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from screener.alerts import AlertEngine
+from screener.core import screen, to_num
+from synthetic import synthetic_frame
+
+STRATEGIES = ["Bull Call Spread", "Bear Put Spread", "Long Straddle", "Iron Condor"]
+
+def random_rules(n: int, instruments, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    rules = []
+    for i in range(n):
+        conds = []
+        for _ in range(rng.integers(1, 4)):
+            kind = rng.integers(0, 5)
+            if kind == 0:
+                conds.append(f"IVPercentile {rng.choice(['>=', '<='])} {rng.integers(10, 90)}")
+            elif kind == 1:
+                conds.append(f"Bias == {rng.choice(['BULLISH', 'BEARISH', 'NEUTRAL'])}")
+            elif kind == 2:
+                conds.append(f"Strategy in {', '.join(rng.choice(STRATEGIES, 2, replace=False))}")
+            elif kind == 3:
+                conds.append(f"IVPercentile crosses_above {rng.integers(20, 80)}")
+            else:
+                conds.append(f"PCR > {rng.uniform(0.6, 1.4):.2f}")
+        rule = {"name": f"rule{i}", "all": conds}
+        if rng.random() < 0.3:
+            rule["instruments"] = list(rng.choice(instruments, 3, replace=False))
+        rules.append(rule)
+    return rules
+
+def snapshots(n_rows: int, count: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    base = to_num(synthetic_frame(n_rows, seed=seed))
+    out = []
+    for _ in range(count):
+        df = base.copy()
+        df['IVPercentile'] = (df['IVPercentile'] + rng.normal(0, 8, len(df))).clip(0, 100)
+        df['PCR'] = df['PCR'] * rng.uniform(0.9, 1.1, len(df))
+        out.append(screen(df))
+    return out
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument('--rows', type=int, default=2000)
+    p.add_argument('--rules', type=int, nargs='+', default=[10, 100, 500, 1000])
+    p.add_argument('--snapshots', type=int, default=6)
+    args = p.parse_args(argv)
+
+    snaps = snapshots(args.rows, args.snapshots)
+    instruments = snaps[0]['Instrument'].astype(str).unique()
+    print(f"{len(snaps[0])} strategy rows per snapshot")
+    for n in args.rules:
+        t0 = time.perf_counter()
+        engine = AlertEngine(random_rules(n, instruments))
+        compile_s = time.perf_counter() - t0
+        engine.evaluate(snaps[0])
+        times, fired = [], 0
+        for out in snaps[1:]:
+            t0 = time.perf_counter()
+            fired += len(engine.evaluate(out))
+            times.append(time.perf_counter() - t0)
+        print(f"{n:6d} rules ({engine.n_atoms:4d} distinct conditions): compile {compile_s * 1e3:7.1f} ms   "
+              f"evaluate {min(times) * 1e3:7.1f} ms/snapshot   {fired} alerts")
+
+if __name__ == '__main__':
+    main()
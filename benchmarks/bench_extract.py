@@ -0,0 +1,70 @@
+"""Benchmark screener-table extraction: pd.read_html(page)[0] + to_num vs extract_table.
+
+    python benchmarks/bench_extract.py                     # synthetic page, 250 and 5000 rows
+    python benchmarks/bench_extract.py saved_page.html ...  # saved driver.page_source fixtures
+"""
+import os
+import sys
+import time
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from screener.core import to_num
+from screener.extract import extract_table
+
+HEADERS = ['Instrument', 'Future Price', 'Future % Change', 'Max Pain', 'PCR', 'ATM IV',
+           'ATM IV Change', 'IV Percentile', 'Event', 'Volume Multiple', 'Future OI % Change']
+
+def synthetic_page(n_rows: int, seed: int = 0) -> str:
+    """A page shaped like the Sensibull screener: nav chrome, the table, and a footer table."""
+    rng = np.random.default_rng(seed)
+    fut = rng.uniform(50, 50000, n_rows)
+    body = []
+    for i in range(n_rows):
+        cells = [f'<a href="#">SYM{i}</a>', f'{fut[i]:,.2f}', f'{rng.normal(0, 2):+.2f}%',
+                 '-' if rng.random() < 0.1 else f'{fut[i] * rng.uniform(0.95, 1.05):,.0f}',
+                 '-' if rng.random() < 0.05 else f'{rng.uniform(0.3, 1.6):.2f}',
+                 f'{rng.uniform(8, 60):.1f}', f'{rng.normal(0, 1):+.1f}',
+                 '-' if rng.random() < 0.3 else f'{rng.integers(0, 101)}',
+                 'Results' if rng.random() < 0.05 else '', f'{rng.uniform(0.2, 5):.2f}x',
+                 f'{rng.normal(0, 5):+.1f}%']
+        body.append('<tr>' + ''.join(f'<td><span>{c}</span></td>' for c in cells) + '</tr>')
+    head = '<thead><tr>' + ''.join(f'<th><div>{h}</div></th>' for h in HEADERS) + '</tr></thead>'
+    nav = ''.join(f'<div class="nav"><a href="/p{i}">Link {i}</a></div>' for i in range(200))
+    return (f'<html><head><title>Screener</title></head><body>{nav}'
+            f'<table class="screener">{head}<tbody>{"".join(body)}</tbody></table>'
+            f'<table><tr><td>footer</td></tr></table></body></html>')
+
+def best_of(fn, repeat: int = 5) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+def bench(label: str, page: str):
+    fast = best_of(lambda: extract_table(page))
+    try:
+        slow = best_of(lambda: to_num(pd.read_html(StringIO(page))[0]))
+    except ImportError as e:
+        print(f"{label:<28} extract_table {fast * 1e3:8.1f} ms   read_html skipped ({e})")
+        return
+    print(f"{label:<28} extract_table {fast * 1e3:8.1f} ms   read_html+to_num {slow * 1e3:8.1f} ms"
+          f"   speedup {slow / fast:5.1f}x")
+
+def main(argv):
+    if argv:
+        for path in argv:
+            with open(path, encoding='utf-8') as fh:
+                bench(os.path.basename(path), fh.read())
+    else:
+        for n in (250, 5000):
+            bench(f"synthetic {n} rows", synthetic_page(n))
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
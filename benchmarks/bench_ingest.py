@@ -0,0 +1,80 @@
+"""Benchmark CSV ingestion: pd.read_csv + to_num vs the declared schema, whole-file vs chunked.
+
+Every case runs in a fresh process, so the peak RSS reported (above the
+process's size after imports) belongs to that case alone.
+
+    python benchmarks/bench_ingest.py                          # 10 snapshots x 20000 rows
+    python benchmarks/bench_ingest.py --snapshots 40 --rows 50000 --chunksize 200000
+"""
+import argparse
+import multiprocessing as mp
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from screener.core import screen, to_num
+from screener.ingest import read_snapshot, screen_stream
+from synthetic import synthetic_frame
+
+def write_export(path: str, snapshots: int, rows: int):
+    start = pd.Timestamp('2026-01-05 09:15')
+    for k in range(snapshots):
+        df = synthetic_frame(rows, seed=k)
+        df.insert(0, 'SnapshotTime', str(start + pd.Timedelta(minutes=5 * k)))
+        df.to_csv(path, mode='a' if k else 'w', header=not k, index=False)
+
+def _whole_legacy(path, chunksize):
+    df = to_num(pd.read_csv(path))
+    return sum(len(screen(g)) for _, g in df.groupby('SnapshotTime', sort=False))
+
+def _whole_schema(path, chunksize):
+    df = read_snapshot(path)
+    return sum(len(screen(g)) for _, g in df.groupby('SnapshotTime', sort=False, observed=True))
+
+def _streamed(path, chunksize):
+    return sum(len(out) for _, out in screen_stream(path, chunksize=chunksize))
+
+CASES = {'read_csv + to_num': _whole_legacy, 'schema, whole file': _whole_schema,
+         'schema, chunked': _streamed}
+
+def _measure(name, path, chunksize, conn):
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t0 = time.perf_counter()
+    rows = CASES[name](path, chunksize)
+    seconds = time.perf_counter() - t0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base   # KiB on Linux
+    conn.send((rows, seconds, peak / 1024.0))
+
+def run_case(name, path, chunksize):
+    ctx = mp.get_context('spawn')
+    recv, send = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_measure, args=(name, path, chunksize, send))
+    proc.start()
+    result = recv.recv()
+    proc.join()
+    return result
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument('--snapshots', type=int, default=10)
+    p.add_argument('--rows', type=int, default=20000)
+    p.add_argument('--chunksize', type=int, default=50000)
+    args = p.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, 'export.csv')
+        write_export(path, args.snapshots, args.rows)
+        print(f"{args.snapshots} snapshots x {args.rows} rows, {os.path.getsize(path) / 2**20:.1f} MB CSV")
+        for name in CASES:
+            rows, seconds, peak_mb = run_case(name, path, args.chunksize)
+            print(f"{name:<20} {seconds * 1e3:8.0f} ms   peak +{peak_mb:7.1f} MB   {rows} strategies")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""End-to-end stage benchmark of the screener on synthetic Sensibull CSVs.
+
+    python benchmarks/bench_pipeline.py                          # 200, 10k, 1M rows
+    python benchmarks/bench_pipeline.py --sizes 200 10000 --save-baseline base.json
+    python benchmarks/bench_pipeline.py --sizes 200 10000 --baseline base.json
+
+Each stage runs the same calls as the upload app: read_snapshot on the
+uploaded bytes, screen, split_views (sort/top-10), Styler rendering of one
+page and the to_csv export. Stages are timed best-of-N with their throughput
+and tracemalloc peak. The sub-stages the library records with stage() are
+reported under their stage, from the same runs: to_num (numeric coercion in
+read_snapshot), generate (strategy rules) and merge (reference columns
+joined back) inside screen. Baselines are machine-specific, so none is committed: save one on the
+machine you compare on. Against a baseline, stages slower by more than
+--tolerance (and by at least --min-delta seconds) are reported as
+regressions and the exit status is 1.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from screener.core import screen, split_views
+from screener.ingest import read_snapshot
+from screener.profiling import RunProfile
+from screener.styling import page_slice, style_frame
+from synthetic import synthetic_frame
+
+PAGE_SIZE = 200   # rows styled per page by screener.ui.render_table
+# reported sub-stage -> the RunProfile record it comes from
+SUB_STAGES = {'csv_parse': {'to_num': 'read_csv/to_num'},
+              'screen': {'generate': 'generate_strategies', 'merge': 'merge'}}
+
+def measure(fn, repeat: int, parts: dict = None):
+    """(result, best seconds, peak traced bytes, best seconds per part) of fn().
+
+    Timing runs are untraced; tracemalloc slows Python-heavy stages several
+    fold, so the peak comes from one extra traced run. parts maps a name to
+    a stage() record of fn, read from a memory-less RunProfile of each run.
+    """
+    best = float('inf')
+    best_parts = {name: float('inf') for name in parts or {}}
+    for _ in range(repeat):
+        prof = RunProfile('bench', memory=None)
+        with prof.activate():
+            t0 = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - t0)
+        seconds = {r.name: r.seconds for r in prof.records}
+        for name, record in (parts or {}).items():
+            best_parts[name] = min(best_parts[name], seconds.get(record, 0.0))
+    tracemalloc.start()
+    result = fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, best, peak, best_parts
+
+def run_size(n_rows: int, repeat: int) -> dict:
+    data = synthetic_frame(n_rows).to_csv(index=False).encode()
+    stages = {}
+
+    def stage(name, fn, rows):
+        result, secs, peak, parts = measure(fn, repeat, SUB_STAGES.get(name))
+        stages[name] = {'seconds': secs, 'rows': rows, 'rows_per_s': rows / secs if secs else None,
+                        'peak_mib': peak / 2**20}
+        for part, part_secs in parts.items():
+            stages[f'{name}/{part}'] = {'seconds': part_secs, 'rows': rows,
+                                        'rows_per_s': rows / part_secs if part_secs else None,
+                                        'peak_mib': None}
+        return result
+
+    df = stage('csv_parse', lambda: read_snapshot(io.BytesIO(data)), n_rows)
+    out = stage('screen', lambda: screen(df), n_rows)
+    stage('sort_top10', lambda: split_views(out), len(out))
+    page = page_slice(out, 1, PAGE_SIZE)
+    stage('style_render', lambda: style_frame(page).to_html(), len(page))
+    stage('to_csv', lambda: out.to_csv(index=False), len(out))
+
+    top = [s for name, s in stages.items() if '/' not in name]
+    total = sum(s['seconds'] for s in top)
+    stages['total'] = {'seconds': total, 'rows': n_rows, 'rows_per_s': n_rows / total,
+                       'peak_mib': max(s['peak_mib'] for s in top)}
+    return stages
+
+def print_table(n_rows: int, stages: dict, baseline: dict, tolerance: float, min_delta: float) -> list:
+    regressions = []
+    print(f"\n{n_rows:,} rows")
+    print(f"  {'stage':<14}{'seconds':>10}{'rows/s':>14}{'peak MiB':>10}{'vs base':>10}")
+    for name, s in stages.items():
+        base = baseline.get(str(n_rows), {}).get(name)
+        delta = ''
+        if base and base['seconds'] > 0:
+            ratio = s['seconds'] / base['seconds']
+            delta = f"{(ratio - 1) * 100:+.0f}%"
+            slower = s['seconds'] - base['seconds']
+            if ratio > 1 + tolerance and slower >= min_delta and name != 'total':
+                regressions.append(f"{n_rows} rows / {name}: {base['seconds']:.4f}s -> {s['seconds']:.4f}s")
+                delta += ' !'
+        label = '  ' + name.split('/', 1)[1] if '/' in name else name      # sub-stages are indented
+        peak = '-' if s['peak_mib'] is None else f"{s['peak_mib']:.1f}"
+        print(f"  {label:<14}{s['seconds']:>10.4f}{s['rows_per_s'] or 0:>14,.0f}{peak:>10}{delta:>10}")
+    return regressions
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    p.add_argument('--sizes', nargs='+', type=int, default=[200, 10000, 1000000])
+    p.add_argument('--repeat', type=int, default=3)
+    p.add_argument('--baseline', help='baseline JSON to compare against')
+    p.add_argument('--save-baseline', metavar='PATH', help='write these results as a baseline JSON')
+    p.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown before flagging (0.25 = 25%%)')
+    p.add_argument('--min-delta', type=float, default=0.005,
+                   help='ignore slowdowns smaller than this many seconds (timer noise)')
+    p.add_argument('--json', help='also write results to this JSON file')
+    args = p.parse_args(argv)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as fh:
+            baseline = json.load(fh).get('results', {})
+
+    results, regressions = {}, []
+    for n in args.sizes:
+        results[str(n)] = run_size(n, args.repeat)
+        regressions += print_table(n, results[str(n)], baseline, args.tolerance,
+                                   args.min_delta)
+
+    doc = {'python': platform.python_version(), 'pandas': pd.__version__,
+           'machine': platform.machine(), 'results': results}
+    for path in filter(None, [args.json, args.save_baseline]):
+        with open(path, 'w', encoding='utf-8') as fh:
+            json.dump(doc, fh, indent=2)
+        print(f"\nwrote {path}")
+    if regressions:
+        print("\nRegressions:\n  " + "\n  ".join(regressions))
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""Benchmark incremental top-K ranking against a full sort per snapshot.
+
+Each snapshot perturbs a fraction of the instrument-expiry rows (a typical
+live refresh) and goes through IncrementalScreener; the ranker is fed its
+delta. Only the ranking step is timed, and both methods must produce the
+same boards.
+
+    python benchmarks/bench_ranking.py                          # 10000 rows x 3 expiries
+    python benchmarks/bench_ranking.py --rows 50000 --churn 0.01 0.05 0.2
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from screener.core import to_num
+from screener.incremental import IncrementalScreener
+from screener.ranking import TopKRanker, composite_score, index_group, row_keys
+from synthetic import synthetic_frame
+
+EXPIRIES = ['2026-10-29', '2026-11-26', '2026-12-31']
+
+def snapshots(n_rows: int, expiries: int, churn: float, count: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    base = to_num(synthetic_frame(n_rows, seed=seed))
+    df = pd.concat([base.assign(Expiry=e) for e in EXPIRIES[:expiries]], ignore_index=True)
+    out = []
+    for _ in range(count):
+        df = df.copy()
+        moved = rng.random(len(df)) < churn
+        df.loc[moved, 'FuturePrice'] *= rng.uniform(0.98, 1.02, moved.sum())
+        df.loc[moved, 'IVPercentile'] = (df.loc[moved, 'IVPercentile'] + rng.normal(0, 10, moved.sum())).clip(0, 100)
+        out.append(df)
+    return out
+
+def full_sort(out: pd.DataFrame, k: int) -> dict:
+    """Reference: score every row and sort each board from scratch."""
+    frame = out.set_axis(row_keys(out)).assign(
+        Score=composite_score(out), Group=index_group(out['Instrument'].astype(str).to_numpy()))
+    frame = frame[~frame.index.duplicated(keep='first')]
+    frame = frame.assign(KeyInstrument=frame.index.get_level_values(0), KeyExpiry=frame.index.get_level_values(1))
+    ranked = frame.sort_values(['Score', 'KeyInstrument', 'KeyExpiry'], ascending=[False, True, True])
+    boards = {}
+    for kind in ('Category', 'Group'):
+        for value, part in ranked.groupby(kind, sort=False):
+            boards[(kind, value)] = list(zip(part['KeyInstrument'].head(k), part['KeyExpiry'].head(k)))
+    return boards
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument('--rows', type=int, default=10000, help='instruments per expiry')
+    p.add_argument('--expiries', type=int, default=3, choices=range(1, len(EXPIRIES) + 1))
+    p.add_argument('--churn', type=float, nargs='+', default=[0.01, 0.05, 0.2])
+    p.add_argument('--snapshots', type=int, default=6)
+    p.add_argument('-k', type=int, default=10)
+    args = p.parse_args(argv)
+
+    for churn in args.churn:
+        snaps = snapshots(args.rows, args.expiries, churn, args.snapshots)
+        screener = IncrementalScreener()
+        screener.update(snaps[0])
+        ranker = TopKRanker(k=args.k).update(screener.out)
+        inc, full, changed = [], [], 0
+        for df in snaps[1:]:
+            screener.update(df)
+            out = screener.out
+            t0 = time.perf_counter()
+            ranker.update(out, screener.delta)
+            got = {b: [key for _, key in ranker._top(board)] for b, board in ranker.boards.items()}
+            inc.append(time.perf_counter() - t0)
+            changed += ranker.last_stats['changed']
+            t0 = time.perf_counter()
+            ref = full_sort(out, args.k)
+            full.append(time.perf_counter() - t0)
+            assert {b: v for b, v in got.items() if v} == ref, "incremental boards differ from the full sort"
+        print(f"churn {churn:5.0%}: {len(screener.out)} rows, {changed // (len(snaps) - 1)} changed/snapshot   "
+              f"incremental {min(inc) * 1e3:7.1f} ms   full sort {min(full) * 1e3:7.1f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark one-instrument history reads: re-parsing snapshot CSVs vs the Parquet store.
+
+    python benchmarks/bench_store.py                      # 22 days x 25 snapshots x 200 instruments
+    python benchmarks/bench_store.py --days 5 --per-day 75 --instruments 500
+"""
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from screener.core import screen, to_num
+from screener.store import SnapshotStore
+from synthetic import synthetic_frame
+
+def best_of(fn, repeat: int = 3) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+def build(root: str, days: int, per_day: int, n_instruments: int) -> SnapshotStore:
+    store = SnapshotStore(os.path.join(root, 'store'))
+    csv_dir = os.path.join(root, 'csv')
+    os.makedirs(csv_dir)
+    start = pd.Timestamp('2026-01-05 09:15')
+    for d in range(days):
+        for k in range(per_day):
+            when = start + pd.Timedelta(days=d, minutes=5 * k)
+            raw = synthetic_frame(n_instruments, seed=d * per_day + k)
+            raw.to_csv(os.path.join(csv_dir, when.strftime('%Y%m%d-%H%M.csv')), index=False)
+            store.write(screen(to_num(raw)), when=when, source='bench')
+    store.compact_closed_days(today=start + pd.Timedelta(days=days))
+    return store
+
+def from_csvs(csv_dir: str, instrument: str) -> pd.DataFrame:
+    parts = []
+    for path in sorted(glob.glob(os.path.join(csv_dir, '*.csv'))):
+        df = to_num(pd.read_csv(path))
+        parts.append(screen(df[df['Instrument'] == instrument]))
+    return pd.concat(parts, ignore_index=True)
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument('--days', type=int, default=22)
+    p.add_argument('--per-day', type=int, default=25)
+    p.add_argument('--instruments', type=int, default=200)
+    args = p.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as root:
+        t0 = time.perf_counter()
+        store = build(root, args.days, args.per_day, args.instruments)
+        print(f"built {args.days * args.per_day} snapshots in {time.perf_counter() - t0:.1f}s")
+        inst = 'SYM0000005'
+        cols = ['Instrument', 'PCR', 'MaxPain', 'ATMIV', 'IVPercentile', 'PotentialPoints']
+        csv = best_of(lambda: from_csvs(os.path.join(root, 'csv'), inst), repeat=1)
+        full = best_of(lambda: store.read(instruments=[inst]))
+        some = best_of(lambda: store.read(instruments=[inst], columns=cols))
+        rows = len(store.read(instruments=[inst]))
+        print(f"{inst} history ({rows} rows): re-parse CSVs {csv * 1e3:8.1f} ms   "
+              f"store all columns {full * 1e3:6.1f} ms   store {len(cols)} columns {some * 1e3:6.1f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Synthetic Sensibull screener exports for benchmarks.
+
+    python benchmarks/synthetic.py 200 10000 1000000 --out-dir bench_data/
+
+Columns and value ranges follow the Sensibull CSV export; MaxPain,
+IVPercentile and PCR are blanked at rates similar to real snapshots.
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+INDEX_NAMES = ['NIFTY', 'BANKNIFTY', 'FINNIFTY', 'MIDCPNIFTY']
+NAN_RATES = {'MaxPain': 0.08, 'IVPercentile': 0.25, 'PCR': 0.05}
+EVENTS = ['Results', 'Dividend', 'AGM', 'Split']
+
+def synthetic_frame(n_rows: int, seed: int = 0, nan_rates: dict = None) -> pd.DataFrame:
+    """Raw (pre-to_num) screener frame with n_rows instruments."""
+    rng = np.random.default_rng(seed)
+    nan_rates = NAN_RATES if nan_rates is None else nan_rates
+    names = INDEX_NAMES[:min(n_rows, len(INDEX_NAMES))]
+    names = names + [f'SYM{i:07d}' for i in range(n_rows - len(names))]
+
+    fut = np.round(np.exp(rng.uniform(np.log(50), np.log(60000), n_rows)), 2)
+    # MaxPain sits on the strike grid a few percent from the future price
+    step = np.where(fut > 10000, 100.0, np.where(fut > 1000, 10.0, 2.5))
+    maxpain = np.round(fut * rng.normal(1.0, 0.02, n_rows) / step) * step
+    df = pd.DataFrame({
+        'Instrument': names,
+        'FuturePrice': fut,
+        'FuturePercentChange': np.round(rng.normal(0, 1.5, n_rows), 2),
+        'MaxPain': maxpain,
+        'PCR': np.round(rng.lognormal(-0.2, 0.35, n_rows), 2),
+        'ATMIV': np.round(rng.uniform(8, 65, n_rows), 2),
+        'ATMIVChange': np.round(rng.normal(0, 1.2, n_rows), 2),
+        'IVPercentile': rng.integers(0, 101, n_rows).astype('float64'),
+        'Event': np.where(rng.random(n_rows) < 0.06, rng.choice(EVENTS, n_rows), ''),
+        'VolumeMultiple': np.round(rng.lognormal(0, 0.5, n_rows), 2),
+        'FutureOIPercentChange': np.round(rng.normal(0, 4, n_rows), 2),
+    })
+    for col, rate in nan_rates.items():
+        df.loc[rng.random(n_rows) < rate, col] = np.nan
+    return df
+
+def write_csv(path: str, n_rows: int, seed: int = 0) -> str:
+    synthetic_frame(n_rows, seed).to_csv(path, index=False)
+    return path
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    p.add_argument('sizes', nargs='+', type=int, help='instrument rows per file')
+    p.add_argument('--out-dir', default='.')
+    p.add_argument('--seed', type=int, default=0)
+    args = p.parse_args(argv)
+    os.makedirs(args.out_dir, exist_ok=True)
+    for n in args.sizes:
+        print(write_csv(os.path.join(args.out_dir, f'sensibull_synthetic_{n}.csv'), n, args.seed))
+
+if __name__ == '__main__':
+    main()
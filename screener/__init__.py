@@ -0,0 +1,8 @@
+"""Options strategy screener engine (UI-free)."""
+from .core import (
+    NUM_COLS, INDEX_INSTRUMENTS, KEEP_COLS, EXPIRY_COL, FEATURE_COLS, PRICING_COLS, COLUMNS_ORDER,
+    to_num, safe_rr, directional_levels, neutral_range, bucket_iv,
+    bias_from_pcr_maxpain, add_strategy, generate_strategies, screen, split_views,
+)
+from .engine import generate_strategies_vec
+from .params import DEFAULT_PARAMS, ScreenerParams
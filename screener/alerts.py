@@ -0,0 +1,328 @@
+"""Watchlist alerts: user rules compiled into one vectorized pass per snapshot.
+
+A rule is a conjunction of conditions on a screened frame (screen() output)
+plus the derived columns Bias (bias_from_pcr_maxpain) and IVRegime
+(bucket_iv), optionally scoped to some instruments:
+
+    {"name": "IVP crosses 70, bearish",
+     "all": ["IVPercentile crosses_above 70", "Bias == BEARISH"]}
+    {"name": "Index condor", "all": [["Strategy", "==", "Iron Condor"]],
+     "instruments": ["NIFTY", "BANKNIFTY"], "cooldown": 900}
+
+Operators: > >= < <= == != on numbers; == != in on text (in takes a comma
+list); crosses_above / crosses_below compare with the same row's value in the
+previous snapshot.
+
+Compilation merges identical conditions and groups numeric thresholds by
+(column, operator) and text values by column. A snapshot therefore costs one
+broadcast comparison per group and one matrix product (rows x conditions) @
+(conditions x rules), with no Python loop over rules. Alerts are
+edge-triggered per (rule, row key): a rule that stays true does not fire
+again until it has been false, and then only after its cooldown. The row key
+is the instrument, or (Instrument, Expiry) when the frame has an Expiry
+column (incremental.row_index), so every expiry has its own state and an
+alert reports the row that matched.
+"""
+import json
+import operator
+import re
+import time
+import urllib.request
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from .core import EXPIRY_COL
+from .engine import bias_from_pcr_maxpain_vec, bucket_iv_vec
+from .incremental import row_index
+from .params import DEFAULT_PARAMS, ScreenerParams
+
+NUMERIC_OPS = {'>': operator.gt, '>=': operator.ge, '<': operator.lt, '<=': operator.le,
+               '==': operator.eq, '!=': operator.ne}
+CROSS_OPS = ('crosses_above', 'crosses_below')
+TEXT_OPS = ('==', '!=', 'in')
+ALERT_COLS = ['Time', 'Rule', 'Instrument', 'Strategy', 'Category', 'Bias', 'IVRegime',
+              'FuturePrice', 'IVPercentile', 'PotentialPoints', 'RiskReward']
+_COND_RE = re.compile(r'^\s*(\w+)\s+(crosses_above|crosses_below|>=|<=|==|!=|>|<|in)\s+(.+?)\s*$')
+
+@dataclass
+class Rule:
+    name: str
+    conditions: list                  # [(column, op, value), ...]
+    instruments: list = None          # None = every instrument
+    cooldown: float = 0.0             # seconds before the same row key may re-fire
+
+def parse_condition(cond) -> tuple:
+    """'IVPercentile >= 70' or ['IVPercentile', '>=', 70] -> (column, op, value)."""
+    if isinstance(cond, str):
+        m = _COND_RE.match(cond)
+        if not m:
+            raise ValueError(f"Cannot parse condition {cond!r}")
+        col, op, value = m.groups()
+        if op == 'in':
+            value = [v.strip() for v in value.split(',')]
+        else:
+            try:
+                value = float(value)
+            except ValueError:
+                value = value.strip('\'"')
+    else:
+        col, op, value = cond
+    if op not in NUMERIC_OPS and op not in CROSS_OPS and op != 'in':
+        raise ValueError(f"Unknown operator {op!r} in {cond!r}")
+    if op in CROSS_OPS and not isinstance(value, (int, float)):
+        raise ValueError(f"{op} needs a number: {cond!r}")
+    return col, op, value
+
+def rule_from_dict(d: dict) -> Rule:
+    conds = d.get('all') or d.get('conditions')
+    if not conds:
+        raise ValueError(f"Rule {d.get('name')!r} has no conditions")
+    return Rule(name=d['name'], conditions=[parse_condition(c) for c in conds],
+                instruments=d.get('instruments'), cooldown=float(d.get('cooldown', 0.0)))
+
+def load_rules(path: str) -> list:
+    """Rules from a JSON file holding a list of rule objects."""
+    with open(path, encoding='utf-8') as fh:
+        return [rule_from_dict(d) for d in json.load(fh)]
+
+def add_signals(out: pd.DataFrame, p: ScreenerParams = DEFAULT_PARAMS) -> pd.DataFrame:
+    """Screened frame plus the Bias and IVRegime the rules were built from."""
+    fut = out['FuturePrice'].to_numpy(dtype=float, na_value=np.nan)
+    mp = out['MaxPain'].to_numpy(dtype=float, na_value=np.nan)
+    frame = out.copy()
+    frame['Bias'] = bias_from_pcr_maxpain_vec(out['PCR'].to_numpy(dtype=float, na_value=np.nan),
+                                              fut, mp, p)
+    frame['IVRegime'] = bucket_iv_vec(out['IVPercentile'].to_numpy(dtype=float, na_value=np.nan),
+                                      out['ATMIV'].to_numpy(dtype=float, na_value=np.nan), p)
+    return frame
+
+# ---------- Sinks ----------
+class FileSink:
+    """Append alerts as JSON lines."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __call__(self, alerts: pd.DataFrame):
+        with open(self.path, 'a', encoding='utf-8') as fh:
+            fh.write(alerts.to_json(orient='records', lines=True, date_format='iso'))
+            if not alerts.empty:
+                fh.write('\n')
+
+class WebhookSink:
+    """POST alerts as one JSON array; with url=None it only records payloads (stub for tests)."""
+
+    def __init__(self, url: str = None, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+        self.sent = []
+        self.errors = []
+
+    def __call__(self, alerts: pd.DataFrame):
+        payload = alerts.to_json(orient='records', date_format='iso').encode('utf-8')
+        self.sent.append(payload)
+        if self.url is None:
+            return
+        req = urllib.request.Request(self.url, data=payload,
+                                     headers={'Content-Type': 'application/json'})
+        try:
+            urllib.request.urlopen(req, timeout=self.timeout).close()
+        except OSError as e:
+            self.errors.append(f"{type(e).__name__}: {e}")
+
+# ---------- Engine ----------
+@dataclass
+class _Group:
+    column: str
+    op: str
+    atoms: list = field(default_factory=list)     # atom indices
+    values: list = field(default_factory=list)
+
+class AlertEngine:
+    """Compiled rule set with per-(rule, row key) firing state."""
+
+    def __init__(self, rules, p: ScreenerParams = DEFAULT_PARAMS, sinks=None, keep: int = 200):
+        self.rules = [r if isinstance(r, Rule) else rule_from_dict(r) for r in rules]
+        self.params = p
+        self.sinks = list(sinks or [])
+        self.keep = keep
+        self.recent = pd.DataFrame(columns=ALERT_COLS)   # newest last; swapped, never mutated
+        self.slots = {}                # row key -> state row
+        self.evaluations = 0
+        self.last_seconds = None
+        self._compile()
+
+    def _compile(self):
+        atoms = {}                     # (column, op, value-key) -> atom index
+        self.numeric, self.text, self.cross = {}, {}, {}
+        need = []
+        membership = []                # (atom, rule)
+        for j, rule in enumerate(self.rules):
+            mine = set()
+            for col, op, value in rule.conditions:
+                key = (col, op, tuple(value) if isinstance(value, list) else value)
+                if key not in atoms:
+                    a = atoms[key] = len(atoms)
+                    if op in CROSS_OPS:
+                        g = self.cross.setdefault((col, op), _Group(col, op))
+                    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                        g = self.numeric.setdefault((col, op), _Group(col, op))
+                    else:
+                        if op not in TEXT_OPS:
+                            raise ValueError(f"{op} needs a number: {col} {op} {value!r}")
+                        g = self.text.setdefault(col, _Group(col, 'text'))
+                        value = (op, [value] if op != 'in' else list(value))
+                    g.atoms.append(a)
+                    g.values.append(value)
+                mine.add(atoms[key])
+            membership.extend((a, j) for a in mine)
+            need.append(len(mine))
+        self.n_atoms = len(atoms)
+        A = np.zeros((self.n_atoms, len(self.rules)), dtype=np.float32)
+        for a, j in membership:
+            A[a, j] = 1.0
+        self.matrix = A
+        self.need = np.asarray(need, dtype=np.float32)
+
+        # text groups: vocabulary code -> atom truth table (last row = value not in any rule)
+        for g in self.text.values():
+            vocab = {}
+            for _, vals in g.values:
+                for v in vals:
+                    vocab.setdefault(str(v), len(vocab))
+            table = np.zeros((len(vocab) + 1, len(g.atoms)), dtype=bool)
+            for k, (op, vals) in enumerate(g.values):
+                hit = np.zeros(len(vocab) + 1, dtype=bool)
+                hit[[vocab[str(v)] for v in vals]] = True
+                table[:, k] = ~hit if op == '!=' else hit
+            g.vocab, g.table = vocab, table
+        for g in list(self.numeric.values()) + list(self.cross.values()):
+            g.thresholds = np.asarray(g.values, dtype=float)
+
+        # instrument scopes: known instrument -> rule mask, plus a row for all others
+        self.scoped_names = {}
+        for rule in self.rules:
+            for name in rule.instruments or []:
+                self.scoped_names.setdefault(name, len(self.scoped_names))
+        scope = np.zeros((len(self.scoped_names) + 1, len(self.rules)), dtype=bool)
+        for j, rule in enumerate(self.rules):
+            if rule.instruments is None:
+                scope[:, j] = True
+            else:
+                scope[[self.scoped_names[n] for n in rule.instruments], j] = True
+        self.scope = scope
+        self.cooldown = np.array([r.cooldown for r in self.rules], dtype=float)
+
+        n_rules = len(self.rules)
+        self.active = np.zeros((0, n_rules), dtype=bool)
+        self.last_fired = np.zeros((0, n_rules))
+        self.prev = {}                 # column -> Series of last values by row key, for crosses
+
+    def _state_rows(self, keys) -> np.ndarray:
+        for key in keys:
+            if key not in self.slots:
+                self.slots[key] = len(self.slots)
+        grow = len(self.slots) - len(self.active)
+        if grow > 0:
+            self.active = np.vstack([self.active, np.zeros((grow, len(self.rules)), dtype=bool)])
+            self.last_fired = np.vstack([self.last_fired, np.full((grow, len(self.rules)), -np.inf)])
+        return np.fromiter((self.slots[k] for k in keys), dtype=np.intp, count=len(keys))
+
+    def _previous(self, column: str, keys: pd.Index) -> np.ndarray:
+        prev = self.prev.get(column)
+        if prev is None or prev.index.nlevels != keys.nlevels:
+            return np.full(len(keys), np.nan)
+        return prev.reindex(keys).to_numpy(dtype=float, na_value=np.nan)
+
+    def matches(self, frame: pd.DataFrame) -> np.ndarray:
+        """(rows, rules) boolean matrix of rules true for each row of a signals frame."""
+        n = len(frame)
+        truth = np.zeros((n, self.n_atoms), dtype=np.float32)
+        for g in self.numeric.values():
+            vals = frame[g.column].to_numpy(dtype=float, na_value=np.nan) if g.column in frame else np.full(n, np.nan)
+            with np.errstate(invalid='ignore'):
+                truth[:, g.atoms] = NUMERIC_OPS[g.op](vals[:, None], g.thresholds[None, :])
+        for g in self.text.values():
+            if g.column in frame:
+                codes = frame[g.column].astype(str).map(g.vocab).fillna(len(g.vocab)).to_numpy(dtype=np.intp)
+            else:
+                codes = np.full(n, len(g.vocab), dtype=np.intp)
+            truth[:, g.atoms] = g.table[codes]
+        inst = frame['Instrument'].astype(str)
+        keys = row_index(frame)
+        for g in self.cross.values():
+            cur = frame[g.column].to_numpy(dtype=float, na_value=np.nan) if g.column in frame else np.full(n, np.nan)
+            prev = self._previous(g.column, keys)
+            t = g.thresholds[None, :]
+            with np.errstate(invalid='ignore'):
+                if g.op == 'crosses_above':
+                    hit = (prev[:, None] < t) & (cur[:, None] >= t)
+                else:
+                    hit = (prev[:, None] > t) & (cur[:, None] <= t)
+            truth[:, g.atoms] = hit
+        scope_rows = inst.map(self.scoped_names).fillna(len(self.scoped_names)).to_numpy(dtype=np.intp)
+        return ((truth @ self.matrix) >= self.need[None, :]) & self.scope[scope_rows]
+
+    def evaluate(self, out: pd.DataFrame, when=None) -> pd.DataFrame:
+        """Alerts newly raised by one screened snapshot; also sent to every sink."""
+        t0 = time.perf_counter()
+        when = pd.Timestamp.now() if when is None else pd.Timestamp(when)
+        if out.empty or not self.rules:
+            self.last_seconds = time.perf_counter() - t0
+            return pd.DataFrame(columns=ALERT_COLS)
+        frame = add_signals(out, self.params)
+        hit = self.matches(frame)
+
+        # one state row per key; rows sharing a key (several expiries without an
+        # Expiry column) are folded, and an alert reports the first row that matched
+        keys = row_index(frame)
+        codes, uniq = keys.factorize()
+        if len(uniq) == len(keys):
+            per_key, order, starts = hit, None, None
+        else:
+            order = np.argsort(codes, kind='stable')
+            starts = np.flatnonzero(np.r_[True, np.diff(codes[order]) != 0])
+            per_key = np.logical_or.reduceat(hit[order], starts, axis=0)
+        rows = self._state_rows(uniq.tolist())
+        fire = per_key & ~self.active[rows]
+        self.active[rows] = per_key
+        if self.cooldown.any():
+            now = when.timestamp()
+            last = self.last_fired[rows]
+            fire &= now - last >= self.cooldown[None, :]
+            self.last_fired[rows] = np.where(fire, now, last)
+
+        first = ~keys.duplicated(keep='first')
+        for g in self.cross.values():
+            if g.column in frame:
+                vals = frame[g.column].to_numpy(dtype=float, na_value=np.nan)
+                self.prev[g.column] = pd.Series(vals[first], index=keys[first])
+
+        r_key, r_rule = np.nonzero(fire)
+        if order is None:
+            src_rows = r_key
+        else:
+            ends = np.r_[starts[1:], len(order)]
+            src_rows = np.array([order[a:b][hit[order[a:b], j]][0]
+                                 for a, b, j in zip(starts[r_key], ends[r_key], r_rule)], dtype=np.intp)
+        src = frame.iloc[src_rows]
+        cols = ALERT_COLS[:3] + [EXPIRY_COL] + ALERT_COLS[3:] if EXPIRY_COL in frame else ALERT_COLS
+        alerts = pd.DataFrame({
+            'Time': when,
+            'Rule': np.array([r.name for r in self.rules], dtype=object)[r_rule],
+            **{c: src[c].to_numpy() if c in src else np.nan for c in cols[2:]},
+        }, columns=cols)
+        self.evaluations += 1
+        self.last_seconds = time.perf_counter() - t0
+        if len(alerts):
+            recent = alerts if self.recent.empty else pd.concat([self.recent, alerts], ignore_index=True)
+            self.recent = recent.tail(self.keep).reset_index(drop=True)
+            for sink in self.sinks:
+                sink(alerts)
+        return alerts
+
+    def __call__(self, result):
+        """LivePipeline on_publish hook: evaluate each published LiveResult."""
+        self.evaluate(result.out, when=result.time)
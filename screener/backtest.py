@@ -0,0 +1,260 @@
+"""Vectorized backtest of screened strategies over stored snapshots.
+
+    python -m screener.backtest snapshots/ --start 2026-01-01 --horizon 75 -o trades.csv
+
+Every strategy row of a snapshot is a signal. Its later FuturePrice values
+(the instrument's next `horizon` snapshots) decide the outcome:
+
+    directional  (Bull/Bear debit and credit spreads)  target when price
+                 crosses Exit, stop when it crosses StopLoss
+    Long Straddle  target when |price - Entry| >= PotentialPoints (plus the
+                   debit for priced snapshots), no stop
+    Iron Condor    stop when price leaves the neutral range, target if it
+                   stays inside until the horizon
+
+Realized points are in the same units as PotentialPoints: +PotentialPoints
+on target, -risk on stop (risk = PotentialPoints / RiskReward), and a
+pro-rata mark to the last price for trades still open at the horizon.
+Prices are only known at snapshot times, so touches between snapshots are
+missed.
+
+Paths are gathered as (signals x horizon) blocks from an instrument x time
+price matrix; there is no per-trade Python loop.
+"""
+import argparse
+import sys
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .core import EXPIRY_COL
+from .engine import LEAF_STRATEGY, neutral_range_vec
+from .params import DEFAULT_PARAMS, ScreenerParams
+
+TIME_COL = 'SnapshotTime'
+OUTCOMES = np.array(['target', 'stop', 'open', 'nodata'], dtype=object)
+TRADE_COLS = [TIME_COL, 'Instrument', 'Category', 'Strategy', 'Entry', 'Exit', 'StopLoss',
+              'RiskReward', 'PotentialPoints', 'Outcome', 'Ticks', 'ExitTime', 'ExitPrice',
+              'RealizedPoints']
+
+STRADDLE = LEAF_STRATEGY[2]
+CONDOR = LEAF_STRATEGY[5]
+
+def series_keys(frames: pd.DataFrame) -> pd.Series:
+    """Price-series key per row: Instrument, or Instrument and Expiry when Expiry is stored."""
+    inst = frames['Instrument'].astype(str)
+    if EXPIRY_COL not in frames.columns:
+        return inst
+    return inst + ' ' + frames[EXPIRY_COL].astype(str)
+
+@dataclass
+class PriceMatrix:
+    instruments: pd.Index      # series_keys(): one row per instrument (and expiry)
+    times: np.ndarray          # sorted snapshot times
+    prices: np.ndarray         # (instruments, times), forward-filled up to each last observation
+
+    @classmethod
+    def from_frames(cls, frames: pd.DataFrame) -> 'PriceMatrix':
+        keys = series_keys(frames)
+        first = ~pd.DataFrame({'t': frames[TIME_COL].to_numpy(), 'k': keys.to_numpy()}).duplicated().to_numpy()
+        snap, keys = frames[first], keys[first]
+        times = np.sort(snap[TIME_COL].unique())
+        instruments = pd.Index(keys.unique())
+        ti = np.searchsorted(times, snap[TIME_COL].to_numpy())
+        ii = instruments.get_indexer(keys)
+        prices = np.full((len(instruments), len(times)), np.nan)
+        prices[ii, ti] = snap['FuturePrice'].to_numpy(dtype=float, na_value=np.nan)
+
+        # carry the last seen price over gaps, but not past an instrument's last snapshot
+        cols = np.arange(len(times))
+        seen = np.where(np.isnan(prices), 0, cols)
+        np.maximum.accumulate(seen, axis=1, out=seen)
+        last = len(times) - 1 - np.argmax(~np.isnan(prices[:, ::-1]), axis=1)
+        filled = prices[np.arange(len(instruments))[:, None], seen]
+        filled[cols[None, :] > last[:, None]] = np.nan
+        return cls(instruments, times, filled)
+
+@dataclass
+class BacktestResult:
+    trades: pd.DataFrame
+    summary: pd.DataFrame
+    seconds: float
+
+def _signals(frames: pd.DataFrame, only_changes: bool) -> pd.DataFrame:
+    sig = frames.dropna(subset=['Entry'])
+    sig = sig.assign(_key=series_keys(sig)).sort_values(['_key', TIME_COL], kind='stable')
+    if only_changes:
+        inst = sig['_key'].to_numpy()
+        strat = sig['Strategy'].astype(str).to_numpy()
+        new = np.ones(len(sig), dtype=bool)
+        new[1:] = (inst[1:] != inst[:-1]) | (strat[1:] != strat[:-1])
+        sig = sig[new]
+    return sig.reset_index(drop=True)
+
+def _first(mask: np.ndarray, horizon: int) -> np.ndarray:
+    """Index of the first True per row, or horizon when there is none."""
+    return np.where(mask.any(axis=1), mask.argmax(axis=1), horizon)
+
+def backtest(frames: pd.DataFrame, horizon: int = 75, p: ScreenerParams = DEFAULT_PARAMS,
+             only_changes: bool = True, chunk_cells: int = 2**24) -> BacktestResult:
+    """Replay screened snapshots (e.g. SnapshotStore.read()) and resolve each signal.
+
+    only_changes keeps a signal only when an instrument's Strategy differs from
+    its previous snapshot, so a setup that persists for hours counts once.
+    With an Expiry column every expiry of an instrument is its own series.
+    p must be the parameters the snapshots were screened with (condor range).
+    """
+    t0 = time.perf_counter()
+    pm = PriceMatrix.from_frames(frames)
+    sig = _signals(frames, only_changes)
+    n = len(sig)
+
+    ii = pm.instruments.get_indexer(sig.pop('_key'))
+    ti = np.searchsorted(pm.times, sig[TIME_COL].to_numpy())
+    entry = sig['Entry'].to_numpy(dtype=float)
+    exit_ = sig['Exit'].to_numpy(dtype=float)
+    stop = sig['StopLoss'].to_numpy(dtype=float)
+    pot = sig['PotentialPoints'].to_numpy(dtype=float)
+    rr = sig['RiskReward'].to_numpy(dtype=float)
+    strategy = sig['Strategy'].astype(str).to_numpy()
+    is_straddle = strategy == STRADDLE
+    is_condor = strategy == CONDOR
+    ivp = sig['IVPercentile'].to_numpy(dtype=float, na_value=np.nan)
+    n_lo, n_hi, _ = neutral_range_vec(entry, sig['MaxPain'].to_numpy(dtype=float),
+                                      np.where(np.isfinite(ivp), ivp, p.ivp_fill), p)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        risk = np.where(rr > 0, pot / rr, pot)
+    # priced straddles (screener.pricing) quote PotentialPoints net of the debit
+    move = pot
+    if 'NetPremium' in sig.columns:
+        debit = sig['NetPremium'].to_numpy(dtype=float, na_value=np.nan)
+        move = np.where(is_straddle & np.isfinite(debit), pot + debit, pot)
+    direction = np.sign(exit_ - entry)
+
+    # pad so every signal has `horizon` later columns (NaN past the data)
+    padded = np.concatenate([pm.prices, np.full((len(pm.instruments), horizon), np.nan)], axis=1)
+    offsets = 1 + np.arange(horizon)
+    outcome = np.full(n, 3, dtype=np.int8)
+    ticks = np.zeros(n, dtype=np.int64)
+    exit_col = np.full(n, -1, dtype=np.int64)
+    exit_px = np.full(n, np.nan)
+    realized = np.full(n, np.nan)
+
+    step = max(1, chunk_cells // max(horizon, 1))
+    for lo in range(0, n, step):
+        s = slice(lo, min(n, lo + step))
+        path = padded[ii[s, None], ti[s, None] + offsets]
+        e, x, sl, d = entry[s, None], exit_[s, None], stop[s, None], direction[s, None]
+        straddle, condor = is_straddle[s, None], is_condor[s, None]
+        with np.errstate(invalid='ignore'):
+            hit_tgt = np.where(straddle, np.abs(path - e) >= move[s, None],
+                               ~condor & (d != 0) & (d * (path - x) >= 0))
+            hit_stop = np.where(condor, (path <= n_lo[s, None]) | (path >= n_hi[s, None]),
+                                ~straddle & (d != 0) & (d * (path - sl) <= 0))
+        t_tgt, t_stop = _first(hit_tgt, horizon), _first(hit_stop, horizon)
+
+        valid = ~np.isnan(path)
+        seen = valid.sum(axis=1)
+        last_i = horizon - 1 - np.argmax(valid[:, ::-1], axis=1)
+        last = path[np.arange(len(path)), last_i]
+
+        # a tick that touches both levels counts as a stop
+        res = np.where(t_stop <= t_tgt, t_stop, t_tgt)
+        o = np.where(t_stop < horizon, np.where(t_stop <= t_tgt, 1, 0),
+                     np.where(t_tgt < horizon, 0, 2))
+        o = np.where(condor[:, 0] & (o == 2) & (seen == horizon), 0, o)   # condor held to the horizon
+        o = np.where(seen == 0, 3, o)
+        at = np.where(res < horizon, res, last_i)
+        px = np.where(res < horizon, path[np.arange(len(path)), np.minimum(res, horizon - 1)], last)
+
+        # pro-rata mark for trades still open at the horizon (or the end of the data)
+        ps, rk = pot[s], risk[s]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            progress = direction[s] * (last - entry[s])
+            to_tgt = np.abs(exit_[s] - entry[s])
+            to_stop = np.abs(entry[s] - stop[s])
+            mark = np.where(progress >= 0, ps * np.minimum(progress / to_tgt, 1.0),
+                            -rk * np.minimum(-progress / to_stop, 1.0))
+            mark = np.where(is_straddle[s], np.clip(np.abs(last - entry[s]) - rk, -rk, ps), mark)
+            mark = np.where(is_condor[s], ps * seen / horizon, mark)     # premium decays pro rata
+        realized[s] = np.select([o == 0, o == 1, o == 2], [ps, -rk, mark], np.nan)
+        outcome[s] = o
+        ticks[s] = np.where(res < horizon, res + 1, seen)
+        exit_col[s] = np.where(o == 3, -1, ti[s] + 1 + at)
+        exit_px[s] = np.where(o == 3, np.nan, px)
+
+    exit_time = np.full(n, np.datetime64('NaT'), dtype=pm.times.dtype if n else 'datetime64[us]')
+    ok = exit_col >= 0
+    exit_time[ok] = pm.times[exit_col[ok]]
+    trades = sig.reindex(columns=TRADE_COLS[:9]).copy()
+    if EXPIRY_COL in sig.columns:
+        trades.insert(2, EXPIRY_COL, sig[EXPIRY_COL].to_numpy())
+    trades['Outcome'] = OUTCOMES[outcome]
+    trades['Ticks'] = ticks
+    trades['ExitTime'] = exit_time
+    trades['ExitPrice'] = exit_px
+    trades['RealizedPoints'] = realized
+    return BacktestResult(trades, summarize(trades), time.perf_counter() - t0)
+
+def summarize(trades: pd.DataFrame, by: str = 'Strategy') -> pd.DataFrame:
+    """Hit/stop rates and realized vs predicted points and RR, per `by` value plus an ALL row."""
+    t = trades[trades['Outcome'] != 'nodata']
+    def agg(g):
+        r = g['RealizedPoints']
+        wins, losses = r[r > 0], r[r < 0]
+        loss = -losses.mean() if len(losses) else np.nan
+        return pd.Series({
+            'Trades': len(g),
+            'HitRate': (g['Outcome'] == 'target').mean(),
+            'StopRate': (g['Outcome'] == 'stop').mean(),
+            'OpenRate': (g['Outcome'] == 'open').mean(),
+            'AvgRealizedPoints': r.mean(),
+            'AvgPotentialPoints': g['PotentialPoints'].mean(),
+            'RealizedRR': wins.mean() / loss if len(wins) and loss > 0 else np.nan,
+            'AvgRiskReward': g['RiskReward'].mean(),
+            'AvgTicks': g['Ticks'].mean(),
+        })
+    if t.empty:
+        return pd.DataFrame(columns=[by, 'Trades', 'HitRate', 'StopRate', 'OpenRate',
+                                     'AvgRealizedPoints', 'AvgPotentialPoints', 'RealizedRR',
+                                     'AvgRiskReward', 'AvgTicks'])
+    keys = t[by].astype(str)
+    rows = [agg(g).rename(k) for k, g in t.groupby(keys, sort=True)]
+    rows.append(agg(t).rename('ALL'))
+    out = pd.DataFrame(rows)
+    out.index.name = by
+    out['Trades'] = out['Trades'].astype(np.int64)
+    return out.reset_index()
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog='python -m screener.backtest', description=__doc__.split('\n')[0])
+    p.add_argument('store', help='SnapshotStore root directory')
+    p.add_argument('--start', help='first snapshot time/date to replay')
+    p.add_argument('--end', help='last snapshot time/date to replay')
+    p.add_argument('--instruments', nargs='+', help='only these instruments')
+    p.add_argument('--horizon', type=int, default=75, help='snapshots to follow each signal (default: 75)')
+    p.add_argument('--all-signals', action='store_true',
+                   help='count every snapshot as a new signal, not only strategy changes')
+    p.add_argument('-o', '--output', help='write the per-trade CSV here')
+    return p
+
+def main(argv=None) -> int:
+    from .store import SnapshotStore
+
+    args = build_parser().parse_args(argv)
+    frames = SnapshotStore(args.store).read(args.start, args.end, args.instruments)
+    if frames.empty:
+        print("No snapshots in the selected range.", file=sys.stderr)
+        return 2
+    result = backtest(frames, horizon=args.horizon, only_changes=not args.all_signals)
+    if args.output:
+        result.trades.to_csv(args.output, index=False)
+    print(result.summary.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    print(f"Backtested {len(result.trades)} signals over {frames[TIME_COL].nunique()} snapshots "
+          f"in {result.seconds:.1f}s.", file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""Process-pool batch screening over many snapshot CSVs.
+
+Files are screened in worker processes with a bounded number in flight, and
+results are streamed to one combined CSV in input order, so memory stays flat
+however large the archive is. Files too large to load whole (multi-snapshot
+exports) can instead be streamed in chunks, one snapshot at a time.
+"""
+import io
+import json
+import os
+import sys
+import time
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from .core import COLUMNS_ORDER, EXPIRY_COL, FEATURE_COLS, PRICING_COLS, screen
+from .ingest import SNAPSHOT_COL, read_snapshot, screen_stream
+from .profiling import RunProfile, stage
+
+# Every column screen() can produce; files lacking an optional one leave it empty
+OUTPUT_COLS = COLUMNS_ORDER + [EXPIRY_COL] + FEATURE_COLS + PRICING_COLS
+
+def output_columns(chunked: bool = False, source: bool = True) -> list:
+    """Header of the combined CSV: OUTPUT_COLS, then SnapshotTime when chunked, then SourceFile."""
+    return OUTPUT_COLS + ([SNAPSHOT_COL] if chunked else []) + (['SourceFile'] if source else [])
+
+@dataclass
+class FileResult:
+    path: str
+    frame: pd.DataFrame = None
+    csv: str = None           # header-less CSV text (with SourceFile) when requested
+    columns: list = None      # the columns of `csv`
+    rows: int = 0
+    error: str = None         # "<ExceptionType>: message" when the file failed
+    seconds: float = 0.0
+    stages: list = None       # RunProfile.records_json() when profiling
+
+class CsvSink:
+    """CSV output with a fixed header, written up front; every result is aligned to it.
+
+    Columns a result lacks are left empty, so no file's optional columns
+    depend on which file came first.
+    """
+
+    def __init__(self, fh, columns: list):
+        self.fh = fh
+        self.columns = list(columns)
+        self.fh.write(','.join(self.columns) + '\n')
+
+    def write_frame(self, df: pd.DataFrame):
+        if list(df.columns) != self.columns:
+            df = df.reindex(columns=self.columns)
+        df.to_csv(self.fh, index=False, header=False)
+
+    def write_text(self, text: str, columns: list):
+        """Header-less CSV text from a worker, with its column names."""
+        if columns == self.columns:
+            self.fh.write(text)
+        else:
+            self.write_frame(pd.read_csv(io.StringIO(text), names=columns, dtype=str,
+                                         keep_default_na=False))
+
+@dataclass
+class BatchStats:
+    files: int = 0
+    failed: int = 0
+    rows: int = 0
+    seconds: float = 0.0
+    errors: list = field(default_factory=list)   # (path, error) pairs
+
+    def line(self, total: int) -> str:
+        rate = self.files / self.seconds if self.seconds else 0.0
+        rows_rate = self.rows / self.seconds if self.seconds else 0.0
+        return (f"[{self.files}/{total}] {rate:.1f} files/s, {rows_rate:,.0f} rows/s, "
+                f"{self.failed} failed")
+
+def screen_file(path: str) -> pd.DataFrame:
+    """Read one Sensibull CSV export and return its screened strategies."""
+    return screen(read_snapshot(path))
+
+def _run_one(path: str, out_dir: str = None, as_csv: bool = False,
+             profile: bool = False) -> FileResult:
+    # Runs in the worker: every failure is confined to its own file
+    t0 = time.perf_counter()
+    prof = RunProfile('batch') if profile else None
+    try:
+        with prof.activate() if prof else nullcontext():
+            out = screen_file(path)
+            if out_dir:
+                stem = os.path.splitext(os.path.basename(path))[0]
+                with stage('write_csv', rows=len(out)):
+                    out.to_csv(os.path.join(out_dir, f"{stem}_screened.csv"), index=False)
+            res = FileResult(path, rows=len(out))
+            if as_csv:
+                # serialise in the worker so the parent only concatenates text
+                with stage('csv_export', rows=len(out)):
+                    res.columns = output_columns()
+                    out = out.assign(SourceFile=path).reindex(columns=res.columns)
+                    res.csv = out.to_csv(index=False, header=False) if len(out) else ""
+            else:
+                res.frame = out
+    except Exception as e:
+        res = FileResult(path, error=f"{type(e).__name__}: {e}")
+    res.seconds = time.perf_counter() - t0
+    if prof:
+        res.stages = prof.records_json(file=path)
+    return res
+
+def _stream_one(path: str, sink: CsvSink, out_dir: str = None, chunksize: int = None,
+                profile: bool = False) -> FileResult:
+    # In-process, chunked: each snapshot's strategies are written as soon as they are screened
+    t0 = time.perf_counter()
+    prof = RunProfile('batch') if profile else None
+    res = FileResult(path)
+    per_file = None
+    try:
+        with prof.activate() if prof else nullcontext():
+            if out_dir:
+                stem = os.path.splitext(os.path.basename(path))[0]
+                per_file = open(os.path.join(out_dir, f"{stem}_screened.csv"), 'w', newline='',
+                                encoding='utf-8')
+                per_sink = CsvSink(per_file, output_columns(chunked=True, source=False))
+            for key, out in screen_stream(path, chunksize=chunksize):
+                if out.empty:
+                    continue
+                with stage('csv_export', rows=len(out)):
+                    out = out.assign(**{SNAPSHOT_COL: key})
+                    if per_file is not None:
+                        per_sink.write_frame(out)
+                    sink.write_frame(out.assign(SourceFile=path))
+                res.rows += len(out)
+    except Exception as e:
+        res.error = f"{type(e).__name__}: {e}"
+    finally:
+        if per_file is not None:
+            per_file.close()
+    res.seconds = time.perf_counter() - t0
+    if prof:
+        res.stages = prof.records_json(file=path)
+    return res
+
+def iter_results(paths, jobs: int = None, out_dir: str = None, as_csv: bool = False,
+                 max_in_flight: int = None, profile: bool = False):
+    """Yield a FileResult per path, in input order.
+
+    jobs=1 screens in-process; otherwise a process pool of `jobs` workers
+    (default: CPU count) with at most `max_in_flight` files queued at once.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1:
+        for path in paths:
+            yield _run_one(path, out_dir, as_csv, profile)
+        return
+
+    max_in_flight = max_in_flight or 2 * jobs
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = deque()
+        for path in paths:
+            pending.append(pool.submit(_run_one, path, out_dir, as_csv, profile))
+            if len(pending) >= max_in_flight:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def run_batch(paths, output, jobs: int = None, out_dir: str = None,
+              progress: bool = False, profile_log=None, chunksize: int = None) -> BatchStats:
+    """Screen all paths and stream the combined results (with SourceFile) to `output`.
+
+    `output` is a path or a writable text stream. With `profile_log` (a path or
+    text stream) every file's stage timings, rows and memory deltas are
+    written there as JSON lines. With `chunksize` files are read that many
+    rows at a time and screened per SnapshotTime in this process (jobs is
+    ignored), and the results gain a SnapshotTime column. The header is
+    output_columns() whatever the files hold; a file that fails part-way
+    keeps the snapshots written before the error. Returns throughput/error
+    stats.
+    """
+    paths = list(paths)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+
+    stats = BatchStats()
+    t0 = time.perf_counter()
+    last_report = 0.0
+    own_file = isinstance(output, str)
+    fh = open(output, 'w', newline='', encoding='utf-8') if own_file else output
+    sink = CsvSink(fh, output_columns(chunked=bool(chunksize)))
+    own_log = isinstance(profile_log, str)
+    log = open(profile_log, 'w', encoding='utf-8') if own_log else profile_log
+    try:
+        if chunksize:
+            results = (_stream_one(path, sink, out_dir, chunksize, profile=log is not None)
+                       for path in paths)
+        else:
+            results = iter_results(paths, jobs=jobs, out_dir=out_dir, as_csv=True,
+                                   profile=log is not None)
+        for res in results:
+            if log is not None:
+                for rec in res.stages:
+                    log.write(json.dumps({**rec, "error": res.error}) + '\n')
+            stats.files += 1
+            if res.error is not None:
+                stats.failed += 1
+                stats.errors.append((res.path, res.error))
+            else:
+                if res.csv:
+                    sink.write_text(res.csv, res.columns)
+                stats.rows += res.rows
+            stats.seconds = time.perf_counter() - t0
+            if progress and (stats.seconds - last_report >= 0.5 or stats.files == len(paths)):
+                last_report = stats.seconds
+                print("\r" + stats.line(len(paths)), end="", file=sys.stderr, flush=True)
+    finally:
+        if own_file:
+            fh.close()
+        if own_log:
+            log.close()
+    if progress:
+        print(file=sys.stderr)
+    return stats
@@ -0,0 +1,92 @@
+"""Content-hashed, size-bounded LRU cache for parsed inputs and screened results.
+
+Keys are digests of the uploaded bytes (or of a fetched frame), so identical
+uploads from any session, and Streamlit reruns, are served without re-parsing
+or re-screening. The cache is thread-safe so one instance can be shared by all
+sessions of a server.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import pandas as pd
+
+def bytes_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def frame_digest(df: pd.DataFrame) -> str:
+    """Digest of a frame's columns and values (row order matters)."""
+    h = hashlib.sha256(','.join(map(str, df.columns)).encode('utf-8'))
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+def params_digest(digest: str, p) -> str:
+    """Digest of content screened with parameters `p`: one file under other params is another entry."""
+    return hashlib.sha256(f'{digest}:{p!r}'.encode('utf-8')).hexdigest()
+
+def approx_nbytes(value) -> int:
+    """In-memory size of a cached value (frames, or tuples/dicts of frames), strings included."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (tuple, list)):
+        return sum(approx_nbytes(v) for v in value)
+    if isinstance(value, dict):
+        return sum(approx_nbytes(v) for v in value.values())
+    return 0
+
+@dataclass
+class Lookup:
+    value: object
+    hit: bool
+    seconds: float        # compute time on a miss, lookup time on a hit
+
+class ResultCache:
+    """LRU cache bounded by entry count and approximate bytes."""
+
+    def __init__(self, max_entries: int = 32, max_bytes: int = 512 * 2**20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()     # key -> (value, nbytes)
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get_or_compute(self, key, compute) -> Lookup:
+        t0 = time.perf_counter()
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return Lookup(self._data[key][0], True, time.perf_counter() - t0)
+            self.misses += 1
+        # compute outside the lock so other sessions are not blocked
+        value = compute()
+        seconds = time.perf_counter() - t0
+        self.put(key, value)
+        return Lookup(value, False, seconds)
+
+    def put(self, key, value):
+        size = approx_nbytes(value)
+        with self._lock:
+            if key in self._data:
+                self.nbytes -= self._data.pop(key)[1]
+            self._data[key] = (value, size)
+            self.nbytes += size
+            while self._data and (len(self._data) > self.max_entries or self.nbytes > self.max_bytes):
+                _, (_, evicted) = self._data.popitem(last=False)
+                self.nbytes -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.nbytes = 0
+
+    def summary(self) -> str:
+        return (f"{len(self._data)} entries, {self.nbytes / 2**20:.1f} MiB, "
+                f"{self.hits} hits / {self.misses} misses")
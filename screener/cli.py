@@ -0,0 +1,114 @@
+"""Headless batch screening of Sensibull CSV exports.
+
+    python -m screener exports/*.csv -o screened.csv
+    python -m screener exports/ --out-dir screened/
+    python -m screener exports/ --sweep grid.json -o sweep.csv
+    python -m screener exports/ -o screened.csv --profile-log stages.jsonl --cprofile run.prof
+    python -m screener archive.csv --chunksize 200000 -o screened.csv
+
+Only pandas/numpy are imported, so the CLI starts fast and runs from cron or
+workers without streamlit, selenium or matplotlib.
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+
+from .batch import run_batch
+
+def expand_inputs(inputs):
+    """Expand files, directories (all *.csv inside) and glob patterns into a sorted path list."""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(glob.glob(os.path.join(item, '*.csv')))
+        elif glob.has_magic(item):
+            paths.extend(glob.glob(item, recursive=True))
+        else:
+            paths.append(item)
+    return sorted(dict.fromkeys(paths))
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog='python -m screener', description=__doc__.split('\n')[0])
+    p.add_argument('inputs', nargs='+', help='CSV files, directories or glob patterns')
+    p.add_argument('-o', '--output', default='-',
+                   help='combined results CSV with a SourceFile column (default: stdout)')
+    p.add_argument('--out-dir', help='also write <name>_screened.csv per input into this directory')
+    p.add_argument('-j', '--jobs', type=int, default=1,
+                   help='worker processes (0 = one per CPU, default: 1)')
+    p.add_argument('--chunksize', type=int, metavar='ROWS',
+                   help='stream each file ROWS at a time and screen it per SnapshotTime, for '
+                        'exports too large to load whole (in-process; adds a SnapshotTime column)')
+    p.add_argument('--errors', help='write failed files and their errors to this CSV')
+    p.add_argument('--progress', action='store_true', help='show progress and throughput on stderr')
+    p.add_argument('--profile-log', metavar='FILE.jsonl',
+                   help='write per-file stage timings, rows and memory deltas as JSON lines')
+    p.add_argument('--cprofile', metavar='FILE.prof',
+                   help='run in-process under cProfile, dump the stats here and print the top '
+                        'functions on stderr')
+    p.add_argument('--sweep', metavar='GRID.json',
+                   help='evaluate a parameter grid ({"pcr_bull": [0.5, 0.6], ...}) over all inputs '
+                        'and write one summary row per combination instead of strategies')
+    return p
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    paths = expand_inputs(args.inputs)
+    if not paths:
+        print("No input CSV files found.", file=sys.stderr)
+        return 2
+    output = sys.stdout if args.output == '-' else args.output
+    if args.sweep:
+        return run_sweep(paths, args.sweep, output)
+
+    if args.cprofile:
+        from .profiling import CProfile
+        if args.jobs != 1:
+            print("--cprofile: screening in-process (-j 1) so all of the work is profiled.",
+                  file=sys.stderr)
+        with CProfile() as cp:
+            stats = run_batch(paths, output, jobs=1, out_dir=args.out_dir,
+                              progress=args.progress, profile_log=args.profile_log,
+                              chunksize=args.chunksize)
+        cp.dump(args.cprofile)
+        print(cp.report(limit=25), file=sys.stderr)
+    else:
+        stats = run_batch(paths, output, jobs=args.jobs or None, out_dir=args.out_dir,
+                          progress=args.progress, profile_log=args.profile_log,
+                          chunksize=args.chunksize)
+
+    for path, err in stats.errors:
+        print(f"{path}: {err}", file=sys.stderr)
+    if args.errors:
+        with open(args.errors, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['SourceFile', 'Error'])
+            writer.writerows(stats.errors)
+    print(f"Screened {stats.files - stats.failed}/{stats.files} files, {stats.rows} strategies "
+          f"in {stats.seconds:.1f}s.", file=sys.stderr)
+    return 1 if stats.failed else 0
+
+def run_sweep(paths, grid_path: str, output) -> int:
+    # imported lazily: only sweep runs need it
+    from .sweep import load_features, param_grid, sweep
+
+    try:
+        with open(grid_path, encoding='utf-8') as fh:
+            grid = param_grid(json.load(fh))
+    except (OSError, ValueError) as e:
+        print(f"{grid_path}: {e}", file=sys.stderr)
+        return 2
+    t0 = time.perf_counter()
+    features, errors = load_features(paths)
+    for path, err in errors:
+        print(f"{path}: {err}", file=sys.stderr)
+    if features is None:
+        return 1
+    result = sweep(features, grid)
+    result.to_csv(output, index=False)
+    print(f"Swept {len(grid)} parameter sets over {len(features)} rows from "
+          f"{len(paths) - len(errors)} files in {time.perf_counter() - t0:.1f}s.", file=sys.stderr)
+    return 1 if errors else 0
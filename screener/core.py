@@ -0,0 +1,201 @@
+"""Strategy rules and result shaping shared by the Streamlit apps and the CLI."""
+import numpy as np
+import pandas as pd
+
+from .engine import generate_strategies_vec, valid_rows
+from .params import DEFAULT_PARAMS, ScreenerParams
+from .profiling import stage, staged
+
+# ---------- Utility helpers ----------
+NUM_COLS = [
+    'FuturePrice','MaxPain','PCR','FuturePercentChange','ATMIV',
+    'ATMIVChange','IVPercentile','VolumeMultiple','FutureOIPercentChange'
+]
+
+@staged('to_num')
+def to_num(df: pd.DataFrame) -> pd.DataFrame:
+    for c in NUM_COLS:
+        if c in df.columns:
+            df[c] = pd.to_numeric(df[c], errors='coerce')
+    return df
+
+def safe_rr(potential: float, risk_pts: float) -> float:
+    risk_pts = abs(risk_pts)
+    if risk_pts <= 0 or np.isnan(risk_pts):
+        return 0.0
+    return round(potential / risk_pts, 2)
+
+def directional_levels(fut: float, maxpain: float, p: ScreenerParams = DEFAULT_PARAMS):
+    """Derive generic directional target/SL using distance to Max Pain as anchor."""
+    dist = abs(maxpain - fut)
+    # guard for tiny/NaN
+    if not np.isfinite(dist) or dist < 1e-6:
+        dist = max(1.0, fut * p.dir_fallback_pct)  # 0.5% fallback
+    # 50% of the distance as risk, full distance as reward proxy
+    long_sl  = fut - p.stop_frac * dist
+    short_sl = fut + p.stop_frac * dist
+    tgt      = maxpain
+    potential = abs(maxpain - fut)  # proxy points
+    return tgt, long_sl, short_sl, potential
+
+def neutral_range(fut: float, maxpain: float, ivp: float, p: ScreenerParams = DEFAULT_PARAMS):
+    """Return a neutral range around fut; wider when IVP is high."""
+    base = max(p.neutral_min_pts, fut * p.neutral_base_pct)  # base 0.4%
+    widen = 1.0 + p.neutral_ivp_widen * (ivp/100.0)          # 1x to 2x of base as IVP grows 0->100
+    half_width = base * widen
+    return fut - half_width, fut + half_width, half_width
+
+def bucket_iv(ivr: float, iv: float, p: ScreenerParams = DEFAULT_PARAMS):
+    """Classify implied volatility regime."""
+    # prefer percentile if present; otherwise fall back to absolute ATM IV
+    if np.isfinite(ivr):
+        if ivr >= p.ivp_high: return "HIGH"
+        if ivr <= p.ivp_low: return "LOW"
+        return "MEDIUM"
+    else:
+        if iv >= p.iv_high: return "HIGH"
+        if iv <= p.iv_low: return "LOW"
+        return "MEDIUM"
+
+def bias_from_pcr_maxpain(pcr: float, fut: float, maxpain: float, p: ScreenerParams = DEFAULT_PARAMS):
+    """Heuristic directional bias using PCR + relationship to Max Pain."""
+    # PCR < ~0.6 often bullish, > ~0.8 bearish; maxpain as magnet/anchor
+    if np.isfinite(pcr) and np.isfinite(fut) and np.isfinite(maxpain):
+        if pcr < p.pcr_bull and maxpain > fut: return "BULLISH"
+        if pcr > p.pcr_bear and maxpain < fut: return "BEARISH"
+    # fallback using only distance to max pain
+    if maxpain > fut: return "BULLISH"
+    if maxpain < fut: return "BEARISH"
+    return "NEUTRAL"
+
+def add_strategy(rows, instrument, cat, name, entry, exit_price, sl, potential, rr, details, comments):
+    rows.append({
+        "Instrument": instrument,
+        "Category": cat,              # CALL/PUT/NEUTRAL/LONGVOL/SHORTVOL
+        "Strategy": name,
+        "Entry": round(entry, 2),
+        "Exit": round(exit_price, 2),
+        "StopLoss": round(sl, 2) if np.isfinite(sl) else 0.0,
+        "RiskReward": round(rr, 2),
+        "PotentialPoints": round(potential, 2),
+        "TradeDetails": details,
+        "Comments": comments
+    })
+
+def generate_strategies(row, p: ScreenerParams = DEFAULT_PARAMS):
+    """Return the single best strategy for an instrument."""
+    i = row['Instrument']
+    fut = row['FuturePrice']
+    maxpain = row['MaxPain']
+    pcr = row['PCR']
+    iv = row['ATMIV']
+    ivp = row['IVPercentile']
+
+    rows = []
+    if not np.isfinite(fut) or not np.isfinite(maxpain):
+        return rows
+
+    iv_regime = bucket_iv(ivp, iv, p)
+    bias = bias_from_pcr_maxpain(pcr, fut, maxpain, p)
+    tgt, long_sl, short_sl, potential = directional_levels(fut, maxpain, p)
+    n_lo, n_hi, half_w = neutral_range(fut, maxpain, ivp if np.isfinite(ivp) else p.ivp_fill, p)
+
+    # Decide best-fit strategy
+    if iv_regime in ("LOW", "MEDIUM"):
+        if bias == "BULLISH":
+            add_strategy(rows, i, "CALL", "Bull Call Spread", fut, tgt, long_sl,
+                         potential*p.debit_mult, safe_rr(potential*p.debit_mult, p.rr_risk_frac*abs(fut-long_sl)),
+                         f"Buy ATM CE ~{fut:.0f}, Sell OTM CE ~{tgt:.0f}",
+                         "Low IV + bullish bias → debit spread.")
+        elif bias == "BEARISH":
+            add_strategy(rows, i, "PUT", "Bear Put Spread", fut, tgt, short_sl,
+                         potential*p.debit_mult, safe_rr(potential*p.debit_mult, p.rr_risk_frac*abs(short_sl-fut)),
+                         f"Buy ATM PE ~{fut:.0f}, Sell OTM PE ~{tgt:.0f}",
+                         "Low IV + bearish bias → debit spread.")
+        else:  # Neutral
+            add_strategy(rows, i, "LONGVOL", "Long Straddle", fut, tgt, np.nan,
+                         max(potential, fut*p.straddle_min_pct),
+                         safe_rr(potential, p.rr_risk_frac*potential),
+                         "Buy ATM CE + ATM PE",
+                         "Low IV + neutral bias → buy vol for breakout.")
+    elif iv_regime == "HIGH":
+        if bias == "BULLISH":
+            add_strategy(rows, i, "PUT", "Bull Put Spread (Credit)", fut, n_hi, n_lo,
+                         potential*p.credit_mult, safe_rr(potential*p.credit_mult, half_w),
+                         f"Sell OTM PE ~{n_lo:.0f}, Buy lower PE",
+                         "High IV + bullish bias → sell puts for premium.")
+        elif bias == "BEARISH":
+            add_strategy(rows, i, "CALL", "Bear Call Spread (Credit)", fut, n_lo, n_hi,
+                         potential*p.credit_mult, safe_rr(potential*p.credit_mult, half_w),
+                         f"Sell OTM CE ~{n_hi:.0f}, Buy higher CE",
+                         "High IV + bearish bias → sell calls for premium.")
+        else:  # Neutral
+            add_strategy(rows, i, "NEUTRAL", "Iron Condor", fut, fut, fut,
+                         potential*p.condor_mult, safe_rr(potential*p.condor_mult, half_w),
+                         "Sell OTM CE & PE, hedge with wings",
+                         "High IV + near MaxPain → condor best.")
+    return rows
+
+
+# ---------- Result shaping ----------
+INDEX_INSTRUMENTS = ['NIFTY','BANKNIFTY']
+
+# Original columns joined back onto the strategies for reference
+KEEP_COLS = ['Instrument','FuturePrice','MaxPain','PCR','FuturePercentChange',
+             'ATMIV','ATMIVChange','IVPercentile','Event','VolumeMultiple','FutureOIPercentChange']
+
+# Optional contract expiry; several expiries of one instrument are ranked as separate rows
+EXPIRY_COL = 'Expiry'
+# Rolling history features (screener.history); carried through screen() when present
+FEATURE_COLS = ['PCRMomentum','MaxPainDrift','IVZScore']
+# Priced legs (screener.pricing); appended by screen() when p.days_to_expiry > 0
+PRICING_COLS = ['NetPremium','MaxProfit','MaxLoss','LowerBreakeven','UpperBreakeven',
+                'Delta','Gamma','Theta','Vega']
+
+COLUMNS_ORDER = [
+    'Instrument','Category','Strategy','TradeDetails','Comments',
+    'Entry','Exit','StopLoss','RiskReward','PotentialPoints',
+    'FuturePrice','MaxPain','PCR','FuturePercentChange',
+    'ATMIV','ATMIVChange','IVPercentile','Event','VolumeMultiple','FutureOIPercentChange'
+]
+
+def screen(df: pd.DataFrame, p: ScreenerParams = DEFAULT_PARAMS) -> pd.DataFrame:
+    """Generate strategies for a numeric Sensibull frame and join back reference columns.
+
+    Each strategy keeps the reference columns of its own input row, so several
+    expiries of one instrument stay distinct. Expiry and FEATURE_COLS present
+    in df (see InstrumentHistory.annotate) are appended after COLUMNS_ORDER.
+    With p.days_to_expiry > 0 the legs are priced (screener.pricing) and
+    PRICING_COLS follow. Returns an empty frame when no instrument produced a
+    strategy.
+    """
+    with stage('generate_strategies', rows=len(df)):
+        out = generate_strategies_vec(df, p)
+    if out.empty:
+        return out
+    with stage('merge', rows=len(out)):
+        extra = [c for c in [EXPIRY_COL] + FEATURE_COLS if c in df.columns]
+        # strategies come out in input-row order, one per valid row
+        ref = df[KEEP_COLS[1:] + extra].iloc[np.flatnonzero(valid_rows(df))].reset_index(drop=True)
+        out = pd.concat([out, ref], axis=1)[COLUMNS_ORDER + extra]
+    if p.days_to_expiry > 0:
+        from .pricing import apply_pricing     # scipy is only needed once pricing is on
+        with stage('pricing', rows=len(out)):
+            out = apply_pricing(out, p)
+    return out
+
+@staged('sort')
+def split_views(out: pd.DataFrame):
+    """Split screened results into (index rows, top 10 by PotentialPoints, all other rows)."""
+    is_index = out['Instrument'].isin(INDEX_INSTRUMENTS)
+    # Top rows: NIFTY & BANKNIFTY (all strategies)
+    df_top = out[is_index].copy()
+    # Non-index universe
+    df_rest = out[~is_index].copy()
+    # Top 10 trades by PotentialPoints (excluding NaNs)
+    df_top10 = df_rest.dropna(subset=['PotentialPoints']).sort_values(
+        'PotentialPoints', ascending=False
+    ).head(10)
+    # All other trades (sorted)
+    df_all = df_rest.sort_values(['Instrument','Category','Strategy'])
+    return df_top, df_top10, df_all
@@ -0,0 +1,261 @@
+"""Vectorized strategy engine: the decision tree of core.generate_strategies over whole frames.
+
+Features.from_frame parses the rule inputs once per frame. leaf_index picks
+one of six leaves (IV regime x MaxPain bias) per row, and evaluate() computes
+the levels, risk/reward and potential of every row as arrays; intermediates
+that depend on only a few parameters can be memoised across a sweep.
+generate_strategies_vec returns the same rows as generate_strategies applied
+row by row, including for NaN and infinite inputs.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .params import DEFAULT_PARAMS, ScreenerParams
+
+# Output schema of the per-instrument strategy rows (same order as add_strategy)
+STRATEGY_COLS = [
+    'Instrument','Category','Strategy','Entry','Exit','StopLoss',
+    'RiskReward','PotentialPoints','TradeDetails','Comments'
+]
+
+# Input columns the rules read
+RULE_COLS = ['Instrument','FuturePrice','MaxPain','PCR','ATMIV','IVPercentile']
+
+# ---------- Vectorized helpers ----------
+def round2(a) -> np.ndarray:
+    """Round to 2 decimals exactly like Python's round(x, 2).
+
+    np.round scales by 100 first, which can land on the wrong side of a .5 tie;
+    the handful of near-tie values are re-rounded with the builtin.
+    """
+    a = np.asarray(a, dtype='float64')
+    out = np.round(a, 2)
+    scaled = a * 100.0
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    idx = np.flatnonzero(near_tie & np.isfinite(a))
+    if idx.size:
+        out[idx] = [round(float(v), 2) for v in a[idx]]
+    return out
+
+def safe_rr_vec(potential, risk_pts) -> np.ndarray:
+    risk_pts = np.abs(risk_pts)
+    ok = (risk_pts > 0) & ~np.isnan(risk_pts)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rr = round2(np.where(ok, potential / np.where(ok, risk_pts, 1.0), 0.0))
+    return np.where(ok, rr, 0.0)
+
+def directional_levels_vec(fut, maxpain, p: ScreenerParams = DEFAULT_PARAMS):
+    """Array form of directional_levels."""
+    dist = np.abs(maxpain - fut)
+    # guard for tiny/NaN
+    bad = ~np.isfinite(dist) | (dist < 1e-6)
+    dist = np.where(bad, np.maximum(1.0, fut * p.dir_fallback_pct), dist)
+    long_sl  = fut - p.stop_frac * dist
+    short_sl = fut + p.stop_frac * dist
+    tgt      = maxpain
+    potential = np.abs(maxpain - fut)
+    return tgt, long_sl, short_sl, potential
+
+def neutral_range_vec(fut, maxpain, ivp, p: ScreenerParams = DEFAULT_PARAMS):
+    """Array form of neutral_range."""
+    base = np.maximum(p.neutral_min_pts, fut * p.neutral_base_pct)
+    widen = 1.0 + p.neutral_ivp_widen * (ivp/100.0)
+    half_width = base * widen
+    return fut - half_width, fut + half_width, half_width
+
+def bucket_iv_vec(ivr, iv, p: ScreenerParams = DEFAULT_PARAMS) -> np.ndarray:
+    """Array form of bucket_iv."""
+    has_ivr = np.isfinite(ivr)
+    return np.select(
+        [has_ivr & (ivr >= p.ivp_high), has_ivr & (ivr <= p.ivp_low), has_ivr,
+         iv >= p.iv_high, iv <= p.iv_low],
+        ["HIGH", "LOW", "MEDIUM", "HIGH", "LOW"],
+        default="MEDIUM"
+    )
+
+def bias_from_pcr_maxpain_vec(pcr, fut, maxpain, p: ScreenerParams = DEFAULT_PARAMS) -> np.ndarray:
+    """Array form of bias_from_pcr_maxpain."""
+    finite = np.isfinite(pcr) & np.isfinite(fut) & np.isfinite(maxpain)
+    return np.select(
+        [finite & (pcr < p.pcr_bull) & (maxpain > fut),
+         finite & (pcr > p.pcr_bear) & (maxpain < fut),
+         maxpain > fut, maxpain < fut],
+        ["BULLISH", "BEARISH", "BULLISH", "BEARISH"],
+        default="NEUTRAL"
+    )
+
+def _fmt0(a) -> np.ndarray:
+    """Array form of f"{x:.0f}" (rint is round-half-even, same as format)."""
+    r = np.rint(a)
+    out = r.astype('int64').astype(str)
+    return np.where((r == 0) & np.signbit(r), '-0', out)
+
+# ---------- Vectorized engine ----------
+# Decision-tree leaves, (LOW/MEDIUM, HIGH) x (BULLISH, BEARISH, NEUTRAL)
+LEAF_CATEGORY = ["CALL", "PUT", "LONGVOL", "PUT", "CALL", "NEUTRAL"]
+LEAF_STRATEGY = ["Bull Call Spread", "Bear Put Spread", "Long Straddle",
+                 "Bull Put Spread (Credit)", "Bear Call Spread (Credit)", "Iron Condor"]
+LEAF_COMMENTS = ["Low IV + bullish bias → debit spread.",
+                 "Low IV + bearish bias → debit spread.",
+                 "Low IV + neutral bias → buy vol for breakout.",
+                 "High IV + bullish bias → sell puts for premium.",
+                 "High IV + bearish bias → sell calls for premium.",
+                 "High IV + near MaxPain → condor best."]
+
+def valid_rows(df: pd.DataFrame) -> np.ndarray:
+    """Rows that can produce a strategy: finite FuturePrice and MaxPain."""
+    fut = df['FuturePrice'].to_numpy(dtype='float64', na_value=np.nan)
+    maxpain = df['MaxPain'].to_numpy(dtype='float64', na_value=np.nan)
+    return np.isfinite(fut) & np.isfinite(maxpain)
+
+@dataclass
+class Features:
+    """Parameter-independent inputs of the rules, parsed once per frame."""
+    inst: np.ndarray
+    fut: np.ndarray
+    maxpain: np.ndarray
+    pcr: np.ndarray
+    iv: np.ndarray
+    ivp: np.ndarray
+    has_ivp: np.ndarray
+    dist: np.ndarray          # |MaxPain - FuturePrice|
+    above: np.ndarray         # MaxPain > FuturePrice
+    below: np.ndarray         # MaxPain < FuturePrice
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'Features':
+        """Keep rows with finite FuturePrice and MaxPain (the rest yield no strategy)."""
+        valid = valid_rows(df)
+        fut = df['FuturePrice'].to_numpy(dtype='float64', na_value=np.nan)[valid]
+        maxpain = df['MaxPain'].to_numpy(dtype='float64', na_value=np.nan)[valid]
+        pcr = df['PCR'].to_numpy(dtype='float64', na_value=np.nan)[valid]
+        ivp = df['IVPercentile'].to_numpy(dtype='float64', na_value=np.nan)[valid]
+        return cls(
+            inst=df['Instrument'].to_numpy()[valid],
+            fut=fut, maxpain=maxpain, pcr=pcr,
+            iv=df['ATMIV'].to_numpy(dtype='float64', na_value=np.nan)[valid],
+            ivp=ivp, has_ivp=np.isfinite(ivp),
+            dist=np.abs(maxpain - fut),
+            above=maxpain > fut, below=maxpain < fut,
+        )
+
+    def __len__(self):
+        return len(self.fut)
+
+def _cached(cache, key, compute):
+    # cache is a plain dict owned by the caller (e.g. one per sweep)
+    if cache is None:
+        return compute()
+    if key not in cache:
+        cache[key] = compute()
+    return cache[key]
+
+def leaf_index(f: Features, p: ScreenerParams = DEFAULT_PARAMS, cache: dict = None) -> np.ndarray:
+    """Decision-tree leaf (0..5, see LEAF_STRATEGY) per row from IV regime and bias."""
+    def compute():
+        high = (f.has_ivp & (f.ivp >= p.ivp_high)) | (~f.has_ivp & (f.iv >= p.iv_high))
+        # bias_from_pcr_maxpain falls back to the MaxPain side whatever PCR says,
+        # so PCR never changes the leaf
+        bull, bear = f.above, f.below
+        return (np.where(high, 3, 0) + np.where(bull, 0, np.where(bear, 1, 2))).astype(np.int8)
+    return _cached(cache, ('leaf',) + leaf_key(p), compute)
+
+def stop_levels(f: Features, p: ScreenerParams = DEFAULT_PARAMS, cache: dict = None):
+    """(long_sl, short_sl) as in directional_levels_vec, from the precomputed distance."""
+    def compute():
+        d = np.where(f.dist < 1e-6, np.maximum(1.0, f.fut * p.dir_fallback_pct), f.dist)
+        return f.fut - p.stop_frac * d, f.fut + p.stop_frac * d
+    return _cached(cache, ('levels',) + levels_key(p), compute)
+
+def neutral_levels(f: Features, p: ScreenerParams = DEFAULT_PARAMS, cache: dict = None):
+    """(n_lo, n_hi, half_width) as in neutral_range_vec, with missing IVP filled."""
+    def compute():
+        ivp = np.where(f.has_ivp, f.ivp, p.ivp_fill)
+        return neutral_range_vec(f.fut, f.maxpain, ivp, p)
+    return _cached(cache, ('neutral',) + neutral_key(p), compute)
+
+def leaf_key(p: ScreenerParams) -> tuple:
+    return (p.ivp_high, p.ivp_low, p.iv_high, p.iv_low)
+
+def levels_key(p: ScreenerParams) -> tuple:
+    return (p.dir_fallback_pct, p.stop_frac)
+
+def neutral_key(p: ScreenerParams) -> tuple:
+    return (p.neutral_min_pts, p.neutral_base_pct, p.neutral_ivp_widen, p.ivp_fill)
+
+def evaluate(f: Features, p: ScreenerParams = DEFAULT_PARAMS, cache: dict = None) -> dict:
+    """Numeric core of the rules: leaf index plus unrounded levels, RR and potential.
+
+    Intermediate arrays that depend on only a few parameters (leaf, stop levels,
+    neutral width) are memoised in `cache` keyed by those parameters.
+    """
+    lf = leaf_index(f, p, cache)
+    long_sl, short_sl = stop_levels(f, p, cache)
+    n_lo, n_hi, half_w = neutral_levels(f, p, cache)
+    fut, tgt, potential = f.fut, f.maxpain, f.dist
+
+    def pick(*choices):
+        return np.choose(lf, [np.broadcast_to(c, fut.shape) for c in choices])
+
+    debit = potential * p.debit_mult
+    credit = potential * p.credit_mult
+    condor = potential * p.condor_mult
+    return {
+        "leaf": lf,
+        "entry": fut,
+        "exit": pick(tgt, tgt, tgt, n_hi, n_lo, fut),
+        "sl": pick(long_sl, short_sl, np.nan, n_lo, n_hi, fut),
+        "pot": pick(debit, debit, np.maximum(potential, fut * p.straddle_min_pct),
+                    credit, credit, condor),
+        "rr": pick(safe_rr_vec(debit, p.rr_risk_frac * np.abs(fut - long_sl)),
+                   safe_rr_vec(debit, p.rr_risk_frac * np.abs(short_sl - fut)),
+                   safe_rr_vec(potential, p.rr_risk_frac * potential),
+                   safe_rr_vec(credit, half_w),
+                   safe_rr_vec(credit, half_w),
+                   safe_rr_vec(condor, half_w)),
+        "n_lo": n_lo,
+        "n_hi": n_hi,
+    }
+
+def generate_strategies_vec(df: pd.DataFrame, p: ScreenerParams = DEFAULT_PARAMS) -> pd.DataFrame:
+    """Columnar generate_strategies: one best strategy per instrument row.
+
+    Produces the same frame as concatenating generate_strategies over iterrows.
+    """
+    f = Features.from_frame(df)
+    r = evaluate(f, p)
+    leaf = r["leaf"]
+
+    # Strike text is only formatted for the rows of the leaf that uses it
+    details = np.array(["", "", "Buy ATM CE + ATM PE", "", "",
+                        "Sell OTM CE & PE, hedge with wings"], dtype=object)[leaf]
+    templates = {
+        0: lambda m: ("Buy ATM CE ~", _fmt0(f.fut[m]), ", Sell OTM CE ~", _fmt0(f.maxpain[m])),
+        1: lambda m: ("Buy ATM PE ~", _fmt0(f.fut[m]), ", Sell OTM PE ~", _fmt0(f.maxpain[m])),
+        3: lambda m: ("Sell OTM PE ~", _fmt0(r["n_lo"][m]), ", Buy lower PE"),
+        4: lambda m: ("Sell OTM CE ~", _fmt0(r["n_hi"][m]), ", Buy higher CE"),
+    }
+    for k, build in templates.items():
+        m = leaf == k
+        if m.any():
+            parts = build(m)
+            text = parts[0]
+            for part in parts[1:]:
+                text = np.char.add(text, part)
+            details[m] = text
+
+    sl = r["sl"]
+    return pd.DataFrame({
+        "Instrument": f.inst,
+        "Category": np.array(LEAF_CATEGORY, dtype=object)[leaf],
+        "Strategy": np.array(LEAF_STRATEGY, dtype=object)[leaf],
+        "Entry": round2(r["entry"]),
+        "Exit": round2(r["exit"]),
+        "StopLoss": np.where(np.isfinite(sl), round2(sl), 0.0),
+        "RiskReward": round2(r["rr"]),
+        "PotentialPoints": round2(r["pot"]),
+        "TradeDetails": details,
+        "Comments": np.array(LEAF_COMMENTS, dtype=object)[leaf],
+    }, columns=STRATEGY_COLS)
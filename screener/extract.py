@@ -0,0 +1,100 @@
+"""Fast extraction of the Sensibull screener table from page HTML.
+
+Only the first <table> is sliced out of the page; cell and row boundaries are
+marked and all other tags stripped with a few C-level regex passes (no
+lxml/bs4), headers are mapped onto the screener column names, and NUM_COLS
+are converted column-wise to float64, so the result needs no to_num pass.
+"""
+import html
+import re
+
+import pandas as pd
+
+from .core import NUM_COLS
+from .profiling import staged
+
+TEXT_COLS = ['Instrument', 'Event']
+
+def _norm(name: str) -> str:
+    return re.sub(r'[^a-z0-9]', '', name.lower().replace('%', 'percent'))
+
+# Displayed header (normalised) -> screener column; canonical names map to themselves
+HEADER_ALIASES = {_norm(c): c for c in NUM_COLS + TEXT_COLS}
+HEADER_ALIASES.update({
+    'symbol': 'Instrument',
+    'ivp': 'IVPercentile',
+    'atmivchg': 'ATMIVChange',
+    'futurechange': 'FuturePercentChange',
+    'futurepercentchg': 'FuturePercentChange',
+    'futureoichange': 'FutureOIPercentChange',
+    'futureoipercentchg': 'FutureOIPercentChange',
+    'volmultiple': 'VolumeMultiple',
+    'events': 'Event',
+})
+
+def map_header(name: str) -> str:
+    """Screener column for a displayed header, or the header itself if unknown."""
+    return HEADER_ALIASES.get(_norm(name), name.strip())
+
+_CELL_END = '\x1f'
+_ROW_END = '\x1e'
+_CELL_END_RE = re.compile(r'</t[dh]\s*>', re.I)
+_ROW_END_RE = re.compile(r'</tr\s*>', re.I)
+_TAG_RE = re.compile(r'<[^>]*>')
+_WS_RE = re.compile(r'[ \t\r\n\xa0]+')
+# thousands separators, percent/multiple suffixes, explicit plus signs
+_NUM_STRIP = str.maketrans('', '', ',%+x₹ ')
+
+def table_fragment(page_source: str) -> str:
+    """Slice the first <table>...</table> out of a full page so only it gets parsed."""
+    start = page_source.find('<table')
+    if start < 0:
+        raise ValueError("No <table> found in page source")
+    end = page_source.find('</table>', start)
+    if end < 0:
+        raise ValueError("Unterminated <table> in page source")
+    return page_source[start:end]
+
+def _split_rows(fragment: str):
+    """Header cells (or None) and body rows as lists of cell text."""
+    first_end = _ROW_END_RE.search(fragment)
+    first = fragment[:first_end.start()] if first_end else fragment
+    has_header = '<th' in first and '<td' not in first
+
+    text = _CELL_END_RE.sub(_CELL_END, fragment)
+    text = _ROW_END_RE.sub(_ROW_END, text)
+    text = _TAG_RE.sub('', text)
+    if '&' in text:
+        text = html.unescape(text)
+    text = _WS_RE.sub(' ', text)
+
+    rows = [[c.strip() for c in r.split(_CELL_END)[:-1]] for r in text.split(_ROW_END)]
+    rows = [r for r in rows if r]
+    header = rows.pop(0) if has_header and rows else None
+    return header, rows
+
+@staged('read_html')
+def extract_table(page_source: str) -> pd.DataFrame:
+    """Screener table from page source or table HTML, with typed NUM_COLS.
+
+    Matches to_num(pd.read_html(html)[0]) with headers mapped onto the screener
+    column names, except that decorated numbers ('1.2%', '+0.4', '2.1x') are
+    parsed instead of becoming NaN.
+    """
+    header, rows = _split_rows(table_fragment(page_source))
+    width = len(header) if header else max((len(r) for r in rows), default=0)
+    names = [map_header(h) for h in header] if header else [str(i) for i in range(width)]
+
+    # pad ragged rows, then transpose to columns
+    rows = [r + [''] * (width - len(r)) if len(r) < width else r[:width] for r in rows]
+    columns = list(zip(*rows)) if rows else [()] * width
+
+    data = {}
+    for name, col in zip(names, columns):
+        if name in NUM_COLS:
+            # one translate + one C-level parse per column; '-' and '' become NaN
+            cleaned = '\n'.join(col).translate(_NUM_STRIP).split('\n') if col else []
+            data[name] = pd.to_numeric(pd.Series(cleaned, dtype=object), errors='coerce').astype('float64')
+        else:
+            data[name] = [c if c else None for c in col]
+    return pd.DataFrame(data, columns=list(dict.fromkeys(names)))
@@ -0,0 +1,188 @@
+"""In-memory, per-instrument snapshot history with incrementally updated rolling features.
+
+Each series owns one row of fixed-width ring buffers (PCR, distance to
+MaxPain, ATM IV, snapshot time). A series is an instrument, or an
+(Instrument, Expiry) pair when snapshots have an Expiry column, so far-month
+rows never share the near month's history. append() writes one column per
+series and updates running window sums, so a tick costs O(1) per series
+whatever the window length, and is vectorized across the snapshot.
+
+The features are informational columns carried through screening, storage
+and the UI; the strategy rules do not read them.
+
+Features (per series, over the last `window` ticks it appeared in):
+    PCRMomentum   change in PCR per tick, newest vs oldest in the window
+    MaxPainDrift  change per tick of (FuturePrice - MaxPain) / FuturePrice, in %
+    IVZScore      (ATMIV - window mean) / window sample std
+"""
+import numpy as np
+import pandas as pd
+
+from .core import EXPIRY_COL, FEATURE_COLS
+from .incremental import row_index
+
+SERIES_COLS = ['SnapshotTime', 'PCR', 'MaxPainDistPct', 'ATMIV']
+
+class InstrumentHistory:
+    """Ring-buffered history of the last `window` snapshots of every series seen."""
+
+    def __init__(self, window: int = 20, min_periods: int = 5, capacity: int = 256,
+                 resync_every: int = 1024):
+        if window < 2:
+            raise ValueError("window must be at least 2")
+        self.window = window
+        self.min_periods = min_periods
+        # running IV sums drift in floating point; rebuild them from the buffer this often
+        self.resync_every = resync_every
+        self.slots = {}         # series key (row_index of a snapshot row) -> row
+        self.names = []
+        self.ticks = 0
+        self.last_time = None
+        self._alloc(capacity)
+
+    def __len__(self):
+        return len(self.names)
+
+    # ---------- Storage ----------
+    def _alloc(self, n: int):
+        w = self.window
+        self.times = np.full((n, w), np.datetime64('NaT'), dtype='datetime64[us]')
+        self.pcr = np.full((n, w), np.nan)
+        self.dist = np.full((n, w), np.nan)
+        self.iv = np.full((n, w), np.nan)
+        self.count = np.zeros(n, dtype=np.int64)     # ticks ever appended per series
+        self.iv_sum = np.zeros(n)
+        self.iv_sq = np.zeros(n)
+        self.iv_n = np.zeros(n, dtype=np.int64)
+
+    def _grow(self, need: int):
+        cap = len(self.count)
+        if need <= cap:
+            return
+        old = (self.times, self.pcr, self.dist, self.iv, self.count, self.iv_sum, self.iv_sq, self.iv_n)
+        self._alloc(max(need, 2 * cap))
+        for new, prev in zip((self.times, self.pcr, self.dist, self.iv, self.count,
+                              self.iv_sum, self.iv_sq, self.iv_n), old):
+            new[:cap] = prev
+
+    def rows(self, keys, create: bool = False) -> np.ndarray:
+        """Row of each series key; -1 for unknown ones unless create=True."""
+        slots = self.slots
+        if create:
+            for key in keys:
+                if key not in slots:
+                    slots[key] = len(self.names)
+                    self.names.append(key)
+            self._grow(len(self.names))
+        return np.fromiter((slots.get(key, -1) for key in keys), dtype=np.intp, count=len(keys))
+
+    # ---------- Updates ----------
+    def append(self, df: pd.DataFrame, when=None) -> 'InstrumentHistory':
+        """Add one numeric snapshot (after to_num); duplicate series keys keep their first row."""
+        when = pd.Timestamp.now() if when is None else pd.Timestamp(when)
+        keys = row_index(df)
+        first = ~keys.duplicated(keep='first')
+        snap = df[first]
+        r = self.rows(keys[first].tolist(), create=True)
+        if len(r) == 0:
+            return self
+        pos = self.count[r] % self.window
+
+        fut = snap['FuturePrice'].to_numpy(dtype=float)
+        mp = snap['MaxPain'].to_numpy(dtype=float)
+        iv = snap['ATMIV'].to_numpy(dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dist = np.where(fut != 0, (fut - mp) / fut * 100.0, np.nan)
+
+        # evict the value leaving the window from the running IV sums
+        old = self.iv[r, pos]
+        gone = ~np.isnan(old)
+        self.iv_sum[r] -= np.where(gone, old, 0.0)
+        self.iv_sq[r] -= np.where(gone, old * old, 0.0)
+        self.iv_n[r] -= gone
+
+        self.times[r, pos] = when.to_datetime64()
+        self.pcr[r, pos] = snap['PCR'].to_numpy(dtype=float)
+        self.dist[r, pos] = dist
+        self.iv[r, pos] = iv
+        new = ~np.isnan(iv)
+        self.iv_sum[r] += np.where(new, iv, 0.0)
+        self.iv_sq[r] += np.where(new, iv * iv, 0.0)
+        self.iv_n[r] += new
+        self.count[r] += 1
+
+        due = r[self.count[r] % self.resync_every == 0]
+        if len(due):
+            self._resync(due)
+        self.ticks += 1
+        self.last_time = when
+        return self
+
+    def _resync(self, r: np.ndarray):
+        vals = self.iv[r]
+        self.iv_sum[r] = np.nansum(vals, axis=1)
+        self.iv_sq[r] = np.nansum(vals * vals, axis=1)
+        self.iv_n[r] = (~np.isnan(vals)).sum(axis=1)
+
+    def replay(self, frames: pd.DataFrame, time_col: str = 'SnapshotTime') -> 'InstrumentHistory':
+        """Append stored snapshots (e.g. SnapshotStore.read()) in time order."""
+        for when, snap in frames.groupby(time_col, sort=True, observed=True):
+            self.append(snap, when)
+        return self
+
+    # ---------- Features ----------
+    def _window_ends(self, r: np.ndarray):
+        n = np.minimum(self.count[r], self.window)
+        newest = (self.count[r] - 1) % self.window
+        oldest = (self.count[r] - n) % self.window
+        return n, newest, oldest
+
+    def features(self, keys=None) -> pd.DataFrame:
+        """FEATURE_COLS plus HistoryLen per series key (NaN where history is too short).
+
+        Indexed by Instrument, or by (Instrument, Expiry) for expiry-keyed series.
+        """
+        names = self.names if keys is None else list(keys)
+        r = self.rows(names)
+        known = r >= 0
+        rk = r[known]
+        n, newest, oldest = self._window_ends(rk)
+        steps = np.where(n > 1, n - 1, np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mom = (self.pcr[rk, newest] - self.pcr[rk, oldest]) / steps
+            drift = (self.dist[rk, newest] - self.dist[rk, oldest]) / steps
+            k = self.iv_n[rk].astype(float)
+            mean = self.iv_sum[rk] / k
+            var = np.maximum(self.iv_sq[rk] / k - mean * mean, 0.0) * k / (k - 1)
+            std = np.sqrt(var)
+            z = (self.iv[rk, newest] - mean) / std
+        z = np.where((k >= self.min_periods) & (std > 1e-12), z, np.nan)
+
+        out = np.full((len(names), 4), np.nan)
+        out[known] = np.column_stack([mom, drift, z, n])
+        if names and isinstance(names[0], tuple):
+            index = pd.MultiIndex.from_tuples(names, names=['Instrument', EXPIRY_COL])
+        else:
+            index = pd.Index(names, name='Instrument', dtype=object)
+        res = pd.DataFrame(out, columns=FEATURE_COLS + ['HistoryLen'], index=index)
+        res['HistoryLen'] = res['HistoryLen'].fillna(0).astype(np.int64)
+        return res
+
+    def annotate(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Copy of a snapshot with FEATURE_COLS added (screen() carries them into its output)."""
+        keys = row_index(df)
+        feats = self.features(keys.unique()).reindex(keys)
+        out = df.copy()
+        for c in FEATURE_COLS:
+            out[c] = feats[c].to_numpy(dtype=float)
+        return out
+
+    def series(self, key) -> pd.DataFrame:
+        """Buffered ticks of one series (an instrument, or an (Instrument, Expiry) pair), oldest first."""
+        r = self.slots.get(key)
+        if r is None:
+            return pd.DataFrame(columns=SERIES_COLS)
+        n, _, oldest = self._window_ends(np.array([r]))
+        idx = (oldest[0] + np.arange(n[0])) % self.window
+        return pd.DataFrame({'SnapshotTime': self.times[r, idx], 'PCR': self.pcr[r, idx],
+                             'MaxPainDistPct': self.dist[r, idx], 'ATMIV': self.iv[r, idx]})
@@ -0,0 +1,162 @@
+"""Incremental re-screening of consecutive snapshots.
+
+Between live refreshes most instruments' inputs are unchanged. The screener
+keeps the previous snapshot keyed by Instrument (Instrument and Expiry when
+the snapshot has an Expiry column), re-runs the rules only for rows whose
+KEEP_COLS inputs changed (or that appeared), and patches the cached result,
+index slice, top-10 ranking and sorted "all trades" view. The rows it
+re-screened and the keys it invalidated are kept in `delta` for consumers
+such as TopKRanker.
+
+FEATURE_COLS (InstrumentHistory.annotate) move on nearly every tick but the
+rules never read them, so they are not diffed: their new values are written
+into the cached views directly, without re-screening.
+"""
+import numpy as np
+import pandas as pd
+
+from .core import EXPIRY_COL, FEATURE_COLS, INDEX_INSTRUMENTS, KEEP_COLS, screen, split_views
+from .params import DEFAULT_PARAMS, ScreenerParams
+from .profiling import stage
+
+def row_index(df: pd.DataFrame) -> pd.Index:
+    """Instrument per row, or (Instrument, Expiry) pairs when df has an Expiry column."""
+    inst = df['Instrument'].astype(str).to_numpy(dtype=object)
+    if EXPIRY_COL not in df.columns:
+        return pd.Index(inst, name='Instrument')
+    return pd.MultiIndex.from_arrays([inst, df[EXPIRY_COL].astype(str).to_numpy(dtype=object)],
+                                     names=['Instrument', EXPIRY_COL])
+
+def changed_keys(prev: pd.DataFrame, new: pd.DataFrame, cols) -> pd.Index:
+    """Keys in `new` that are absent from `prev` or differ in any of `cols` (NaN == NaN)."""
+    common = new.index.intersection(prev.index)
+    a = prev.loc[common, cols]
+    b = new.loc[common, cols]
+    same = np.ones(len(common), dtype=bool)
+    for c in cols:
+        x, y = a[c].to_numpy(), b[c].to_numpy()
+        same &= (x == y) | (pd.isna(x) & pd.isna(y))
+    return new.index.difference(prev.index).append(common[~same])
+
+class IncrementalScreener:
+    """Stateful screen()/split_views() that only recomputes changed instruments.
+
+    After update(): out, df_top, df_top10, df_all hold the same rows a full
+    screen + split_views would produce, and last_stats reports the churn.
+    delta is (re-screened rows, invalidated keys) after an incremental
+    update and None after a full one.
+    """
+
+    def __init__(self, p: ScreenerParams = DEFAULT_PARAMS):
+        self.params = p
+        self.reset()
+
+    def reset(self):
+        self.prev = None
+        self.features = []
+        self.out = self.df_top = self.df_top10 = self.df_all = None
+        self.delta = None
+        self.last_stats = {}
+
+    # ---------- Full path ----------
+    def _full(self, df: pd.DataFrame, inputs: pd.DataFrame, features: list):
+        self.features = features
+        self.out = screen(df, self.params)
+        if self.out.empty:
+            self.df_top = self.df_top10 = self.df_all = self.out
+        else:
+            self.df_top, self.df_top10, self.df_all = split_views(self.out)
+        self.prev = inputs
+        self.delta = None
+        self.last_stats = {"instruments": len(inputs), "recomputed": len(inputs),
+                           "added": len(inputs), "removed": 0, "full": True}
+        return self
+
+    def update(self, df: pd.DataFrame) -> 'IncrementalScreener':
+        """Screen a new numeric snapshot (after to_num), reusing unchanged rows."""
+        cols = KEEP_COLS + [c for c in [EXPIRY_COL] if c in df.columns]
+        features = [c for c in FEATURE_COLS if c in df.columns]
+        keys = row_index(df)
+        inputs = df[cols].set_axis(keys)
+        # duplicate keys (e.g. several expiries without an Expiry column) cannot be diffed
+        if (self.prev is None or self.out is None or self.out.empty
+                or not inputs.index.is_unique or not inputs.columns.equals(self.prev.columns)
+                or features != self.features):
+            return self._full(df, inputs, features)
+
+        with stage('diff', rows=len(inputs)):
+            changed = changed_keys(self.prev, inputs, cols[1:])
+            removed = self.prev.index.difference(inputs.index)
+        stale = changed.append(removed)
+        self.last_stats = {"instruments": len(inputs), "recomputed": len(changed),
+                           "added": len(inputs.index.difference(self.prev.index)),
+                           "removed": len(removed), "full": False}
+        reordered = not inputs.index.equals(self.prev.index)
+        self.prev = inputs
+        if len(stale) == 0 and not reordered:
+            self.delta = (self.out.iloc[:0], stale)
+            self._set_features(df, keys)
+            return self
+
+        fresh = screen(df[keys.isin(changed)], self.params) if len(changed) else self.out.iloc[:0]
+        self.delta = (fresh, stale)
+        with stage('patch', rows=len(fresh)):
+            self._patch_out(stale, fresh, inputs.index)
+            # NIFTY/BANKNIFTY slice follows snapshot order; a two-key filter is cheap
+            self.df_top = self.out[self.out['Instrument'].isin(INDEX_INSTRUMENTS)].copy()
+            if len(stale):
+                self._patch_views(stale, fresh)
+            self._set_features(df, keys)
+        return self
+
+    # ---------- Patching ----------
+    def _set_features(self, df: pd.DataFrame, keys: pd.Index):
+        """Current FEATURE_COLS into every cached view (new frames; published ones stay as they were)."""
+        if not self.features:
+            return
+        values = df[self.features].set_axis(keys)
+
+        def put(view):
+            got = values.reindex(row_index(view))
+            return view.assign(**{c: got[c].to_numpy(dtype=float) for c in self.features})
+        self.out, self.df_top = put(self.out), put(self.df_top)
+        self.df_top10, self.df_all = put(self.df_top10), put(self.df_all)
+
+    def _patch_out(self, stale, fresh, order: pd.Index):
+        kept = self.out[~row_index(self.out).isin(stale)]
+        out = pd.concat([kept, fresh], ignore_index=True) if len(fresh) else kept
+        # restore snapshot order, as a full screen() would produce
+        rank = order.get_indexer(row_index(out))
+        self.out = out.iloc[np.argsort(rank, kind='stable')].reset_index(drop=True)
+
+    def _patch_views(self, stale, fresh):
+        fresh_rest = fresh[~fresh['Instrument'].isin(INDEX_INSTRUMENTS)]
+
+        # top 10: untouched unless a stale row was in it or a fresh row beats its 10th value
+        top = self.df_top10
+        floor = top['PotentialPoints'].min() if len(top) >= 10 else -np.inf
+        if (row_index(top).isin(stale).any()
+                or (fresh_rest['PotentialPoints'] >= floor).any()):
+            rest = self.out[~self.out['Instrument'].isin(INDEX_INSTRUMENTS)]
+            self.df_top10 = rest.dropna(subset=['PotentialPoints']).sort_values(
+                'PotentialPoints', ascending=False
+            ).head(10)
+
+        if isinstance(stale, pd.MultiIndex):
+            # several expiries share an Instrument, so rows cannot be spliced by Instrument
+            # alone; re-sort the way split_views does (stable, snapshot order within ties)
+            rest = self.out[~self.out['Instrument'].isin(INDEX_INSTRUMENTS)]
+            self.df_all = rest.sort_values(['Instrument','Category','Strategy'])
+            return
+        # all trades: one strategy per instrument, so the sort is by Instrument alone;
+        # splice fresh rows in at their searchsorted positions instead of re-sorting
+        remaining = self.df_all[~row_index(self.df_all).isin(stale)]
+        ins = fresh_rest.sort_values(['Instrument','Category','Strategy'])
+        pos = remaining['Instrument'].searchsorted(ins['Instrument'].to_numpy())
+        n_r, n_i = len(remaining), len(ins)
+        is_ins = np.zeros(n_r + n_i, dtype=bool)
+        is_ins[pos + np.arange(n_i)] = True
+        take = np.empty(n_r + n_i, dtype=np.intp)
+        take[is_ins] = n_r + np.arange(n_i)
+        take[~is_ins] = np.arange(n_r)
+        self.df_all = pd.concat([remaining, ins]).iloc[take]
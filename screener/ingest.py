@@ -0,0 +1,155 @@
+"""Schema-aware, low-memory ingestion of Sensibull CSV exports.
+
+SCHEMA declares every column the screener reads. Only those columns are
+parsed (usecols). NUM_COLS go straight to float64 in the C parser, so there
+is no object-typed intermediate and no to_num copy, and Instrument/Event are
+categoricals. The header is checked before any data is parsed: a missing
+column raises SchemaError naming it, instead of a KeyError deep in screen().
+
+Very large multi-snapshot exports (one block of rows per SnapshotTime, in
+order) can be streamed in chunks and screened one snapshot at a time:
+
+    for when, out in screen_stream('archive.csv', chunksize=200_000):
+        ...
+"""
+import numpy as np
+import pandas as pd
+
+from .core import EXPIRY_COL, FEATURE_COLS, KEEP_COLS, NUM_COLS, screen
+from .extract import map_header
+from .params import DEFAULT_PARAMS, ScreenerParams
+from .profiling import stage
+
+SNAPSHOT_COL = 'SnapshotTime'
+SCHEMA = {
+    **{c: 'float64' for c in NUM_COLS + FEATURE_COLS},
+    'Instrument': 'category',
+    'Event': 'category',
+    EXPIRY_COL: 'category',
+    SNAPSHOT_COL: 'category',   # grouping key; parse with pd.to_datetime if needed
+}
+REQUIRED_COLS = KEEP_COLS
+OPTIONAL_COLS = [EXPIRY_COL] + FEATURE_COLS + [SNAPSHOT_COL]
+NA_VALUES = ['-', '--']       # on top of pandas' defaults
+CHUNKSIZE = 100_000
+
+class SchemaError(ValueError):
+    """The CSV does not have the columns the screener needs."""
+
+def resolve_columns(header, columns=None, optional=OPTIONAL_COLS) -> dict:
+    """{raw header: schema column} for the wanted columns; raises SchemaError if any are missing.
+
+    Headers are matched like the live table's (case, spacing and display
+    aliases such as 'IVP' are accepted). The first of duplicate headers wins.
+    """
+    required = list(REQUIRED_COLS if columns is None else columns)
+    wanted = set(required) | set(optional or ())
+    mapping = {}
+    for raw in header:
+        name = map_header(str(raw))
+        if name in wanted and name not in mapping.values():
+            mapping[raw] = name
+    missing = [c for c in required if c not in mapping.values()]
+    if missing:
+        raise SchemaError(f"missing required column{'s' if len(missing) > 1 else ''} "
+                          f"{', '.join(missing)} (found: {', '.join(map(str, header)) or 'no header'})")
+    return mapping
+
+def _rewind(source):
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return source
+
+def read_header(source) -> list:
+    """Column names of a CSV path or seekable buffer, without parsing any rows."""
+    header = pd.read_csv(_rewind(source), nrows=0).columns.tolist()
+    _rewind(source)
+    return header
+
+def _read(source, mapping: dict, coerce: bool, **kwargs):
+    # coerce=True is the slow path for exports with non-numeric cells in numeric columns
+    dtype = {raw: ('object' if coerce and SCHEMA[name] == 'float64' else SCHEMA[name])
+             for raw, name in mapping.items()}
+    return pd.read_csv(_rewind(source), usecols=list(mapping), dtype=dtype,
+                       na_values=NA_VALUES, **kwargs)
+
+def _finish(df: pd.DataFrame, mapping: dict, coerce: bool) -> pd.DataFrame:
+    df = df.rename(columns=mapping)
+    if coerce:
+        for c in df.columns:
+            if SCHEMA[c] == 'float64' and df[c].dtype == object:
+                df[c] = pd.to_numeric(df[c], errors='coerce')
+    return df
+
+def read_snapshot(source, columns=None) -> pd.DataFrame:
+    """One Sensibull export (path or buffer) as a typed frame ready for screen().
+
+    columns: the required columns (default REQUIRED_COLS); Expiry,
+    FEATURE_COLS and SnapshotTime are also read when present.
+    """
+    with stage('read_csv') as rec:
+        mapping = resolve_columns(read_header(source), columns)
+        try:
+            df, coerce = _read(source, mapping, coerce=False), False
+        except ValueError:
+            df, coerce = _read(source, mapping, coerce=True), True
+        with stage('to_num'):
+            # numeric columns are typed by the parser; only exports with stray text need coercing
+            df = _finish(df, mapping, coerce)
+        rec.rows = len(df)
+    return df
+
+def iter_chunks(source, chunksize: int = CHUNKSIZE, columns=None):
+    """Typed frames of at most `chunksize` rows; the header is validated before the first."""
+    mapping = resolve_columns(read_header(source), columns)
+    done, coerce = 0, False
+    while True:
+        skip = range(1, done + 1) if done else None
+        try:
+            with _read(source, mapping, coerce, chunksize=chunksize, skiprows=skip) as reader:
+                for chunk in reader:
+                    with stage('read_chunk', rows=len(chunk)):
+                        chunk = _finish(chunk, mapping, coerce)
+                    done += len(chunk)
+                    yield chunk
+            return
+        except ValueError:
+            if coerce:
+                raise
+            coerce = True       # a bad numeric cell: re-open after the rows already yielded
+
+def iter_snapshots(source, chunksize: int = CHUNKSIZE, snapshot_col: str = SNAPSHOT_COL,
+                   columns=None):
+    """Yield (snapshot key, frame) per snapshot of a chunked export.
+
+    Rows of one snapshot must be contiguous. Without `snapshot_col` in the file
+    every chunk is yielded with key None (rows screen independently).
+    """
+    pending = None
+    seen = set()
+    for chunk in iter_chunks(source, chunksize, columns):
+        if snapshot_col not in chunk.columns:
+            yield None, chunk
+            continue
+        keys = chunk[snapshot_col].to_numpy()
+        cuts = np.concatenate([[0], np.flatnonzero(keys[1:] != keys[:-1]) + 1, [len(keys)]])
+        for a, b in zip(cuts[:-1], cuts[1:]):
+            part, key = chunk.iloc[a:b], keys[a]
+            if pending is not None and key == pending[0]:
+                pending = (key, pd.concat([pending[1], part], ignore_index=True))
+                continue
+            if pending is not None:
+                yield pending
+            if key in seen:
+                raise SchemaError(f"rows of snapshot {key!r} are not contiguous; "
+                                  f"sort the export by {snapshot_col}")
+            seen.add(key)
+            pending = (key, part.reset_index(drop=True))
+    if pending is not None:
+        yield pending
+
+def screen_stream(source, p: ScreenerParams = DEFAULT_PARAMS, chunksize: int = CHUNKSIZE,
+                  snapshot_col: str = SNAPSHOT_COL):
+    """Yield (snapshot key, screen() output) without loading the export whole."""
+    for key, df in iter_snapshots(source, chunksize, snapshot_col):
+        yield key, screen(df, p)
@@ -0,0 +1,149 @@
+"""Long-lived Selenium session for the Sensibull screener table.
+
+One Chrome instance is started per process and kept logged in, so refreshes
+only wait for the table element instead of fixed sleeps. Set SENSIBULL_URL
+(or pass url=) to point it at a local fixture server for offline testing;
+tests/fixtures/sensibull_page.html is a saved page source of the screener:
+
+    python -m http.server 8000 --directory tests/fixtures/
+    SENSIBULL_URL=http://localhost:8000/sensibull_page.html streamlit run LiveSensibullData.py
+
+selenium / webdriver_manager are imported lazily so the rest of the package
+stays importable without them.
+"""
+import os
+import threading
+import time
+import pandas as pd
+
+from .extract import extract_table
+from .profiling import stage
+
+SENSIBULL_URL = os.environ.get("SENSIBULL_URL", "https://web.sensibull.com/options-screener?view=table")
+TABLE_SELECTOR = "table"
+ROW_SELECTOR = "table tbody tr"
+
+_driver_path = None   # ChromeDriverManager().install() result, resolved once per process
+
+def _chromedriver_path() -> str:
+    global _driver_path
+    if _driver_path is None:
+        from webdriver_manager.chrome import ChromeDriverManager
+        _driver_path = ChromeDriverManager().install()
+    return _driver_path
+
+class LiveSession:
+    """Reusable, logged-in browser session on the screener page.
+
+    profile_dir keeps Chrome's cookies on disk so the manual login survives
+    restarts; headless only makes sense once that profile is logged in.
+    """
+
+    def __init__(self, url: str = SENSIBULL_URL, headless: bool = False,
+                 profile_dir: str = None, login_timeout: float = 300.0,
+                 load_timeout: float = 30.0, driver_path: str = None):
+        self.url = url
+        self.headless = headless
+        self.profile_dir = profile_dir
+        self.login_timeout = login_timeout
+        self.load_timeout = load_timeout
+        self.driver_path = driver_path
+        self.driver = None
+        self.last_fetch_seconds = None
+        self._lock = threading.Lock()   # one WebDriver, possibly many Streamlit sessions
+
+    # ---------- Lifecycle ----------
+    def start(self):
+        if self.driver is not None:
+            return self
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
+
+        chrome_options = Options()
+        if self.headless:
+            chrome_options.add_argument("--headless=new")
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        if self.profile_dir:
+            chrome_options.add_argument(f"--user-data-dir={self.profile_dir}")
+
+        service = Service(self.driver_path or _chromedriver_path())
+        self.driver = webdriver.Chrome(service=service, options=chrome_options)
+        self.driver.get(self.url)
+        # first load: wait for the manual login to finish and the table to render
+        self._wait_for_table(self.login_timeout)
+        return self
+
+    def close(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            finally:
+                self.driver = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def alive(self) -> bool:
+        if self.driver is None:
+            return False
+        try:
+            self.driver.current_url
+        except Exception:
+            return False
+        return True
+
+    # ---------- Table access ----------
+    def _wait_for_table(self, timeout: float):
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        WebDriverWait(self.driver, timeout).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, ROW_SELECTOR))
+        )
+        return self.driver.find_element(By.CSS_SELECTOR, TABLE_SELECTOR)
+
+    def table_html(self, reload: bool = False) -> str:
+        """outerHTML of the screener table, waiting only as long as the page needs."""
+        if not self.alive:
+            self.driver = None
+            self.start()
+        elif reload:
+            self.driver.refresh()
+        table = self._wait_for_table(self.load_timeout)
+        return table.get_attribute("outerHTML")
+
+    def fetch_table(self, reload: bool = False) -> pd.DataFrame:
+        """Current screener table with screener column names and typed NUM_COLS."""
+        t0 = time.perf_counter()
+        with self._lock, stage('fetch'):
+            html = self.table_html(reload=reload)
+        df = extract_table(html)
+        self.last_fetch_seconds = time.perf_counter() - t0
+        return df
+
+    def read(self) -> str:
+        """Raw table HTML; the source interface of screener.pipeline.LivePipeline."""
+        with self._lock:
+            return self.table_html()
+
+    def poll(self, interval: float, reload: bool = False, max_polls: int = None):
+        """Yield (timestamp, table) every `interval` seconds from the live page.
+
+        The page updates in place, so by default the table is re-read without a
+        reload; pass reload=True for sources that need one.
+        """
+        n = 0
+        while max_polls is None or n < max_polls:
+            started = time.monotonic()
+            yield pd.Timestamp.now(), self.fetch_table(reload=reload)
+            n += 1
+            if max_polls is not None and n >= max_polls:
+                break
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
@@ -0,0 +1,37 @@
+"""Tunable thresholds of the strategy rules."""
+from dataclasses import dataclass, fields
+
+@dataclass(frozen=True)
+class ScreenerParams:
+    # bias_from_pcr_maxpain: PCR below pcr_bull is bullish, above pcr_bear bearish
+    pcr_bull: float = 0.6
+    pcr_bear: float = 0.8
+    # bucket_iv: IV percentile bands, with absolute ATM IV bands as fallback
+    ivp_high: float = 70.0
+    ivp_low: float = 30.0
+    iv_high: float = 30.0
+    iv_low: float = 15.0
+    # neutral_range: half-width = max(min_pts, fut*base_pct) * (1 + ivp_widen*ivp/100)
+    neutral_base_pct: float = 0.004
+    neutral_min_pts: float = 1.0
+    neutral_ivp_widen: float = 1.0
+    ivp_fill: float = 50.0          # IVP assumed when missing
+    # directional_levels: stop at stop_frac of the MaxPain distance
+    stop_frac: float = 0.5
+    dir_fallback_pct: float = 0.005  # distance used when fut sits on MaxPain
+    # generate_strategies: share of potential taken per strategy family
+    debit_mult: float = 0.6
+    credit_mult: float = 0.4
+    condor_mult: float = 0.3
+    straddle_min_pct: float = 0.005
+    rr_risk_frac: float = 0.5        # fraction of the stop distance used as risk
+    # pricing: Black-76 premiums for the named legs replace the proxies when days_to_expiry > 0
+    days_to_expiry: float = 0.0
+    rate: float = 0.0                # annual risk-free rate for discounting
+    wing_steps: int = 2              # strikes between short and long legs of credit spreads/condors
+
+    @classmethod
+    def names(cls):
+        return [f.name for f in fields(cls)]
+
+DEFAULT_PARAMS = ScreenerParams()
@@ -0,0 +1,339 @@
+"""Background live pipeline: fetch -> parse -> screen -> publish on worker threads.
+
+Each stage runs on its own thread, linked to the next by a bounded queue.
+When a downstream stage falls behind, the oldest queued item is dropped:
+for live data only the newest table matters. The publish stage swaps one
+immutable LiveResult into `latest`. Any number of Streamlit sessions read it
+without fetching or screening anything themselves.
+
+Sources only need a read() method returning either page HTML (parsed with
+extract_table) or a frame. LiveSession provides one. ReplaySource replays
+saved tables (page sources, CSV exports or frames) for offline runs and tests:
+
+    pipe = LivePipeline(ReplaySource(['tests/fixtures/sensibull_page.html']), interval=1)
+    pipe.start(); ...; pipe.latest.out; pipe.metrics(); pipe.stop()
+"""
+import contextlib
+import itertools
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from .cache import frame_digest, params_digest
+from .core import to_num
+from .extract import extract_table
+from .history import InstrumentHistory
+from .ingest import read_snapshot
+from .incremental import IncrementalScreener
+from .params import DEFAULT_PARAMS, ScreenerParams
+from .profiling import CProfile, RunProfile, stage
+from .ranking import BOARD_KINDS, TopKRanker
+
+STAGES = ['fetch', 'parse', 'screen', 'publish']
+_STOP = object()
+_NO_PROFILE = contextlib.nullcontext()
+
+class ReplaySource:
+    """Stub source that returns saved tables (.html page sources or .csv exports) in turn."""
+
+    def __init__(self, tables, loop: bool = True, delay: float = 0.0):
+        self.tables = list(tables)
+        if not self.tables:
+            raise ValueError("ReplaySource needs at least one table")
+        self.loop = loop
+        self.delay = delay            # simulated page latency, seconds
+        self._it = itertools.cycle(self.tables) if loop else iter(self.tables)
+        self._lock = threading.Lock()
+
+    def read(self):
+        with self._lock:
+            item = next(self._it)     # StopIteration ends the pipeline's fetch loop
+        if self.delay:
+            time.sleep(self.delay)
+        if isinstance(item, pd.DataFrame):
+            return item.copy()
+        if str(item).lower().endswith('.csv'):
+            return read_snapshot(item)
+        with open(item, encoding='utf-8') as fh:
+            return fh.read()
+
+@dataclass(frozen=True)
+class LiveResult:
+    """One published snapshot; replaced wholesale, never mutated."""
+    version: int
+    time: pd.Timestamp
+    digest: str
+    out: pd.DataFrame
+    df_top: pd.DataFrame
+    df_top10: pd.DataFrame
+    df_all: pd.DataFrame
+    stats: dict
+    latency: dict                 # seconds per stage for this snapshot, plus 'total'
+    profile: RunProfile = None    # sub-stage timings, rows and memory of this snapshot
+    cprofile: str = None          # cProfile report when requested with profile_next()
+    ranked: dict = None           # {board kind: TopKRanker.leaderboard(kind)} when the pipeline ranks
+
+@dataclass
+class StageStats:
+    count: int = 0
+    errors: int = 0
+    dropped: int = 0              # items this stage could not hand downstream in time
+    last: float = None
+    mean: float = None            # exponentially weighted, alpha=0.2
+    max: float = 0.0
+    last_error: str = None
+
+    def record(self, seconds: float):
+        self.count += 1
+        self.last = seconds
+        self.mean = seconds if self.mean is None else 0.8 * self.mean + 0.2 * seconds
+        self.max = max(self.max, seconds)
+
+    def fail(self, e: Exception):
+        self.errors += 1
+        self.last_error = f"{type(e).__name__}: {e}"
+
+@dataclass
+class _Item:
+    started: float
+    time: pd.Timestamp
+    payload: object
+    latency: dict = field(default_factory=dict)
+    profile: RunProfile = None
+    cprofile: CProfile = None
+
+class LivePipeline:
+    """Fetch every `interval` seconds and keep `latest` screened; see the module docstring.
+
+    A ranker (TopKRanker) is updated in the screen stage and its leaderboards
+    published as LiveResult.ranked. store (a SnapshotStore) and on_publish
+    callbacks run in the publish stage, so slow disk or alert I/O never delays
+    fetching. Every snapshot carries a
+    RunProfile of its sub-stages, also logged at DEBUG on 'screener.profile';
+    memory deltas are process-wide, so they include the other stage threads.
+    """
+
+    def __init__(self, source, interval: float = 30.0, p: ScreenerParams = DEFAULT_PARAMS,
+                 queue_size: int = 2, history: InstrumentHistory = None, store=None,
+                 on_publish=None, ranker: TopKRanker = None):
+        self.source = source
+        self.interval = interval
+        self.params = p
+        self.history = history if history is not None else InstrumentHistory()
+        self.store = store
+        self.on_publish = list(on_publish or [])
+        self.ranker = ranker
+        self.queue_size = queue_size
+        self.queues = {s: queue.Queue(maxsize=queue_size) for s in STAGES[1:]}
+        self.stages = {s: StageStats() for s in STAGES}
+        self.latest = None
+        self._inc = IncrementalScreener(p)
+        self._last_digest = None
+        self._version = 0
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._cprofile_next = False
+
+    # ---------- Lifecycle ----------
+    @property
+    def running(self) -> bool:
+        return any(t.is_alive() for t in self._threads)
+
+    def start(self) -> 'LivePipeline':
+        if self.running:
+            return self
+        self._stop.clear()
+        self.queues = {s: queue.Queue(maxsize=self.queue_size) for s in STAGES[1:]}
+        targets = {'fetch': self._fetch_loop, 'parse': self._parse, 'screen': self._screen,
+                   'publish': self._publish}
+        self._threads = []
+        for name in STAGES:
+            if name == 'fetch':
+                t = threading.Thread(target=targets[name], name='pipeline-fetch', daemon=True)
+            else:
+                t = threading.Thread(target=self._worker, args=(name, targets[name]),
+                                     name=f'pipeline-{name}', daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        self._put('parse', _STOP)
+        for t in self._threads:
+            t.join(timeout)
+
+    def fetch_now(self):
+        """Skip the rest of the current wait and fetch immediately."""
+        self._wake.set()
+
+    def profile_next(self):
+        """cProfile the parse and screen stages of the next fetched snapshot."""
+        self._cprofile_next = True
+
+    def set_params(self, p: ScreenerParams):
+        """Screen later snapshots with p (the next one is a full screen).
+
+        Safe from any thread: the screen stage swaps its screener and re-targets
+        the ranker itself, before its next snapshot. Setting the current params
+        again is a no-op.
+        """
+        with self._lock:
+            if p != self.params:
+                self.params = p
+                self._last_digest = None       # re-screen the current table even if it is unchanged
+
+    def wait_for(self, version: int = 1, timeout: float = None) -> LiveResult:
+        """Block until a result with at least `version` is published (for scripts/tests)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.latest is None or self.latest.version < version:
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"no result with version >= {version} after {timeout}s")
+            time.sleep(0.01)
+        return self.latest
+
+    # ---------- Queues ----------
+    def _put(self, stage: str, item):
+        q = self.queues[stage]
+        while True:
+            try:
+                q.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    dropped = q.get_nowait()      # keep the newest tables flowing
+                except queue.Empty:
+                    continue
+                if dropped is _STOP:
+                    item = _STOP                  # shutting down: keep the marker instead
+                else:
+                    self.stages[STAGES[STAGES.index(stage) - 1]].dropped += 1
+
+    def _worker(self, name: str, handle):
+        q = self.queues[name]
+        nxt = STAGES[STAGES.index(name) + 1] if name != STAGES[-1] else None
+        while True:
+            item = q.get()
+            if item is _STOP:
+                if nxt:
+                    self._put(nxt, _STOP)
+                return
+            t0 = time.perf_counter()
+            try:
+                # the cProfile report is taken while publishing, so publish itself is not in it
+                capture = item.cprofile if item.cprofile and nxt else _NO_PROFILE
+                with item.profile.activate(), stage(name), capture:
+                    result = handle(item)
+            except Exception as e:
+                self.stages[name].fail(e)
+                continue
+            seconds = time.perf_counter() - t0
+            self.stages[name].record(seconds)
+            if nxt is None:
+                item.profile.log(level=logging.DEBUG, version=self._version)
+            if result is None:
+                continue
+            result.latency[name] = seconds
+            if nxt:
+                self._put(nxt, result)
+
+    # ---------- Stages ----------
+    def _fetch_loop(self):
+        stats = self.stages['fetch']
+        while not self._stop.is_set():
+            started = time.monotonic()
+            prof = RunProfile('live')
+            t0 = time.perf_counter()
+            try:
+                with prof.activate(), stage('fetch'):
+                    raw = self.source.read()
+            except StopIteration:
+                break
+            except Exception as e:
+                stats.fail(e)
+            else:
+                seconds = time.perf_counter() - t0
+                stats.record(seconds)
+                item = _Item(t0, pd.Timestamp.now(), raw, {'fetch': seconds}, prof)
+                if self._cprofile_next:
+                    self._cprofile_next = False
+                    item.cprofile = CProfile()
+                self._put('parse', item)
+            self._wake.wait(max(0.0, self.interval - (time.monotonic() - started)))
+            self._wake.clear()
+        self._put('parse', _STOP)
+
+    def _parse(self, item: _Item):
+        raw = item.payload
+        df = extract_table(raw) if isinstance(raw, str) else to_num(raw.copy())
+        digest = frame_digest(df)
+        if digest == self._last_digest:
+            return None                           # unchanged table: nothing to re-screen
+        self._last_digest = digest
+        item.payload = (digest, df)
+        return item
+
+    def _screen(self, item: _Item):
+        digest, df = item.payload
+        with self._lock:
+            p = self.params
+        if self._inc.params != p:
+            # the screener and ranker are only touched on this thread
+            self._inc = IncrementalScreener(p)
+            if self.ranker is not None:
+                self.ranker.params = p         # the new screener's first update is full: every row is re-scored
+        inc = self._inc
+        self.history.append(df, item.time)
+        df = self.history.annotate(df)
+        inc.update(df)
+        ranked = None
+        if self.ranker is not None:
+            with stage('rank', rows=len(inc.out)):
+                self.ranker.update(inc.out, inc.delta)
+                ranked = {kind: self.ranker.leaderboard(kind) for kind in BOARD_KINDS}
+        item.payload = (digest, p, df, inc.out, inc.df_top, inc.df_top10, inc.df_all,
+                        dict(inc.last_stats), ranked)
+        return item
+
+    def _publish(self, item: _Item):
+        digest, p, df, out, df_top, df_top10, df_all, stats, ranked = item.payload
+        self._version += 1
+        item.latency['total'] = time.perf_counter() - item.started
+        result = LiveResult(self._version, item.time, digest, out, df_top, df_top10, df_all,
+                            stats, dict(item.latency), item.profile,
+                            item.cprofile.report() if item.cprofile else None, ranked)
+        self.latest = result                      # atomic reference swap
+        # the result is already live: a failed write or callback is counted, not fatal
+        if self.store is not None and not df.empty:
+            try:
+                # the whole snapshot, so instruments without a strategy keep their history
+                self.store.write(out, when=item.time, source='live', digest=params_digest(digest, p),
+                                 snapshot=df)
+            except Exception as e:
+                self.stages['publish'].fail(e)
+        for callback in self.on_publish:
+            try:
+                callback(result)
+            except Exception as e:
+                self.stages['publish'].fail(e)
+        return None
+
+    # ---------- Monitoring ----------
+    def metrics(self) -> pd.DataFrame:
+        """One row per stage: calls, errors, drops, last/mean/max seconds and input queue depth."""
+        rows = []
+        for name in STAGES:
+            s = self.stages[name]
+            q = self.queues.get(name)
+            rows.append({"Stage": name, "Count": s.count, "Errors": s.errors, "Dropped": s.dropped,
+                         "LastSeconds": s.last, "MeanSeconds": s.mean, "MaxSeconds": s.max,
+                         "QueueDepth": q.qsize() if q is not None else None,
+                         "LastError": s.last_error})
+        return pd.DataFrame(rows)
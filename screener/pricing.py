@@ -0,0 +1,230 @@
+"""Black-76 pricing of the option legs behind each screened strategy.
+
+Every strategy is expanded into (up to) four legs on the instrument's strike
+grid, in the same shape as its TradeDetails text:
+
+    Bull Call Spread          +CE ATM, -CE at MaxPain
+    Bear Put Spread           +PE ATM, -PE at MaxPain
+    Long Straddle             +CE ATM, +PE ATM
+    Bull Put Spread (Credit)  -PE at the neutral low, +PE wing_steps lower
+    Bear Call Spread (Credit) -CE at the neutral high, +CE wing_steps higher
+    Iron Condor               both credit spreads
+
+All legs of all rows are priced in one batched Black-76 call on FuturePrice
+with ATMIV as the volatility of every strike (no smile). Net premium, greeks,
+max profit/loss and breakevens then come from the legs, per unit of the
+underlying (multiply by lot size for rupees).
+
+Time to expiry is taken per row from the Expiry column when the frame has
+one (expiring at EXPIRY_TIME on that date); p.days_to_expiry covers frames
+without it and rows whose Expiry does not parse.
+"""
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+
+from .core import EXPIRY_COL, PRICING_COLS
+from .engine import LEAF_STRATEGY, neutral_range_vec, round2
+from .params import DEFAULT_PARAMS, ScreenerParams
+
+# Exchange strike intervals; other instruments fall back to price bands
+STRIKE_STEPS = {'NIFTY': 50.0, 'BANKNIFTY': 100.0, 'FINNIFTY': 50.0, 'MIDCPNIFTY': 25.0}
+STEP_BANDS = [(250.0, 2.5), (500.0, 5.0), (1000.0, 10.0), (2500.0, 20.0),
+              (5000.0, 50.0), (np.inf, 100.0)]
+
+N_LEGS = 4
+INV_SQRT_2PI = 1.0 / np.sqrt(2.0 * np.pi)
+EXPIRY_TIME = pd.Timedelta(hours=15, minutes=30)     # NSE F&O expiry, exchange local time
+
+def strike_step(instruments, fut) -> np.ndarray:
+    """Strike interval per row: STRIKE_STEPS by name, else by price band."""
+    fut = np.asarray(fut, dtype=float)
+    bounds = np.array([b for b, _ in STEP_BANDS])
+    steps = np.array([s for _, s in STEP_BANDS])
+    band = steps[np.minimum(np.searchsorted(bounds, fut, side='right'), len(steps) - 1)]
+    named = pd.Series(instruments).map(STRIKE_STEPS).to_numpy(dtype=float)
+    return np.where(np.isfinite(named), named, band)
+
+def black76(fut, strike, vol, t, is_call, rate: float = 0.0) -> dict:
+    """Batched Black-76 price and greeks; vol and t in years (arrays broadcast).
+
+    theta is per calendar day, vega per 1 vol point.
+    """
+    fut, strike, vol, t = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (fut, strike, vol, t)))
+    df = np.exp(-rate * t)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sd = vol * np.sqrt(t)
+        d1 = (np.log(fut / strike) + 0.5 * sd * sd) / sd
+        d2 = d1 - sd
+        pdf = np.exp(-0.5 * d1 * d1) * INV_SQRT_2PI
+        nd1, nd2 = ndtr(d1), ndtr(d2)
+        call = df * (fut * nd1 - strike * nd2)
+        put = df * (strike * (1.0 - nd2) - fut * (1.0 - nd1))
+        price = np.where(is_call, call, put)
+        delta = np.where(is_call, df * nd1, df * (nd1 - 1.0))
+        gamma = df * pdf / (fut * sd)
+        vega = df * fut * pdf * np.sqrt(t) / 100.0
+        theta = (-df * fut * pdf * vol / (2.0 * np.sqrt(t)) + rate * price) / 365.0
+    return {"price": price, "delta": delta, "gamma": gamma, "theta": theta, "vega": vega}
+
+def expiry_days(out: pd.DataFrame, p: ScreenerParams = DEFAULT_PARAMS, now=None) -> np.ndarray:
+    """Calendar days to expiry per row, as of `now` (default: the current time).
+
+    From the Expiry column when present, else p.days_to_expiry. Rows already
+    past their expiry get NaN (they are not priced).
+    """
+    days = np.full(len(out), float(p.days_to_expiry))
+    if EXPIRY_COL not in out.columns:
+        return days
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    text = out[EXPIRY_COL].astype(str)
+    uniq = text.unique()
+    # parse each distinct expiry once; a snapshot has only a handful
+    parsed = pd.to_datetime(pd.Series(uniq), errors='coerce', format='mixed')
+    left = ((parsed.dt.normalize() + EXPIRY_TIME - now) / pd.Timedelta(days=1)).to_numpy(dtype=float)
+    per_row = left[pd.Index(uniq).get_indexer(text)]
+    days = np.where(np.isnan(per_row), days, per_row)
+    return np.where(days > 0, days, np.nan)
+
+def strategy_legs(out: pd.DataFrame, p: ScreenerParams = DEFAULT_PARAMS):
+    """(strike, is_call, qty) arrays of shape (rows, N_LEGS); qty 0 marks an unused slot."""
+    fut = out['FuturePrice'].to_numpy(dtype=float, na_value=np.nan)
+    maxpain = out['MaxPain'].to_numpy(dtype=float, na_value=np.nan)
+    ivp = out['IVPercentile'].to_numpy(dtype=float, na_value=np.nan)
+    leaf = pd.Series(out['Strategy'].astype(str).to_numpy()).map(
+        {name: i for i, name in enumerate(LEAF_STRATEGY)}).to_numpy(dtype=float, na_value=-1).astype(int)
+    step = strike_step(out['Instrument'].astype(str).to_numpy(), fut)
+    n_lo, n_hi, _ = neutral_range_vec(fut, maxpain, np.where(np.isfinite(ivp), ivp, p.ivp_fill), p)
+
+    atm = np.round(fut / step) * step
+    tgt = np.round(maxpain / step) * step
+    call_tgt = np.where(tgt > atm, tgt, atm + step)      # the short leg must be OTM
+    put_tgt = np.where(tgt < atm, tgt, atm - step)
+    short_pe = np.floor(n_lo / step) * step
+    short_ce = np.ceil(n_hi / step) * step
+    wing = p.wing_steps * step
+    long_pe = short_pe - wing
+    long_ce = short_ce + wing
+
+    n = len(out)
+    strike = np.tile(fut[:, None], (1, N_LEGS))
+    is_call = np.zeros((n, N_LEGS), dtype=bool)
+    qty = np.zeros((n, N_LEGS))
+    legs = {  # leaf -> [(strike, is_call, qty), ...]
+        0: [(atm, True, 1), (call_tgt, True, -1)],
+        1: [(atm, False, 1), (put_tgt, False, -1)],
+        2: [(atm, True, 1), (atm, False, 1)],
+        3: [(short_pe, False, -1), (long_pe, False, 1)],
+        4: [(short_ce, True, -1), (long_ce, True, 1)],
+        5: [(short_pe, False, -1), (long_pe, False, 1), (short_ce, True, -1), (long_ce, True, 1)],
+    }
+    for k, spec in legs.items():
+        m = leaf == k
+        for j, (k_strike, call, q) in enumerate(spec):
+            strike[m, j] = k_strike[m]
+            is_call[m, j] = call
+            qty[m, j] = q
+    # no strikes at or below zero: such legs are dropped
+    qty = np.where(strike > 0, qty, 0.0)
+    return strike, is_call, qty
+
+def _payoff(s, strike, is_call, qty, net):
+    """Expiry P&L at underlying price(s) s, shape (rows, points)."""
+    intrinsic = np.where(is_call[:, None, :], np.maximum(s[:, :, None] - strike[:, None, :], 0.0),
+                         np.maximum(strike[:, None, :] - s[:, :, None], 0.0))
+    return (intrinsic * qty[:, None, :]).sum(axis=2) - net[:, None]
+
+def price_strategies(out: pd.DataFrame, p: ScreenerParams = DEFAULT_PARAMS,
+                     days_to_expiry=None, now=None) -> pd.DataFrame:
+    """PRICING_COLS for each strategy row of a screened frame, plus the legs as text.
+
+    days_to_expiry (scalar or per row) overrides expiry_days(out, p, now).
+    NetPremium is positive for a debit and negative for a credit. MaxProfit is
+    inf for the straddle. Breakevens are the expiry P&L zero crossings nearest
+    below/above FuturePrice (NaN when there is none on that side).
+    """
+    days = expiry_days(out, p, now) if days_to_expiry is None else days_to_expiry
+    fut = out['FuturePrice'].to_numpy(dtype=float, na_value=np.nan)
+    vol = out['ATMIV'].to_numpy(dtype=float, na_value=np.nan) / 100.0
+    t = np.broadcast_to(np.asarray(days, dtype=float), fut.shape) / 365.0
+    strike, is_call, qty = strategy_legs(out, p)
+
+    g = black76(fut[:, None], strike, vol[:, None], t[:, None], is_call, p.rate)
+    used = qty != 0
+    res = {"NetPremium": np.where(used, g["price"] * qty, 0.0).sum(axis=1)}
+    for name in ('delta', 'gamma', 'theta', 'vega'):
+        res[name.capitalize()] = np.where(used, g[name] * qty, 0.0).sum(axis=1)
+    net = res["NetPremium"]
+
+    # expiry P&L is piecewise linear: extremes sit on the strikes, at zero, or in the call tail
+    far = 2.0 * np.nanmax(np.where(used, strike, 0.0), axis=1, initial=0.0) + 2.0 * np.abs(net)
+    knots = np.sort(np.column_stack([np.zeros_like(fut), np.where(used, strike, fut[:, None]), far]), axis=1)
+    pnl = _payoff(knots, strike, is_call, qty, net)
+    tail = (qty * is_call).sum(axis=1)                      # P&L slope as price -> inf
+    res["MaxProfit"] = np.where(tail > 0, np.inf, pnl.max(axis=1))
+    res["MaxLoss"] = np.where(tail < 0, np.inf, -pnl.min(axis=1))
+
+    # zero crossings between consecutive knots
+    x0, x1, y0, y1 = knots[:, :-1], knots[:, 1:], pnl[:, :-1], pnl[:, 1:]
+    cross = (np.sign(y0) != np.sign(y1)) & (y0 != y1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        root = np.where(cross, x0 - y0 * (x1 - x0) / (y1 - y0), np.nan)
+    below = np.where(root <= fut[:, None], root, -np.inf).max(axis=1)
+    above = np.where(root > fut[:, None], root, np.inf).min(axis=1)
+    res["LowerBreakeven"] = np.where(np.isfinite(below), below, np.nan)
+    res["UpperBreakeven"] = np.where(np.isfinite(above), above, np.nan)
+
+    priced = pd.DataFrame({c: res[c] for c in PRICING_COLS}, index=out.index)
+    priced['Legs'] = legs_text(strike, is_call, qty, g["price"])
+    return priced
+
+def legs_text(strike, is_call, qty, price) -> np.ndarray:
+    """'Buy 24500 CE @ 120.35, Sell 24700 CE @ 48.10' per row."""
+    text = np.full(len(strike), "", dtype=object)
+    for j in range(strike.shape[1]):
+        used = qty[:, j] != 0
+        if not used.any():
+            continue
+        leg = np.char.add(np.where(qty[used, j] > 0, "Buy ", "Sell "),
+                          np.char.mod('%g', strike[used, j]))
+        leg = np.char.add(leg, np.where(is_call[used, j], " CE @ ", " PE @ "))
+        leg = np.char.add(leg, np.char.mod('%.2f', price[used, j]))
+        sep = np.where(text[used] == "", "", ", ")
+        text[used] = np.char.add(np.char.add(text[used].astype(str), sep), leg)
+    return text
+
+def expected_move(out: pd.DataFrame, days) -> np.ndarray:
+    """One-standard-deviation move of the future by expiry: F * ATMIV * sqrt(T)."""
+    fut = out['FuturePrice'].to_numpy(dtype=float, na_value=np.nan)
+    vol = out['ATMIV'].to_numpy(dtype=float, na_value=np.nan) / 100.0
+    return fut * vol * np.sqrt(np.asarray(days, dtype=float) / 365.0)
+
+def apply_pricing(out: pd.DataFrame, p: ScreenerParams = DEFAULT_PARAMS, now=None) -> pd.DataFrame:
+    """Screened frame with priced legs in place of the MaxPain-distance proxies.
+
+    Rows that price (finite FuturePrice/ATMIV, not expired) get real
+    TradeDetails and PotentialPoints = MaxProfit, RiskReward =
+    PotentialPoints / MaxLoss. The straddle's profit is unbounded, so its
+    PotentialPoints is the one-sigma expected move (expected_move) minus the
+    debit. An ATM straddle costs about 0.8 of that move, so this stays
+    positive where the MaxPain-distance proxy minus the debit was mostly 0.
+    PRICING_COLS are appended.
+    """
+    days = expiry_days(out, p, now)
+    priced = price_strategies(out, p, days_to_expiry=days)
+    out = out.copy()
+    ok = np.isfinite(priced['NetPremium'].to_numpy()) & np.isfinite(priced['MaxLoss'].to_numpy())
+    profit = priced['MaxProfit'].to_numpy()
+    pot = out['PotentialPoints'].to_numpy(dtype=float)
+    straddle = ~np.isfinite(profit)
+    profit = np.where(straddle, np.maximum(expected_move(out, days) - priced['NetPremium'].to_numpy(), 0.0),
+                      profit)
+    loss = priced['MaxLoss'].to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rr = np.where(loss > 0, profit / loss, 0.0)
+    out['PotentialPoints'] = np.where(ok, round2(profit), pot)
+    out['RiskReward'] = np.where(ok, round2(rr), out['RiskReward'].to_numpy(dtype=float))
+    out['TradeDetails'] = np.where(ok, priced['Legs'].to_numpy(), out['TradeDetails'].to_numpy())
+    for c in PRICING_COLS:
+        out[c] = priced[c].to_numpy()
+    return out
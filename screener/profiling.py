@@ -0,0 +1,206 @@
+"""Per-stage wall time, row counts and memory deltas for one screener run, plus opt-in cProfile.
+
+Library code marks its stages with stage(). A stage costs one context-variable
+lookup unless a RunProfile is active in the current context:
+
+    prof = RunProfile('upload')
+    with prof.activate():
+        out = screen(to_num(pd.read_csv(path)))
+    prof.frame()      # Stage, Depth, Seconds, Rows, MemDeltaMB, MemPeakMB
+    prof.log()        # one JSON record per stage on the 'screener.profile' logger
+
+Stages nest ('screen/merge'). memory='rss' reports process resident-size
+deltas (cheap, process-wide); memory='trace' uses tracemalloc for exact
+Python/numpy allocation deltas and peaks, at a large cost in speed.
+A RunProfile records one thread's stages at a time.
+"""
+import contextvars
+import cProfile
+import functools
+import io
+import json
+import logging
+import os
+import pstats
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+LOGGER = logging.getLogger('screener.profile')
+PROFILE_COLS = ['Stage', 'Depth', 'Seconds', 'Rows', 'MemDeltaMB', 'MemPeakMB']
+_ACTIVE = contextvars.ContextVar('screener_profile', default=None)
+_MB = 1024.0 * 1024.0
+
+def rss_bytes() -> int:
+    """Resident set size of this process, or None where it cannot be read cheaply."""
+    try:
+        with open('/proc/self/statm', 'rb') as fh:
+            return int(fh.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+@dataclass
+class StageRecord:
+    name: str
+    depth: int = 0
+    seconds: float = 0.0
+    rows: int = None
+    mem_delta: int = None         # bytes, end - start
+    mem_peak: int = None          # bytes above the start (memory='trace' only)
+    _peak: int = field(default=0, repr=False)
+
+class RunProfile:
+    """Stage records of one run; see the module docstring."""
+
+    def __init__(self, name: str = 'run', memory: str = 'rss'):
+        if memory not in ('rss', 'trace', None):
+            raise ValueError(f"memory must be 'rss', 'trace' or None, not {memory!r}")
+        self.name = name
+        self.memory = memory
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started = pd.Timestamp.now()
+        self.records = []
+        self._stack = []
+
+    @contextmanager
+    def activate(self):
+        """Make this the profile that stage() records into, for the enclosed block."""
+        own_trace = self.memory == 'trace' and not tracemalloc.is_tracing()
+        if own_trace:
+            tracemalloc.start()
+        token = _ACTIVE.set(self)
+        try:
+            yield self
+        finally:
+            _ACTIVE.reset(token)
+            if own_trace:
+                tracemalloc.stop()
+
+    def _mem(self):
+        if self.memory == 'rss':
+            return rss_bytes()
+        if self.memory == 'trace' and tracemalloc.is_tracing():
+            return tracemalloc.get_traced_memory()[0]
+        return None
+
+    @contextmanager
+    def stage(self, name: str, rows: int = None):
+        parent = self._stack[-1] if self._stack else None
+        rec = StageRecord(f"{parent.name}/{name}" if parent else name, depth=len(self._stack), rows=rows)
+        self.records.append(rec)
+        tracing = self.memory == 'trace' and tracemalloc.is_tracing()
+        if tracing:
+            # the parent's peak so far would be lost by the reset below
+            if parent is not None:
+                parent._peak = max(parent._peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        m0 = self._mem()
+        self._stack.append(rec)
+        t0 = time.perf_counter()
+        try:
+            yield rec
+        finally:
+            rec.seconds = time.perf_counter() - t0
+            self._stack.pop()
+            m1 = self._mem()
+            if m0 is not None and m1 is not None:
+                rec.mem_delta = m1 - m0
+            if tracing:
+                rec._peak = max(rec._peak, tracemalloc.get_traced_memory()[1])
+                rec.mem_peak = rec._peak - m0
+                if parent is not None:
+                    parent._peak = max(parent._peak, rec._peak)
+
+    # ---------- Output ----------
+    @property
+    def seconds(self) -> float:
+        """Wall time of the top-level stages."""
+        return sum(r.seconds for r in self.records if r.depth == 0)
+
+    def frame(self) -> pd.DataFrame:
+        rows = [(r.name, r.depth, r.seconds, r.rows,
+                 None if r.mem_delta is None else r.mem_delta / _MB,
+                 None if r.mem_peak is None else r.mem_peak / _MB) for r in self.records]
+        return pd.DataFrame(rows, columns=PROFILE_COLS)
+
+    def records_json(self, **extra) -> list:
+        """One flat dict per stage, tagged with the run, for structured logs."""
+        base = {"run": self.name, "run_id": self.run_id, "started": self.started.isoformat(), **extra}
+        return [{**base, "stage": r.name, "depth": r.depth, "seconds": round(r.seconds, 6),
+                 "rows": r.rows, "mem_delta_bytes": r.mem_delta, "mem_peak_bytes": r.mem_peak}
+                for r in self.records]
+
+    def log(self, logger: logging.Logger = None, level: int = logging.INFO, **extra):
+        logger = logger or LOGGER
+        for rec in self.records_json(**extra):
+            logger.log(level, json.dumps(rec))
+
+    def write_jsonl(self, fh, **extra):
+        """Append the stage records as JSON lines to an open text stream."""
+        for rec in self.records_json(**extra):
+            fh.write(json.dumps(rec) + '\n')
+
+def stage(name: str, rows: int = None):
+    """Record the enclosed block as a stage of the active RunProfile (no-op without one).
+
+    Yields the StageRecord; set .rows inside the block when it is only known there.
+    """
+    prof = _ACTIVE.get()
+    if prof is None:
+        return nullcontext(StageRecord(name))
+    return prof.stage(name, rows)
+
+def staged(name: str):
+    """Decorator form of stage() for a whole function.
+
+    Rows is the length of the returned frame, else of the frame passed first.
+    """
+    def wrap(fn):
+        @functools.wraps(fn)
+        def run(*args, **kwargs):
+            if _ACTIVE.get() is None:
+                return fn(*args, **kwargs)
+            with stage(name) as rec:
+                result = fn(*args, **kwargs)
+                for obj in (result, args[0] if args else None):
+                    if isinstance(obj, pd.DataFrame):
+                        rec.rows = len(obj)
+                        break
+            return result
+        return run
+    return wrap
+
+def active_profile() -> RunProfile:
+    return _ACTIVE.get()
+
+# ---------- cProfile ----------
+class CProfile:
+    """Opt-in cProfile capture of one run (this thread only): `with CProfile() as cp: ...`."""
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def __enter__(self):
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self.profile.disable()
+
+    def report(self, sort: str = 'cumulative', limit: int = 30) -> str:
+        buf = io.StringIO()
+        pstats.Stats(self.profile, stream=buf).strip_dirs().sort_stats(sort).print_stats(limit)
+        return buf.getvalue()
+
+    def dump(self, path: str):
+        """Write raw stats for snakeviz / pstats."""
+        self.profile.dump_stats(path)
@@ -0,0 +1,246 @@
+"""Composite-score ranking of screened strategies with incremental per-group top-K.
+
+Rows are keyed by (Instrument, Expiry), so every expiry of an instrument is
+ranked on its own; without an Expiry column the n-th row of an instrument
+gets expiry key n. Each row's score depends only on that row:
+
+    Score = rr * min(RiskReward / rr_cap, 1)
+          + potential * min(PotentialPoints / FuturePrice * 100 / potential_cap, 1)
+          + regime * fit of the strategy to the IV regime (bucket_iv): debit
+                     strategies score 1 in LOW IV, credit ones in HIGH, 0.5 in MEDIUM
+          + pcr * min(|PCR - 1| / pcr_cap, 1)
+
+Boards hold the top K rows per Category and per index group (INDEX_GROUPS,
+everything else is OTHER). Each board keeps a lazy-deletion heap of all its
+rows and a cached top K, rebuilt only when a change can reach it. Fed the
+IncrementalScreener's delta, a snapshot only scores the re-screened rows and
+only pushes those whose score or board changed, so it costs
+O(changes * log n) instead of a sort of the whole universe:
+
+    inc.update(df)
+    ranker.update(inc.out, inc.delta)
+    ranker.leaderboard('Category')
+"""
+import heapq
+import itertools
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .core import EXPIRY_COL, INDEX_INSTRUMENTS
+from .engine import bucket_iv_vec
+from .params import DEFAULT_PARAMS, ScreenerParams
+
+INDEX_GROUPS = {'INDEX': INDEX_INSTRUMENTS}
+OTHER_GROUP = 'OTHER'
+BOARD_KINDS = ['Category', 'Group']
+DEBIT_STRATEGIES = ['Bull Call Spread', 'Bear Put Spread', 'Long Straddle']
+CREDIT_STRATEGIES = ['Bull Put Spread (Credit)', 'Bear Call Spread (Credit)', 'Iron Condor']
+
+@dataclass(frozen=True)
+class RankWeights:
+    rr: float = 0.4
+    potential: float = 0.3
+    regime: float = 0.2
+    pcr: float = 0.1
+    # values at or beyond a cap earn the full weight
+    rr_cap: float = 3.0
+    potential_cap: float = 2.0       # PotentialPoints as % of FuturePrice
+    pcr_cap: float = 0.5
+
+DEFAULT_WEIGHTS = RankWeights()
+
+def _capped(x, cap: float) -> np.ndarray:
+    return np.clip(np.nan_to_num(x / cap, nan=0.0, posinf=1.0, neginf=0.0), 0.0, 1.0)
+
+def composite_score(out: pd.DataFrame, w: RankWeights = DEFAULT_WEIGHTS,
+                    p: ScreenerParams = DEFAULT_PARAMS) -> np.ndarray:
+    """Score of every row of a screened frame (higher is better)."""
+    fut = out['FuturePrice'].to_numpy(dtype=float, na_value=np.nan)
+    pot = out['PotentialPoints'].to_numpy(dtype=float, na_value=np.nan)
+    rr = out['RiskReward'].to_numpy(dtype=float, na_value=np.nan)
+    pcr = out['PCR'].to_numpy(dtype=float, na_value=np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pot_pct = np.where(fut > 0, pot / fut * 100.0, np.nan)
+    regime = bucket_iv_vec(out['IVPercentile'].to_numpy(dtype=float, na_value=np.nan),
+                           out['ATMIV'].to_numpy(dtype=float, na_value=np.nan), p)
+    debit = out['Strategy'].isin(DEBIT_STRATEGIES).to_numpy()
+    credit = out['Strategy'].isin(CREDIT_STRATEGIES).to_numpy()
+    fit = np.select([regime == 'MEDIUM', debit & (regime == 'LOW'), credit & (regime == 'HIGH')],
+                    [0.5, 1.0, 1.0], default=0.0)
+    return (w.rr * _capped(rr, w.rr_cap) + w.potential * _capped(pot_pct, w.potential_cap)
+            + w.regime * fit + w.pcr * _capped(np.abs(pcr - 1.0), w.pcr_cap))
+
+def row_keys(out: pd.DataFrame) -> pd.MultiIndex:
+    """(Instrument, Expiry) per row; the row's occurrence number stands in for a missing Expiry."""
+    inst = out['Instrument'].to_numpy(dtype=object)
+    if EXPIRY_COL in out.columns:
+        expiry = out[EXPIRY_COL].astype(str).to_numpy(dtype=object)
+    else:
+        expiry = pd.Series(inst).groupby(inst, sort=False).cumcount().astype(str).to_numpy(dtype=object)
+    return pd.MultiIndex.from_arrays([inst, expiry], names=['Instrument', EXPIRY_COL])
+
+def index_group(instruments, groups: dict = None) -> np.ndarray:
+    """Group name of every instrument: the INDEX_GROUPS entry listing it, else OTHER."""
+    groups = INDEX_GROUPS if groups is None else groups
+    instruments = np.asarray(instruments, dtype=object)
+    res = np.full(len(instruments), OTHER_GROUP, dtype=object)
+    for name, members in reversed(list(groups.items())):   # the first listing group wins
+        res[np.isin(instruments, list(members))] = name
+    return res
+
+class _Board:
+    """Lazy-deletion max-heap of one board's rows plus its cached top K."""
+
+    def __init__(self):
+        self.heap = []               # (-score, key, seq)
+        self.live = 0
+        self.top = None              # [(score, key)], best first; None = rebuild on read
+
+    def touched(self, key, score, k: int):
+        """Invalidate the cached top K if this change can alter it."""
+        if self.top is None:
+            return
+        if (len(self.top) < k or score >= self.top[-1][0]
+                or any(key == t[1] for t in self.top)):
+            self.top = None
+
+class TopKRanker:
+    """Per-board top-K of successive screened snapshots; see the module docstring."""
+
+    def __init__(self, k: int = 10, weights: RankWeights = DEFAULT_WEIGHTS,
+                 p: ScreenerParams = DEFAULT_PARAMS, groups: dict = None):
+        self.k = k
+        self.weights = weights
+        self.params = p
+        self.groups = INDEX_GROUPS if groups is None else groups
+        self.boards = {}             # (kind, value) -> _Board
+        self.entries = {}            # key -> (seq, score, category, group)
+        self.out = None              # latest screened snapshot, for the rows of top()
+        self.last_stats = {}
+        self._rows = None            # key -> row position in self.out, built on first top()
+        self._seq = itertools.count()
+
+    def _board(self, kind: str, value) -> _Board:
+        board = self.boards.get((kind, value))
+        if board is None:
+            board = self.boards[(kind, value)] = _Board()
+        return board
+
+    def _scored(self, out: pd.DataFrame):
+        """(key, score, category, group) per row of `out`, first row of a duplicate key only."""
+        keys = row_keys(out)
+        rows = zip(keys, composite_score(out, self.weights, self.params).tolist(),
+                   out['Category'].to_numpy(dtype=object),
+                   index_group(keys.get_level_values(0), self.groups))
+        if keys.is_unique:
+            return list(rows)
+        first = (~keys.duplicated(keep='first')).tolist()
+        return [r for r, keep in zip(rows, first) if keep]
+
+    def update(self, out: pd.DataFrame, delta=None) -> 'TopKRanker':
+        """Rank a new screened snapshot; rows missing from it leave every board.
+
+        delta is IncrementalScreener.delta for this snapshot: only its
+        re-screened rows are scored and only its keys touch the heaps, so the
+        work is O(changes * log n). Without it every board is rebuilt. An empty
+        snapshot (screen() found no strategy) empties every board.
+        """
+        if delta is None or self.out is None or out.empty:
+            self._rebuild(out)
+        else:
+            self._apply(*delta)
+        self.out, self._rows = out, None
+        return self
+
+    def _rebuild(self, out: pd.DataFrame):
+        self.entries, self.boards = {}, {}
+        # an empty screen() result has only the strategy columns, nothing to score
+        for key, s, cat, grp in (self._scored(out) if len(out) else []):
+            seq = next(self._seq)
+            self.entries[key] = (seq, s, cat, grp)
+            for board in (self._board('Category', cat), self._board('Group', grp)):
+                board.heap.append((-s, key, seq))
+                board.live += 1
+        for board in self.boards.values():
+            heapq.heapify(board.heap)
+        self.last_stats = {"rows": len(self.entries), "changed": len(self.entries), "removed": 0,
+                           "full": True}
+
+    def _drop(self, key, entry):
+        for board in (self._board('Category', entry[2]), self._board('Group', entry[3])):
+            board.live -= 1
+            board.touched(key, entry[1], self.k)
+
+    def _apply(self, fresh: pd.DataFrame, stale: pd.Index):
+        # stale keys come from IncrementalScreener.row_index: Instrument, or (Instrument, Expiry)
+        stale = list(stale) if isinstance(stale, pd.MultiIndex) else [(k, '0') for k in stale]
+        scored = self._scored(fresh) if len(fresh) else []
+        fresh_keys = {r[0] for r in scored}
+        removed = 0
+        for key in stale:
+            if key not in fresh_keys and key in self.entries:
+                self._drop(key, self.entries.pop(key))      # gone, or no longer yields a strategy
+                removed += 1
+        changed = 0
+        for key, s, cat, grp in scored:
+            prev = self.entries.get(key)
+            if prev is not None:
+                if prev[1:] == (s, cat, grp):
+                    continue                                # new inputs, same score and boards
+                self._drop(key, prev)
+            seq = next(self._seq)
+            self.entries[key] = (seq, s, cat, grp)
+            for board in (self._board('Category', cat), self._board('Group', grp)):
+                heapq.heappush(board.heap, (-s, key, seq))
+                board.live += 1
+                board.touched(key, s, self.k)
+            changed += 1
+        self.last_stats = {"rows": len(self.entries), "changed": changed, "removed": removed,
+                           "full": False}
+
+    def _top(self, board: _Board) -> list:
+        if board.top is not None:
+            return board.top
+        if len(board.heap) > 2 * board.live + 64:
+            # mostly stale: rebuild from the live entries
+            board.heap = [e for e in board.heap if self.entries.get(e[1], (None,))[0] == e[2]]
+            heapq.heapify(board.heap)
+        top, kept = [], []
+        while board.heap and len(top) < self.k:
+            entry = heapq.heappop(board.heap)
+            if self.entries.get(entry[1], (None,))[0] != entry[2]:
+                continue             # superseded or removed
+            kept.append(entry)
+            top.append((-entry[0], entry[1]))
+        for entry in kept:
+            heapq.heappush(board.heap, entry)
+        board.top = top
+        return top
+
+    def top(self, kind: str, value) -> pd.DataFrame:
+        """Best k rows of one board (e.g. top('Category', 'CALL'), top('Group', 'INDEX'))."""
+        board = self.boards.get((kind, value))
+        if board is None or self.out is None:
+            return pd.DataFrame()
+        if self._rows is None:
+            keys = row_keys(self.out)
+            first = ~keys.duplicated(keep='first')
+            self._rows = pd.Series(np.flatnonzero(first), index=keys[first])
+        best = self._top(board)
+        pos = self._rows.to_numpy()[self._rows.index.get_indexer([key for _, key in best])]
+        entries = [self.entries[key] for _, key in best]
+        return self.out.iloc[pos].assign(
+            Score=[e[1] for e in entries], Group=[e[3] for e in entries],
+            Rank=np.arange(1, len(best) + 1)).reset_index(drop=True)
+
+    def leaderboard(self, kind: str = 'Category') -> pd.DataFrame:
+        """Top k of every board of one kind, stacked with Board and Rank columns."""
+        parts = [self.top(kind, value).assign(Board=value)
+                 for (k, value) in sorted(self.boards, key=str) if k == kind]
+        parts = [p for p in parts if len(p)]
+        if not parts:
+            return pd.DataFrame()
+        res = pd.concat(parts, ignore_index=True)
+        return res[['Board', 'Rank', 'Score'] + [c for c in res.columns if c not in ('Board', 'Rank', 'Score')]]
@@ -0,0 +1,225 @@
+"""Columnar, date-partitioned store of screened snapshots.
+
+Every fetched or uploaded snapshot is appended as one Parquet file under
+
+    <root>/date=YYYY-MM-DD/<HHMMSSffffff>-<source>-<digest>.parquet
+
+Each file holds one row per strategy and, when the numeric snapshot is passed
+to write(), one row with empty strategy columns for every instrument that got
+none, so InstrumentHistory.replay() sees the full universe at every time.
+
+Rows are stored with compact dtypes: dictionary-encoded text (Instrument,
+Category, Strategy, Event, ...) and float32 for ratios/percentages where 7
+significant digits are plenty. Prices and the levels derived from them stay
+float64. Files are sorted by Instrument, so row-group statistics let reads
+skip other symbols, and the date partition prunes whole directories before
+any file is opened. Reads go through a memory-mapped local filesystem.
+
+pyarrow is imported lazily so the rest of the package stays importable
+without it.
+"""
+import glob
+import os
+
+import pandas as pd
+
+from .core import COLUMNS_ORDER, EXPIRY_COL, FEATURE_COLS, PRICING_COLS
+from .incremental import row_index
+
+STORE_ROOT = os.environ.get("SCREENER_STORE", "snapshots")
+
+# Instrument is written as plain strings: Parquet dictionary-encodes the pages
+# anyway, and Arrow only prunes row groups by min/max on non-dictionary types.
+# It comes back as a categorical on read.
+CATEGORY_COLS = ['Category', 'Strategy', 'Comments', 'Event', EXPIRY_COL, 'Source']
+FLOAT32_COLS = ['PCR', 'FuturePercentChange', 'ATMIV', 'ATMIVChange', 'IVPercentile',
+                'VolumeMultiple', 'FutureOIPercentChange', 'RiskReward', *FEATURE_COLS,
+                'Delta', 'Gamma', 'Theta', 'Vega']
+FLOAT64_COLS = ['FuturePrice', 'MaxPain', 'Entry', 'Exit', 'StopLoss', 'PotentialPoints',
+                'NetPremium', 'MaxProfit', 'MaxLoss', 'LowerBreakeven', 'UpperBreakeven']
+TIME_COL = 'SnapshotTime'
+ROW_GROUP_SIZE = 64 * 1024
+COMPACT_ROW_GROUP_SIZE = 2048    # small groups over Instrument-sorted rows = selective reads
+
+def _arrow():
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.fs as pafs
+    import pyarrow.parquet as pq
+    return pa, ds, pafs, pq
+
+def with_unscreened(out: pd.DataFrame, snapshot: pd.DataFrame) -> pd.DataFrame:
+    """`out` plus the rows of `snapshot` (the frame it was screened from) that produced no strategy."""
+    if not out.empty:
+        snapshot = snapshot[~row_index(snapshot).isin(row_index(out))]
+    if snapshot.empty:
+        return out
+    if out.empty:
+        # keep the (empty) strategy columns so every file has them
+        cols = list(dict.fromkeys([*out.columns, *snapshot.columns]))
+        return snapshot.reindex(columns=cols).reset_index(drop=True)
+    return pd.concat([out, snapshot], ignore_index=True)
+
+def compact_frame(out: pd.DataFrame, when, source: str = 'upload',
+                  snapshot: pd.DataFrame = None) -> pd.DataFrame:
+    """Screened rows stamped with snapshot time/source, in storage dtypes, sorted by Instrument.
+
+    With `snapshot`, instruments without a strategy are kept as rows with
+    empty strategy columns (see with_unscreened).
+    """
+    if snapshot is not None:
+        out = with_unscreened(out, snapshot)
+    cols = [c for c in COLUMNS_ORDER + [EXPIRY_COL] + FEATURE_COLS + PRICING_COLS if c in out.columns]
+    df = out[cols].copy()
+    df.insert(0, TIME_COL, pd.Timestamp(when).as_unit('us'))
+    df['Source'] = source
+    for c in CATEGORY_COLS:
+        if c in df.columns:
+            df[c] = df[c].astype('category')
+    for c in FLOAT32_COLS:
+        if c in df.columns:
+            df[c] = pd.to_numeric(df[c], errors='coerce').astype('float32')
+    for c in FLOAT64_COLS:
+        if c in df.columns:
+            df[c] = pd.to_numeric(df[c], errors='coerce').astype('float64')
+    for c in ('Instrument', 'TradeDetails'):
+        if c in df.columns:
+            df[c] = df[c].astype(object)
+    return df.sort_values('Instrument', kind='stable').reset_index(drop=True)
+
+def _day(ts: pd.Timestamp) -> str:
+    return ts.strftime('%Y-%m-%d')
+
+class SnapshotStore:
+    """Append-only Parquet history of screened snapshots, partitioned by date."""
+
+    def __init__(self, root: str = STORE_ROOT, compression: str = 'zstd'):
+        self.root = root
+        self.compression = compression
+        self._seen = set()      # digests written by this process
+
+    def _day_dir(self, day: str) -> str:
+        return os.path.join(self.root, f'date={day}')
+
+    def has(self, digest: str, when=None) -> bool:
+        """True if a snapshot with this digest was already written (on that day, if given).
+
+        Only uncompacted files carry the digest in their name.
+        """
+        if digest in self._seen:
+            return True
+        day = _day(pd.Timestamp(when)) if when is not None else '*'
+        return bool(glob.glob(os.path.join(self.root, f'date={day}', f'*-{digest[:16]}.parquet')))
+
+    def write(self, out: pd.DataFrame, when=None, source: str = 'upload', digest: str = None,
+              snapshot: pd.DataFrame = None):
+        """Append one screened snapshot; returns the file path, or None if the digest is already stored.
+
+        Pass the numeric `snapshot` that `out` was screened from to also keep
+        the instruments that produced no strategy.
+        """
+        pa, _, _, pq = _arrow()
+        when = pd.Timestamp.now() if when is None else pd.Timestamp(when)
+        if digest is not None and self.has(digest, when):
+            return None
+        df = compact_frame(out, when, source, snapshot)
+        day_dir = self._day_dir(_day(when))
+        os.makedirs(day_dir, exist_ok=True)
+        name = f"{when.strftime('%H%M%S%f')}-{source}"
+        if digest is not None:
+            name += f'-{digest[:16]}'
+        path = os.path.join(day_dir, name + '.parquet')
+        tmp = os.path.join(day_dir, '.' + name + '.tmp')     # dot-files are ignored by readers
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        pq.write_table(table, tmp, compression=self.compression, row_group_size=ROW_GROUP_SIZE)
+        os.replace(tmp, path)
+        if digest is not None:
+            self._seen.add(digest)
+        return path
+
+    def dates(self) -> list:
+        """Stored partition dates, oldest first."""
+        dirs = glob.glob(os.path.join(self.root, 'date=*'))
+        return sorted(os.path.basename(d)[len('date='):] for d in dirs if os.path.isdir(d))
+
+    def _dataset(self, paths=None):
+        """Dataset over `paths` (default: every stored file) with the union of their schemas.
+
+        Snapshots differ in columns (pricing, history features, Expiry), so the
+        schema must not be taken from the first file alone.
+        """
+        pa, ds, pafs, pq = _arrow()
+        fs = pafs.LocalFileSystem(use_mmap=True)
+        if paths is None:
+            paths = sorted(glob.glob(os.path.join(self.root, 'date=*', '*.parquet')))
+        schema = pa.unify_schemas([pq.read_schema(f) for f in paths], promote_options='permissive')
+        date = pa.field('date', pa.string())
+        part = ds.partitioning(pa.schema([date]), flavor='hive')
+        return ds.dataset(paths, schema=schema.append(date), format='parquet', partitioning=part,
+                          partition_base_dir=self.root, filesystem=fs)
+
+    def read(self, start=None, end=None, instruments=None, columns=None) -> pd.DataFrame:
+        """Snapshots with start <= SnapshotTime <= end, optionally for some instruments/columns.
+
+        start/end accept anything pd.Timestamp does; a bare date as end covers that whole day.
+        """
+        _, ds, _, _ = _arrow()
+        if not os.path.isdir(self.root):
+            return pd.DataFrame(columns=[TIME_COL] + COLUMNS_ORDER + ['Source'])
+        start = pd.Timestamp(start) if start is not None else None
+        end = pd.Timestamp(end) if end is not None else None
+        if end is not None and end == end.normalize():
+            end = end + pd.Timedelta(days=1) - pd.Timedelta(microseconds=1)
+        days = [d for d in self.dates()
+                if (start is None or d >= _day(start)) and (end is None or d <= _day(end))]
+        if not days:
+            return pd.DataFrame(columns=[TIME_COL] + COLUMNS_ORDER + ['Source'])
+        files = [f for d in days for f in sorted(glob.glob(os.path.join(self._day_dir(d), '*.parquet')))]
+        if not files:
+            return pd.DataFrame(columns=[TIME_COL] + COLUMNS_ORDER + ['Source'])
+        dataset = self._dataset(files)
+
+        flt = None
+        def both(a, b):
+            return b if a is None else a & b
+        if instruments is not None:
+            flt = both(flt, ds.field('Instrument').isin(list(instruments)))
+        if start is not None:
+            flt = both(flt, ds.field(TIME_COL) >= start.to_datetime64())
+        if end is not None:
+            flt = both(flt, ds.field(TIME_COL) <= end.to_datetime64())
+        if columns is not None:
+            columns = list(dict.fromkeys([TIME_COL, *columns]))
+        df = dataset.to_table(columns=columns, filter=flt).to_pandas()
+        if 'Instrument' in df.columns:
+            df['Instrument'] = df['Instrument'].astype('category')
+        return df.drop(columns='date', errors='ignore').sort_values(TIME_COL, kind='stable').reset_index(drop=True)
+
+    def compact(self, day: str):
+        """Merge one day's snapshot files into a single file sorted by (Instrument, SnapshotTime)."""
+        pa, _, _, pq = _arrow()
+        day_dir = self._day_dir(day)
+        files = sorted(glob.glob(os.path.join(day_dir, '*.parquet')))
+        if len(files) <= 1:
+            return files[0] if files else None
+        df = self._dataset(files).to_table().drop_columns(['date']).to_pandas()
+        df = df.sort_values(['Instrument', TIME_COL], kind='stable')
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        name = f"{os.path.basename(files[0])[:12]}-{os.path.basename(files[-1])[:12]}-compacted"
+        path = os.path.join(day_dir, name + '.parquet')
+        tmp = os.path.join(day_dir, '.' + name + '.tmp')
+        pq.write_table(table, tmp, compression=self.compression, row_group_size=COMPACT_ROW_GROUP_SIZE)
+        os.replace(tmp, path)
+        for f in files:
+            if f != path:
+                os.remove(f)
+        return path
+
+    def compact_closed_days(self, today=None) -> list:
+        """Compact every partition before today that still has more than one file."""
+        today = _day(pd.Timestamp.now() if today is None else pd.Timestamp(today))
+        done = []
+        for day in self.dates():
+            if day < today and len(glob.glob(os.path.join(self._day_dir(day), '*.parquet'))) > 1:
+                done.append(self.compact(day))
+        return done
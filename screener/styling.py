@@ -0,0 +1,50 @@
+"""Row colouring and number formatting for result tables (pandas Styler, no Streamlit dependency)."""
+import numpy as np
+import pandas as pd
+
+# ---------- Row colours and formats ----------
+CATEGORY_COLORS = {
+    'CALL': 'background-color: #b6fcd5',      # mint for bullish
+    'PUT': 'background-color: #ffb3b3',       # soft red for bearish
+    'NEUTRAL': 'background-color: #c9d7ff',   # soft blue for neutral
+    'LONGVOL': 'background-color: #f7e7a9',   # yellow for long vol
+    'SHORTVOL': 'background-color: #e6d4ff',  # lilac for short vol
+}
+
+NUMBER_FORMATS = {
+    'Entry': '{:.2f}','Exit':'{:.2f}','StopLoss':'{:.2f}',
+    'RiskReward':'{:.2f}','PotentialPoints':'{:.2f}',
+    'FuturePrice':'{:.2f}','MaxPain':'{:.2f}',
+    'FuturePercentChange':'{:.2f}','ATMIV':'{:.2f}',
+    'ATMIVChange':'{:.2f}','IVPercentile':'{:.0f}',
+    'PCRMomentum':'{:+.3f}','MaxPainDrift':'{:+.3f}','IVZScore':'{:+.2f}',
+    'NetPremium':'{:+.2f}','MaxProfit':'{:.2f}','MaxLoss':'{:.2f}',
+    'LowerBreakeven':'{:.2f}','UpperBreakeven':'{:.2f}',
+    'Delta':'{:+.3f}','Gamma':'{:.4f}','Theta':'{:+.2f}','Vega':'{:.2f}',
+    'Score':'{:.3f}'
+}
+
+def row_colors(df: pd.DataFrame) -> np.ndarray:
+    """CSS per row from Category in one mapping (CATEGORY_COLORS, '' for other categories)."""
+    if 'Category' not in df.columns:
+        return np.full(len(df), '', dtype=object)
+    # a categorical Category (as read back from the store) can map to a categorical,
+    # which rejects fillna(''); map plain strings instead
+    return df['Category'].astype(str).map(CATEGORY_COLORS).fillna('').to_numpy(dtype=object)
+
+def style_frame(df: pd.DataFrame):
+    """Styler with row colours and number formats, built with one apply over the whole frame."""
+    colors = row_colors(df)
+
+    def css(frame):
+        return pd.DataFrame(np.repeat(colors[:, None], frame.shape[1], axis=1),
+                            index=frame.index, columns=frame.columns)
+
+    formats = {c: f for c, f in NUMBER_FORMATS.items() if c in df.columns}
+    return df.style.apply(css, axis=None).format(formats, na_rep="-")
+
+def page_slice(df: pd.DataFrame, page: int, page_size: int) -> pd.DataFrame:
+    """Rows of 1-based `page`; the page number is clamped to the valid range."""
+    pages = max(1, -(-len(df) // page_size))
+    page = min(max(1, page), pages)
+    return df.iloc[(page - 1) * page_size: page * page_size]
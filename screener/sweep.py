@@ -0,0 +1,145 @@
+"""Parameter sweeps: evaluate a grid of ScreenerParams over one dataset in a single pass.
+
+Features (parsed numerics, finiteness masks, distance to MaxPain) are built
+once. Leaf assignment and stop/neutral levels are memoised per threshold
+combination, and the strategy multipliers act linearly on per-leaf sums, so
+most grid points cost O(1).
+"""
+import itertools
+from collections import OrderedDict
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+
+from .engine import (LEAF_STRATEGY, RULE_COLS, Features, leaf_index, leaf_key, levels_key,
+                     neutral_key, neutral_levels, stop_levels)
+from .ingest import read_snapshot
+from .params import DEFAULT_PARAMS, ScreenerParams
+
+class _LRU(OrderedDict):
+    """Bounded dict for evaluate()'s memo so large grids do not hold every array."""
+
+    def __init__(self, maxsize: int = 64):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
+
+def param_grid(grid: dict, base: ScreenerParams = DEFAULT_PARAMS) -> list:
+    """Expand {param_name: [values, ...]} into a list of ScreenerParams.
+
+    Combinations are ordered so that the rule thresholds change slowest, which
+    keeps memoised intermediate arrays hot during the sweep.
+    """
+    unknown = set(grid) - set(ScreenerParams.names())
+    if unknown:
+        raise ValueError(f"Unknown screener parameters: {', '.join(sorted(unknown))}")
+    names = [n for n in ScreenerParams.names() if n in grid]
+    return [replace(base, **dict(zip(names, values)))
+            for values in itertools.product(*(list(grid[n]) for n in names))]
+
+def _leaf_sums(f: Features, p: ScreenerParams, cache: dict, arrays: dict) -> dict:
+    """Per-leaf sums that the multiplier parameters scale linearly.
+
+    Depends only on the leaf, stop-level and neutral-width parameters, so a
+    whole block of grid points that differ in multipliers shares one entry.
+    """
+    key = ('sums',) + leaf_key(p) + levels_key(p) + neutral_key(p)
+    if key in cache:
+        return cache[key]
+    lf = leaf_index(f, p, arrays)
+    long_sl, short_sl = stop_levels(f, p, arrays)
+    _, _, half_w = neutral_levels(f, p, arrays)
+    pot = f.dist
+
+    def ratio_sum(k, risk):
+        m = (lf == k) & (risk > 0)
+        return float((pot[m] / risk[m]).sum())
+
+    sums = {
+        "counts": np.bincount(lf, minlength=len(LEAF_STRATEGY)),
+        "pot": np.bincount(lf, weights=pot, minlength=len(LEAF_STRATEGY)),
+        # sum of potential / risk-distance per leaf (RR before the multipliers)
+        "rr0": ratio_sum(0, np.abs(f.fut - long_sl)),
+        "rr1": ratio_sum(1, np.abs(short_sl - f.fut)),
+        "rr2": int(((lf == 2) & (pot > 0)).sum()),
+        "rr3": ratio_sum(3, half_w),
+        "rr4": ratio_sum(4, half_w),
+        "rr5": ratio_sum(5, half_w),
+    }
+    cache[key] = sums
+    return sums
+
+def summarize(f: Features, p: ScreenerParams, cache: dict = None, arrays: dict = None) -> dict:
+    """Aggregate outcome of one parameter set: strategy mix, mean RR and potential.
+
+    RR and potential are aggregated before the 2-decimal rounding that
+    generate_strategies_vec applies per row, so means can differ from the
+    rounded table by less than 0.005.
+    """
+    cache = {} if cache is None else cache
+    s = _leaf_sums(f, p, cache, arrays)
+    counts, pot = s["counts"], s["pot"]
+
+    # only the leaf and straddle_min_pct matter here; the leaf array itself
+    # lives in the bounded `arrays` memo, so `cache` holds scalars only
+    skey = ('straddle', p.straddle_min_pct) + leaf_key(p)
+    if skey not in cache:
+        m = leaf_index(f, p, arrays) == 2
+        cache[skey] = float(np.maximum(f.dist[m], f.fut[m] * p.straddle_min_pct).sum())
+    total_pot = (p.debit_mult * (pot[0] + pot[1]) + cache[skey]
+                 + p.credit_mult * (pot[3] + pot[4]) + p.condor_mult * pot[5])
+
+    # safe_rr(mult * pot, frac * risk) == mult / |frac| * pot / risk, or 0 when frac == 0
+    rf = abs(p.rr_risk_frac)
+    total_rr = p.credit_mult * (s["rr3"] + s["rr4"]) + p.condor_mult * s["rr5"]
+    if rf > 0:
+        total_rr += (p.debit_mult * (s["rr0"] + s["rr1"]) + s["rr2"]) / rf
+
+    n = len(f)
+    row = {"Strategies": n}
+    row.update({name: int(c) for name, c in zip(LEAF_STRATEGY, counts)})
+    row["MeanRiskReward"] = total_rr / n if n else np.nan
+    row["MeanPotentialPoints"] = total_pot / n if n else np.nan
+    row["TotalPotentialPoints"] = total_pot
+    return row
+
+def sweep(data, params_list, cache_size: int = 64) -> pd.DataFrame:
+    """Evaluate every parameter set in `params_list` over `data` (a numeric frame or Features).
+
+    Returns one summary row per parameter set, with the parameters that vary
+    across the list as leading columns. Per-row arrays are held in an LRU of
+    `cache_size` entries; per-combination sums are a few scalars each.
+    """
+    f = data if isinstance(data, Features) else Features.from_frame(data)
+    params_list = list(params_list)
+    varying = [n for n in ScreenerParams.names()
+               if len({getattr(p, n) for p in params_list}) > 1]
+    sums, arrays = {}, _LRU(cache_size)
+    rows = []
+    for p in params_list:
+        row = {n: getattr(p, n) for n in varying}
+        row.update(summarize(f, p, sums, arrays))
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+def load_features(paths):
+    """Parse many snapshot CSVs into one Features block; returns (features, [(path, error)])."""
+    frames, errors = [], []
+    for path in paths:
+        try:
+            frames.append(read_snapshot(path, columns=RULE_COLS))
+        except Exception as e:
+            errors.append((path, f"{type(e).__name__}: {e}"))
+    if not frames:
+        return None, errors
+    return Features.from_frame(pd.concat(frames, ignore_index=True)), errors
@@ -0,0 +1,44 @@
+"""Streamlit table rendering shared by both apps (imports streamlit; not used by the CLI)."""
+import streamlit as st
+
+from .profiling import stage
+from .styling import page_slice, style_frame
+
+PAGE_SIZE = 200
+
+def render_table(df, key: str, page_size: int = PAGE_SIZE):
+    """Show a result table; large tables are paginated and only the visible page is styled."""
+    if len(df) <= page_size:
+        with stage(f'style:{key}', rows=len(df)):
+            st.dataframe(style_frame(df))
+        return
+    pages = -(-len(df) // page_size)
+    page = st.number_input(f"Page (1–{pages})", min_value=1, max_value=pages, value=1,
+                           step=1, key=f"{key}_page")
+    visible = page_slice(df, page, page_size)
+    with stage(f'style:{key}', rows=len(visible)):
+        st.dataframe(style_frame(visible))
+    start = (page - 1) * page_size
+    st.caption(f"Rows {start + 1}–{start + len(visible)} of {len(df)}")
+
+def render_rankings(ranked: dict, key: str):
+    """Top-K leaderboards ({board kind: TopKRanker.leaderboard(kind)}), one kind at a time."""
+    if not ranked:
+        return
+    kind = st.radio("Rank within", list(ranked), horizontal=True, key=f"{key}_kind")
+    board = ranked[kind]
+    if board.empty:
+        st.write("Nothing ranked yet.")
+    else:
+        render_table(board, key=key)
+
+def render_diagnostics(profiles: dict, cprofile: str = None):
+    """Stage table per RunProfile ({title: profile}) and an optional cProfile report."""
+    for title, prof in profiles.items():
+        if prof is None or not prof.records:
+            continue
+        st.markdown(f"**{title}** · {prof.seconds * 1000:.0f} ms")
+        st.dataframe(prof.frame())
+    if cprofile:
+        st.markdown("**cProfile** (cumulative time)")
+        st.code(cprofile)
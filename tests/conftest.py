@@ -0,0 +1,35 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from screener.core import screen, to_num
+from synthetic import synthetic_frame
+
+def screened_snapshots(n_rows: int, count: int, seed: int = 0, start='2026-01-05 09:15') -> pd.DataFrame:
+    """`count` screened snapshots of a random-walk universe, stacked with SnapshotTime."""
+    rng = np.random.default_rng(seed)
+    df = to_num(synthetic_frame(n_rows, seed=seed))
+    frames = []
+    for i, when in enumerate(pd.date_range(start, periods=count, freq='5min')):
+        df = df.copy()
+        df['FuturePrice'] = df['FuturePrice'] * np.exp(rng.normal(0, 0.01, len(df)))
+        df['IVPercentile'] = (df['IVPercentile'] + rng.normal(0, 5, len(df))).clip(0, 100)
+        frames.append(screen(df).assign(SnapshotTime=when))
+    return pd.concat(frames, ignore_index=True)
+
+@pytest.fixture
+def raw_frame():
+    return synthetic_frame(500, seed=7)
+
+@pytest.fixture
+def page_source():
+    """Saved driver.page_source of the Sensibull screener (see screener.live)."""
+    with open(os.path.join(ROOT, 'tests', 'fixtures', 'sensibull_page.html'), encoding='utf-8') as fh:
+        return fh.read()
@@ -0,0 +1,58 @@
+import pandas as pd
+
+from screener.alerts import AlertEngine, WebhookSink
+
+T0 = pd.Timestamp('2026-01-05 09:15')
+
+def _snap(ivp, instrument='RELIANCE', expiry=None) -> pd.DataFrame:
+    """Screened-like rows of one instrument, one per IVPercentile (and expiry, if given)."""
+    ivp = list(ivp) if isinstance(ivp, (list, tuple)) else [ivp]
+    df = pd.DataFrame({'Instrument': instrument, 'Category': 'CALL', 'Strategy': 'Bull Call Spread',
+                       'FuturePrice': 2900.0, 'MaxPain': 2950.0, 'PCR': 0.9, 'ATMIV': 20.0,
+                       'IVPercentile': [float(v) for v in ivp], 'PotentialPoints': 25.0,
+                       'RiskReward': 1.5})
+    if expiry is not None:
+        df['Expiry'] = expiry
+    return df
+
+def _fired(engine, ivp, minutes, **kwargs) -> int:
+    return len(engine.evaluate(_snap(ivp, **kwargs), when=T0 + pd.Timedelta(minutes=minutes)))
+
+def test_fires_once_while_condition_holds():
+    sink = WebhookSink()
+    engine = AlertEngine([{'name': 'ivp high', 'all': ['IVPercentile >= 90']}], sinks=[sink])
+    assert [_fired(engine, v, i) for i, v in enumerate([95, 96, 97, 50, 95])] == [1, 0, 0, 0, 1]
+    assert len(sink.sent) == 2
+    assert len(engine.recent) == 2
+
+def test_cooldown_holds_back_a_refire():
+    engine = AlertEngine([{'name': 'ivp high', 'all': ['IVPercentile >= 90'], 'cooldown': 600}])
+    # minutes: fires at 0, clears at 1, true again at 2 but within 10 minutes, true after clearing at 12
+    ticks = [(95, 0), (50, 1), (95, 2), (50, 11), (95, 12)]
+    assert [_fired(engine, v, m) for v, m in ticks] == [1, 0, 0, 0, 1]
+
+def test_crosses_compares_with_previous_tick():
+    engine = AlertEngine([{'name': 'ivp up', 'all': ['IVPercentile crosses_above 70']}])
+    assert [_fired(engine, v, i) for i, v in enumerate([75, 60, 75, 80, 65, 71])] == [0, 0, 1, 0, 0, 1]
+
+def test_expiries_have_their_own_state():
+    rules = [{'name': 'ivp high', 'all': ['IVPercentile >= 90']},
+             {'name': 'ivp up', 'all': ['IVPercentile crosses_above 70']}]
+    engine = AlertEngine(rules)
+    expiry = ['2026-01-29', '2026-02-26']
+    # the near month sits at 0 / 75, the far month rises through 70 and then above 90
+    first = engine.evaluate(_snap([0, 60], expiry=expiry), when=T0)
+    assert first.empty
+    second = engine.evaluate(_snap([75, 75], expiry=expiry), when=T0 + pd.Timedelta(minutes=5))
+    assert second[['Rule', 'Expiry']].values.tolist() == [['ivp up', '2026-01-29'], ['ivp up', '2026-02-26']]
+    third = engine.evaluate(_snap([75, 95], expiry=expiry), when=T0 + pd.Timedelta(minutes=10))
+    assert third[['Rule', 'Expiry', 'IVPercentile']].values.tolist() == [['ivp high', '2026-02-26', 95.0]]
+    # the near month staying true does not re-fire, and the far month does not re-fire either
+    fourth = engine.evaluate(_snap([96, 97], expiry=expiry), when=T0 + pd.Timedelta(minutes=15))
+    assert fourth[['Rule', 'Expiry', 'IVPercentile']].values.tolist() == [['ivp high', '2026-01-29', 96.0]]
+
+def test_folded_rows_report_the_matching_row():
+    # two rows of one instrument without an Expiry column share one state row
+    engine = AlertEngine([{'name': 'ivp high', 'all': ['IVPercentile >= 90']}])
+    alerts = engine.evaluate(_snap([0, 95]), when=T0)
+    assert alerts['IVPercentile'].tolist() == [95.0]
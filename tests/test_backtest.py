@@ -0,0 +1,33 @@
+import pandas as pd
+
+from conftest import screened_snapshots
+from screener.backtest import backtest
+
+def test_chunked_matches_unchunked():
+    frames = screened_snapshots(300, 40)
+    whole = backtest(frames, horizon=20, only_changes=False)
+    # 7 signals per chunk: many chunks, the last one partial
+    chunked = backtest(frames, horizon=20, only_changes=False, chunk_cells=20 * 7)
+    assert len(whole.trades) > 1000
+    pd.testing.assert_frame_equal(whole.trades, chunked.trades)
+
+def test_priced_straddles_chunked():
+    frames = screened_snapshots(100, 15, seed=3)
+    frames['NetPremium'] = -frames['FuturePrice'] * 0.01
+    whole = backtest(frames, horizon=5)
+    chunked = backtest(frames, horizon=5, chunk_cells=5 * 3)
+    pd.testing.assert_frame_equal(whole.trades, chunked.trades)
+
+def test_expiries_are_separate_series():
+    near = screened_snapshots(50, 12, seed=5)
+    far = near.copy()
+    far['FuturePrice'] = far['FuturePrice'] * 1.5
+    for c in ('Entry', 'Exit', 'StopLoss'):
+        far[c] = far[c] * 1.5
+    frames = pd.concat([near.assign(Expiry='2026-01-29'), far.assign(Expiry='2026-02-26')],
+                       ignore_index=True)
+    both = backtest(frames, horizon=4).trades
+    alone = backtest(near.assign(Expiry='2026-01-29'), horizon=4).trades
+    near_trades = both[both['Expiry'] == '2026-01-29'].reset_index(drop=True)
+    pd.testing.assert_frame_equal(near_trades, alone, check_categorical=False)
+    assert (both['Expiry'] == '2026-02-26').sum() == len(alone)
@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+from synthetic import synthetic_frame
+from screener.batch import output_columns, run_batch
+
+@pytest.mark.parametrize('plain_first', [True, False])
+def test_optional_columns_survive_file_order(tmp_path, plain_first):
+    plain = tmp_path / 'plain.csv'
+    dated = tmp_path / 'dated.csv'
+    synthetic_frame(40, seed=1).to_csv(plain, index=False)
+    synthetic_frame(40, seed=2).assign(Expiry='2026-01-29').to_csv(dated, index=False)
+    paths = [str(plain), str(dated)] if plain_first else [str(dated), str(plain)]
+    for jobs in (1, 2):
+        out = tmp_path / f'out{jobs}.csv'
+        stats = run_batch(paths, str(out), jobs=jobs)
+        df = pd.read_csv(out)
+        assert list(df.columns) == output_columns()
+        assert len(df) == stats.rows
+        assert df.loc[df['SourceFile'] == str(dated), 'Expiry'].eq('2026-01-29').all()
+        assert df.loc[df['SourceFile'] == str(plain), 'Expiry'].isna().all()
+
+def test_chunked_keeps_optional_columns(tmp_path):
+    plain = tmp_path / 'plain.csv'
+    dated = tmp_path / 'dated.csv'
+    synthetic_frame(40, seed=1).to_csv(plain, index=False)
+    synthetic_frame(40, seed=2).assign(Expiry='2026-01-29').to_csv(dated, index=False)
+    out = tmp_path / 'out.csv'
+    run_batch([str(plain), str(dated)], str(out), chunksize=16, out_dir=str(tmp_path / 'per'))
+    df = pd.read_csv(out)
+    assert list(df.columns) == output_columns(chunked=True)
+    assert df.loc[df['SourceFile'] == str(dated), 'Expiry'].eq('2026-01-29').all()
+    per = pd.read_csv(tmp_path / 'per' / 'dated_screened.csv')
+    assert per['Expiry'].eq('2026-01-29').all()
+
+def test_empty_batch_keeps_header(tmp_path):
+    out = tmp_path / 'out.csv'
+    stats = run_batch([str(tmp_path / 'missing.csv')], str(out), jobs=1)
+    assert stats.failed == 1
+    assert list(pd.read_csv(out).columns) == output_columns()
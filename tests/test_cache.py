@@ -0,0 +1,44 @@
+import pandas as pd
+
+from screener.cache import ResultCache, approx_nbytes, frame_digest
+from screener.core import to_num
+
+def _frame(n: int, text: str = 'x') -> pd.DataFrame:
+    inst = pd.Series([text * 50] * n, dtype=object)
+    return pd.DataFrame({'Instrument': inst, 'PCR': [0.9] * n})
+
+def test_lru_evicts_least_recently_used():
+    cache = ResultCache(max_entries=2)
+    for key in 'ab':
+        cache.get_or_compute(key, lambda: key)
+    assert cache.get_or_compute('a', lambda: 'recomputed').hit     # 'a' becomes most recent
+    cache.get_or_compute('c', lambda: 'c')                          # evicts 'b'
+    assert list(cache._data) == ['a', 'c']
+    lookup = cache.get_or_compute('b', lambda: 'b again')
+    assert not lookup.hit and lookup.value == 'b again'
+    assert (cache.hits, cache.misses) == (1, 4)
+
+def test_byte_budget_evicts_oldest():
+    one = approx_nbytes(_frame(100))
+    cache = ResultCache(max_entries=10, max_bytes=int(2.5 * one))
+    for key in 'abc':
+        cache.put(key, _frame(100))
+    assert list(cache._data) == ['b', 'c']
+    assert cache.nbytes == 2 * one <= cache.max_bytes
+    cache.put('b', (_frame(100), _frame(100)))                      # replacing counts the new size only
+    assert list(cache._data) == ['b']
+    assert cache.nbytes == 2 * one
+
+def test_nbytes_counts_string_payloads():
+    assert approx_nbytes(_frame(100, 'x' * 20)) > approx_nbytes(_frame(100)) > 100 * 50
+    assert approx_nbytes({'a': _frame(10), 'b': [_frame(10)]}) == 2 * approx_nbytes(_frame(10))
+
+def test_frame_digest(raw_frame):
+    df = to_num(raw_frame)
+    assert frame_digest(df) == frame_digest(df.copy())
+    assert frame_digest(df) == frame_digest(df.set_axis(range(1, len(df) + 1)))   # index is ignored
+    changed = df.copy()
+    changed.loc[3, 'PCR'] += 0.01
+    assert frame_digest(changed) != frame_digest(df)
+    assert frame_digest(df.iloc[::-1]) != frame_digest(df)                        # row order matters
+    assert frame_digest(df.rename(columns={'PCR': 'pcr'})) != frame_digest(df)
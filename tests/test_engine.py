@@ -0,0 +1,39 @@
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from screener.core import generate_strategies, to_num
+from screener.engine import STRATEGY_COLS, generate_strategies_vec
+from screener.params import DEFAULT_PARAMS
+from synthetic import synthetic_frame
+
+def _scalar(df: pd.DataFrame, p=DEFAULT_PARAMS) -> pd.DataFrame:
+    rows = [s for _, row in df.iterrows() for s in generate_strategies(row, p)]
+    return pd.DataFrame(rows, columns=STRATEGY_COLS)
+
+def _messy(n_rows: int, seed: int) -> pd.DataFrame:
+    """Synthetic rows with NaN, +-inf and MaxPain == FuturePrice sprinkled into every rule input."""
+    rng = np.random.default_rng(seed)
+    df = to_num(synthetic_frame(n_rows, seed=seed))
+    for c in ['FuturePrice', 'MaxPain', 'PCR', 'ATMIV', 'IVPercentile']:
+        hit = rng.random(n_rows)
+        df.loc[hit < 0.05, c] = np.nan
+        df.loc[(hit >= 0.05) & (hit < 0.08), c] = np.inf
+        df.loc[(hit >= 0.08) & (hit < 0.10), c] = -np.inf
+    tie = rng.random(n_rows) < 0.05
+    df.loc[tie, 'MaxPain'] = df.loc[tie, 'FuturePrice']
+    return df
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_matches_scalar_rules(seed):
+    df = _messy(400, seed)
+    got = generate_strategies_vec(df)
+    assert len(got) < len(df)                   # non-finite FuturePrice/MaxPain rows are dropped
+    pd.testing.assert_frame_equal(got, _scalar(df), check_dtype=False)
+
+def test_matches_scalar_rules_with_params():
+    df = _messy(300, 5)
+    p = replace(DEFAULT_PARAMS, ivp_high=50, ivp_low=40, iv_high=25, pcr_bull=0.9, stop_frac=0.3)
+    pd.testing.assert_frame_equal(generate_strategies_vec(df, p), _scalar(df, p), check_dtype=False)
@@ -0,0 +1,46 @@
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('lxml')
+
+from screener.core import NUM_COLS, to_num
+from screener.extract import TEXT_COLS, extract_table, map_header
+
+def _read_html(page: str) -> pd.DataFrame:
+    """The path extract_table replaced: read_html, the same header mapping, to_num."""
+    return to_num(pd.read_html(StringIO(page))[0].rename(columns=map_header))
+
+def _text(s: pd.Series) -> list:
+    return [None if pd.isna(v) else str(v) for v in s]
+
+def test_matches_read_html(page_source):
+    got, ref = extract_table(page_source), _read_html(page_source)
+    assert list(got.columns) == list(ref.columns)
+    assert len(got) == len(ref) == 12
+    for c in TEXT_COLS:
+        assert _text(got[c]) == _text(ref[c])
+    for c in NUM_COLS:
+        assert got[c].dtype == np.float64
+        parsed = ref[c].notna().to_numpy()
+        # every value read_html+to_num produced, extract_table produces too
+        np.testing.assert_allclose(got[c].to_numpy()[parsed], ref[c].to_numpy(dtype=float)[parsed])
+    # plain numeric columns (thousands separators included) agree cell for cell
+    for c in ['FuturePrice', 'ATMIV', 'ATMIVChange']:
+        assert ref[c].notna().all()
+
+def test_parses_decorated_cells(page_source):
+    """'+0.42%' and '1.12x' were NaN after read_html+to_num; extract_table parses them."""
+    got, ref = extract_table(page_source), _read_html(page_source)
+    for c in ['FuturePercentChange', 'VolumeMultiple', 'FutureOIPercentChange']:
+        assert ref[c].isna().all()
+    assert got['FuturePercentChange'].head(3).tolist() == [0.42, -0.65, 0.18]
+    assert got['VolumeMultiple'].head(3).tolist() == [1.12, 0.94, 0.71]
+    assert got['FutureOIPercentChange'].head(3).tolist() == [3.1, -1.8, 0.6]
+    # '-' is still missing
+    assert got['MaxPain'].isna().tolist() == [i == 7 for i in range(12)]
+    assert got['IVPercentile'].isna().tolist() == [i == 2 for i in range(12)]
+    assert got['PCR'].isna().tolist() == [i == 10 for i in range(12)]
+    assert got['Instrument'].iloc[8] == 'M&M'
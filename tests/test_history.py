@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from screener.core import FEATURE_COLS, to_num
+from screener.history import InstrumentHistory
+
+def _ticks(raw_frame, count: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    df = to_num(raw_frame.copy())
+    frames = []
+    for _ in range(count):
+        df = df.copy()
+        df['PCR'] = df['PCR'] * np.exp(rng.normal(0, 0.05, len(df)))
+        df['ATMIV'] = df['ATMIV'] + rng.normal(0, 1, len(df))
+        frames.append(df)
+    return frames
+
+def test_expiries_have_their_own_history(raw_frame):
+    near, far = _ticks(raw_frame, 8, seed=1), _ticks(raw_frame, 8, seed=2)
+    both, alone_near, alone_far = InstrumentHistory(), InstrumentHistory(), InstrumentHistory()
+    times = pd.date_range('2026-01-05 09:15', periods=8, freq='5min')
+    for when, a, b in zip(times, near, far):
+        both.append(pd.concat([a.assign(Expiry='2026-01-29'), b.assign(Expiry='2026-02-26')],
+                              ignore_index=True), when)
+        alone_near.append(a, when)
+        alone_far.append(b, when)
+    snap = pd.concat([near[-1].assign(Expiry='2026-01-29'), far[-1].assign(Expiry='2026-02-26')],
+                     ignore_index=True)
+    got = both.annotate(snap)
+    n = len(near[-1])
+    for c in FEATURE_COLS:
+        np.testing.assert_array_equal(got[c].to_numpy()[:n], alone_near.annotate(near[-1])[c].to_numpy())
+        np.testing.assert_array_equal(got[c].to_numpy()[n:], alone_far.annotate(far[-1])[c].to_numpy())
+    assert got['IVZScore'].notna().any()
+    assert len(both) == 2 * raw_frame['Instrument'].nunique()
+    assert len(both.series((snap['Instrument'].iloc[0], '2026-02-26'))) == 8
+
+def test_without_expiry_keys_by_instrument(raw_frame):
+    hist = InstrumentHistory()
+    for when, df in zip(pd.date_range('2026-01-05 09:15', periods=6, freq='5min'), _ticks(raw_frame, 6)):
+        hist.append(df, when)
+    feats = hist.features()
+    assert feats.index.name == 'Instrument'
+    assert (feats['HistoryLen'] == 6).all()
+    assert len(hist.series(raw_frame['Instrument'].iloc[0])) == 6
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from screener.core import screen, split_views, to_num
+from screener.incremental import IncrementalScreener
+
+def _steps(df, seed=0, count=6):
+    rng = np.random.default_rng(seed)
+    for i in range(count):
+        df = df.copy()
+        moved = rng.random(len(df)) < 0.1
+        df.loc[moved, 'FuturePrice'] *= rng.uniform(0.97, 1.03, moved.sum())
+        df.loc[moved, 'IVPercentile'] = rng.uniform(0, 100, moved.sum())
+        yield df.drop(index=rng.choice(len(df), 5, replace=False)) if i % 3 == 2 else df
+
+def _assert_same(inc, df):
+    out = screen(df)
+    views = split_views(out)
+    pd.testing.assert_frame_equal(inc.out.reset_index(drop=True), out.reset_index(drop=True))
+    for got, want in zip((inc.df_top, inc.df_all), (views[0], views[2])):
+        pd.testing.assert_frame_equal(got.reset_index(drop=True), want.reset_index(drop=True))
+    assert inc.df_top10['PotentialPoints'].tolist() == views[1]['PotentialPoints'].tolist()
+
+@pytest.mark.parametrize('expiries', [None, ['2026-01-29', '2026-02-26']])
+def test_matches_full_screen(raw_frame, expiries):
+    df = to_num(raw_frame)
+    if expiries:
+        df = pd.concat([df.assign(Expiry=e) for e in expiries], ignore_index=True)
+    inc = IncrementalScreener()
+    inc.update(df)
+    assert inc.delta is None
+    for step in _steps(df):
+        inc.update(step)
+        assert not inc.last_stats['full']
+        _assert_same(inc, step)
+
+def test_feature_changes_are_not_rescreened(raw_frame):
+    from screener.core import FEATURE_COLS
+    from screener.history import InstrumentHistory
+    df = to_num(raw_frame)
+    hist, inc = InstrumentHistory(min_periods=2), IncrementalScreener()
+    rng = np.random.default_rng(3)
+    for i, when in enumerate(pd.date_range('2026-01-05 09:15', periods=6, freq='5min')):
+        tick = df.assign(PCR=df['PCR'] * np.exp(rng.normal(0, 0.05, len(df))) if i < 3 else df['PCR'])
+        hist.append(tick, when)
+        annotated = hist.annotate(df)          # rule inputs never change, only the features
+        inc.update(annotated)
+        if i:
+            fresh, stale = inc.delta
+            assert fresh.empty and stale.empty
+            assert inc.last_stats['recomputed'] == 0
+        _assert_same(inc, annotated)
+    assert inc.out[FEATURE_COLS].notna().any().all()
@@ -0,0 +1,63 @@
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import ROOT
+from screener.core import KEEP_COLS, NUM_COLS, screen
+from screener.extract import extract_table
+from screener.ingest import (SNAPSHOT_COL, SchemaError, iter_chunks, iter_snapshots, read_snapshot,
+                             screen_stream)
+
+EXPORT = os.path.join(ROOT, 'tests', 'fixtures', 'sensibull_export.csv')
+
+def _plain(df: pd.DataFrame) -> pd.DataFrame:
+    """Text columns as object, so categoricals read in different chunks compare equal."""
+    return df.astype({c: object for c in df.columns if not pd.api.types.is_numeric_dtype(df[c])})
+
+def test_display_headers_map_onto_the_schema():
+    df = read_snapshot(EXPORT)
+    assert SNAPSHOT_COL in df.columns and set(KEEP_COLS) <= set(df.columns)
+    assert all(df[c].dtype == np.float64 for c in NUM_COLS if c in df.columns)
+    assert df['Instrument'].dtype == 'category'
+    # '-' cells and the stray 'n/a' in PCR are missing values, not parse errors
+    assert df['IVPercentile'].isna().sum() == 3
+    assert df['PCR'].isna().sum() == 3 + 1
+    assert df['Event'].notna().sum() == 3 * 2
+
+def test_page_source_round_trips_through_a_csv_export(page_source):
+    live = extract_table(page_source)
+    buf = io.StringIO(live.to_csv(index=False))
+    got = read_snapshot(buf)
+    pd.testing.assert_frame_equal(_plain(got[KEEP_COLS]), live[KEEP_COLS], check_dtype=False)
+    pd.testing.assert_frame_equal(_plain(screen(got)), screen(live), check_dtype=False)
+
+def test_missing_column_is_named():
+    with pytest.raises(SchemaError, match='MaxPain'):
+        read_snapshot(io.StringIO('Symbol,Future Price,PCR,ATM IV,IVP\nNIFTY,1,1,1,1\n'))
+
+@pytest.mark.parametrize('chunksize', [1, 5, 12, 100])
+def test_chunks_match_a_whole_file_read(chunksize):
+    whole = read_snapshot(EXPORT)
+    chunks = list(iter_chunks(EXPORT, chunksize=chunksize))
+    assert max(len(c) for c in chunks) <= chunksize
+    pd.testing.assert_frame_equal(_plain(pd.concat(chunks, ignore_index=True)), _plain(whole))
+
+@pytest.mark.parametrize('chunksize', [5, 100])
+def test_snapshots_match_a_whole_file_read(chunksize):
+    whole = _plain(read_snapshot(EXPORT))
+    groups = [g.reset_index(drop=True) for _, g in whole.groupby(SNAPSHOT_COL, sort=False)]
+    snapshots = list(iter_snapshots(EXPORT, chunksize=chunksize))
+    assert [key for key, _ in snapshots] == whole[SNAPSHOT_COL].unique().tolist()
+    for (_, got), ref in zip(snapshots, groups):
+        pd.testing.assert_frame_equal(_plain(got), ref)
+    for (_, got), ref in zip(screen_stream(EXPORT, chunksize=chunksize), groups):
+        pd.testing.assert_frame_equal(_plain(got), _plain(screen(ref)))
+
+def test_non_contiguous_snapshots_are_rejected():
+    text = open(EXPORT, encoding='utf-8').read().splitlines()
+    shuffled = '\n'.join([text[0], *text[1:3], *text[14:16], *text[3:5]]) + '\n'
+    with pytest.raises(SchemaError, match='not contiguous'):
+        list(iter_snapshots(io.StringIO(shuffled), chunksize=2))
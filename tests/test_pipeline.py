@@ -0,0 +1,102 @@
+import os
+
+from conftest import ROOT
+from screener.pipeline import LivePipeline, ReplaySource
+
+PAGE = os.path.join(ROOT, 'tests', 'fixtures', 'sensibull_page.html')
+
+class BrokenStore:
+    def write(self, out, **kwargs):
+        raise OSError("disk full")
+
+class RecordingStore:
+    def __init__(self):
+        self.writes = []
+
+    def write(self, out, **kwargs):
+        self.writes.append((out, kwargs))
+
+def test_store_failure_still_publishes():
+    seen = []
+    pipe = LivePipeline(ReplaySource([PAGE], loop=False), interval=0, store=BrokenStore(),
+                        on_publish=[seen.append])
+    pipe.start()
+    try:
+        result = pipe.wait_for(1, timeout=10)
+    finally:
+        pipe.stop()
+    assert not result.out.empty
+    assert seen == [result]
+    publish = pipe.stages['publish']
+    assert publish.count == 1
+    assert publish.errors == 1
+    assert publish.last_error == "OSError: disk full"
+
+def test_failing_callback_does_not_skip_the_rest():
+    seen = []
+    def broken(result):
+        raise ValueError("alert sink down")
+    pipe = LivePipeline(ReplaySource([PAGE], loop=False), interval=0, on_publish=[broken, seen.append])
+    pipe.start()
+    try:
+        result = pipe.wait_for(1, timeout=10)
+    finally:
+        pipe.stop()
+    assert seen == [result]
+    assert pipe.stages['publish'].last_error == "ValueError: alert sink down"
+
+def test_empty_snapshot_is_published():
+    from screener.core import to_num
+    from screener.extract import extract_table
+    from screener.ranking import TopKRanker
+    with open(PAGE, encoding='utf-8') as fh:
+        df = to_num(extract_table(fh.read()))
+    frames = [df.assign(MaxPain=float('nan')), df]     # the first snapshot yields no strategy
+    pipe = LivePipeline(ReplaySource(frames, loop=False), interval=0, queue_size=4, ranker=TopKRanker(k=3))
+    pipe.start()
+    try:
+        result = pipe.wait_for(2, timeout=10)
+    finally:
+        pipe.stop()
+    assert pipe.stages['screen'].errors == 0
+    assert not result.out.empty
+    assert not result.ranked['Category'].empty
+
+def test_set_params_is_applied_by_the_screen_stage():
+    from dataclasses import replace
+    from screener.params import DEFAULT_PARAMS
+    from screener.ranking import TopKRanker
+    pipe = LivePipeline(ReplaySource([PAGE]), interval=0.05, ranker=TopKRanker(k=3))
+    pipe.start()
+    try:
+        first = pipe.wait_for(1, timeout=10)
+        inc = pipe._inc
+        pipe.set_params(DEFAULT_PARAMS)                  # unchanged: a no-op
+        assert pipe._inc is inc
+        priced = replace(DEFAULT_PARAMS, days_to_expiry=5)
+        pipe.set_params(priced)
+        assert pipe._inc is inc                          # swapped on the screen thread, not here
+        second = pipe.wait_for(first.version + 1, timeout=10)
+    finally:
+        pipe.stop()
+    assert 'NetPremium' not in first.out.columns
+    assert 'NetPremium' in second.out.columns
+    assert pipe._inc.params == priced and pipe.ranker.params == priced
+    assert pipe.stages['screen'].errors == 0
+
+def test_store_gets_the_whole_snapshot():
+    from screener.core import to_num
+    from screener.extract import extract_table
+    with open(PAGE, encoding='utf-8') as fh:
+        df = to_num(extract_table(fh.read()))
+    frames = [df.assign(MaxPain=float('nan')), df]     # the first snapshot yields no strategy
+    store = RecordingStore()
+    pipe = LivePipeline(ReplaySource(frames, loop=False), interval=0, queue_size=4, store=store)
+    pipe.start()
+    try:
+        pipe.wait_for(2, timeout=10)
+    finally:
+        pipe.stop()
+    assert [len(kwargs['snapshot']) for _, kwargs in store.writes] == [len(df), len(df)]
+    assert store.writes[0][0].empty
+    assert store.writes[0][1]['digest'] != store.writes[1][1]['digest']
@@ -0,0 +1,81 @@
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('scipy')
+
+from screener.core import screen, to_num
+from screener.params import DEFAULT_PARAMS
+from screener.pricing import _payoff, apply_pricing, black76, expiry_days, price_strategies, strategy_legs
+
+RNG = np.random.default_rng(11)
+FUT = RNG.uniform(100, 50000, 400)
+STRIKE = FUT * RNG.uniform(0.8, 1.2, 400)
+VOL = RNG.uniform(0.08, 0.8, 400)
+T = RNG.uniform(1, 90, 400) / 365.0
+
+@pytest.mark.parametrize('rate', [0.0, 0.07])
+def test_put_call_parity(rate):
+    call = black76(FUT, STRIKE, VOL, T, True, rate)['price']
+    put = black76(FUT, STRIKE, VOL, T, False, rate)['price']
+    np.testing.assert_allclose((call - put) / FUT, np.exp(-rate * T) * (1 - STRIKE / FUT), atol=1e-12)
+
+@pytest.mark.parametrize('is_call', [True, False])
+def test_greeks_match_finite_differences(is_call):
+    g = black76(FUT, STRIKE, VOL, T, is_call, 0.05)
+    h = FUT * 1e-4
+    up = black76(FUT + h, STRIKE, VOL, T, is_call, 0.05)['price']
+    down = black76(FUT - h, STRIKE, VOL, T, is_call, 0.05)['price']
+    np.testing.assert_allclose(g['delta'], (up - down) / (2 * h), rtol=1e-4, atol=1e-6)
+    np.testing.assert_allclose(g['gamma'], (up - 2 * g['price'] + down) / h ** 2, rtol=1e-3, atol=1e-9)
+    dv = 1e-4
+    vega = (black76(FUT, STRIKE, VOL + dv, T, is_call, 0.05)['price']
+            - black76(FUT, STRIKE, VOL - dv, T, is_call, 0.05)['price']) / (2 * dv) / 100.0
+    np.testing.assert_allclose(g['vega'], vega, rtol=1e-3, atol=1e-9)
+
+@pytest.fixture
+def screened(raw_frame):
+    return screen(to_num(raw_frame))
+
+def test_max_loss_matches_payoff_grid(screened):
+    p = replace(DEFAULT_PARAMS, days_to_expiry=10)
+    priced = price_strategies(screened, p)
+    strike, is_call, qty = strategy_legs(screened, p)
+    net = priced['NetPremium'].to_numpy()
+    fut = screened['FuturePrice'].to_numpy(dtype=float)
+    grid = np.linspace(0.0, 3.0, 3001)[None, :] * fut[:, None]
+    pnl = _payoff(grid, strike, is_call, qty, net)
+    ok = np.isfinite(net)
+    loss, profit = priced['MaxLoss'].to_numpy(), priced['MaxProfit'].to_numpy()
+    bounded = ok & np.isfinite(loss)
+    # the strikes all lie inside the grid, so its extremes are exact up to float error
+    np.testing.assert_allclose(loss[bounded], -pnl[bounded].min(axis=1), rtol=1e-9, atol=1e-6)
+    capped = ok & np.isfinite(profit)
+    np.testing.assert_allclose(profit[capped], pnl[capped].max(axis=1), rtol=1e-9, atol=1e-6)
+
+def test_straddles_keep_potential(screened):
+    straddles = screened.assign(Strategy='Long Straddle')
+    priced = apply_pricing(straddles, replace(DEFAULT_PARAMS, days_to_expiry=10))
+    ok = priced['NetPremium'].notna()
+    assert (priced.loc[ok, 'PotentialPoints'] > 0).mean() > 0.95
+
+def test_expiry_column_sets_time_per_row(screened):
+    now = pd.Timestamp('2026-01-05 09:15')
+    rows = pd.concat([screened.assign(Expiry='2026-01-08'), screened.assign(Expiry='2026-02-26'),
+                      screened.assign(Expiry='2025-12-25'), screened.assign(Expiry='n/a')],
+                     ignore_index=True)
+    p = replace(DEFAULT_PARAMS, days_to_expiry=7)
+    days = expiry_days(rows, p, now)
+    n = len(screened)
+    np.testing.assert_allclose(days[:n], 3 + (15.5 - 9.25) / 24)
+    np.testing.assert_allclose(days[n:2 * n], 52 + (15.5 - 9.25) / 24)
+    assert np.isnan(days[2 * n:3 * n]).all()            # expired: not priced
+    assert (days[3 * n:] == 7).all()                    # unparseable: p.days_to_expiry
+    priced = price_strategies(rows, p, now=now)
+    for block, d in ((slice(0, n), days[0]), (slice(n, 2 * n), days[n])):
+        alone = price_strategies(screened, p, days_to_expiry=d)
+        np.testing.assert_allclose(priced['NetPremium'].to_numpy()[block], alone['NetPremium'].to_numpy())
+    assert priced['NetPremium'].iloc[2 * n:3 * n].isna().all()
+    assert apply_pricing(rows, p, now=now)['PotentialPoints'].notna().all()
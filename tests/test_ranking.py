@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from screener.core import to_num
+from screener.incremental import IncrementalScreener
+from screener.ranking import TopKRanker, composite_score, index_group, row_keys
+
+def _reference(out, k):
+    """Every board sorted from scratch: Score descending, then key ascending."""
+    keys = row_keys(out)
+    ref = pd.DataFrame({'Instrument': keys.get_level_values(0), 'Expiry': keys.get_level_values(1),
+                        'Score': composite_score(out), 'Category': out['Category'].astype(str).to_numpy(),
+                        'Group': index_group(keys.get_level_values(0))})
+    ref = ref.sort_values(['Score', 'Instrument', 'Expiry'], ascending=[False, True, True])
+    boards = {}
+    for kind in ('Category', 'Group'):
+        for value, part in ref.groupby(kind, sort=False):
+            boards[(kind, value)] = list(zip(part['Instrument'], part['Expiry']))[:k]
+    return boards
+
+def _boards(ranker):
+    got = {}
+    for kind, value in ranker.boards:
+        top = ranker.top(kind, value)
+        if len(top):
+            expiry = top['Expiry'].astype(str) if 'Expiry' in top else ['0'] * len(top)
+            got[(kind, value)] = list(zip(top['Instrument'].astype(str), expiry))
+    return got
+
+@pytest.mark.parametrize('expiries', [None, ['2026-01-29', '2026-02-26']])
+def test_incremental_matches_full_sort(raw_frame, expiries):
+    rng = np.random.default_rng(1)
+    df = to_num(raw_frame)
+    if expiries:
+        df = pd.concat([df.assign(Expiry=e) for e in expiries], ignore_index=True)
+    inc, ranker = IncrementalScreener(), TopKRanker(k=5)
+    for step in range(8):
+        df = df.copy()
+        moved = rng.random(len(df)) < 0.05
+        df.loc[moved, 'FuturePrice'] *= rng.uniform(0.97, 1.03, moved.sum())
+        df.loc[moved, 'IVPercentile'] = rng.uniform(0, 100, moved.sum())
+        snap = df.drop(index=rng.choice(len(df), 10, replace=False)) if step % 3 == 2 else df
+        inc.update(snap)
+        ranker.update(inc.out, inc.delta)
+        assert ranker.last_stats['full'] == (step == 0)
+        assert _boards(ranker) == _reference(inc.out, 5)
+        assert ranker.last_stats['rows'] == len(inc.out)
+
+def test_leaderboard_columns(raw_frame):
+    from screener.core import screen
+    ranker = TopKRanker(k=3).update(screen(to_num(raw_frame)))
+    board = ranker.leaderboard('Group')
+    assert list(board.columns[:3]) == ['Board', 'Rank', 'Score']
+    assert board.groupby('Board')['Score'].apply(lambda s: s.is_monotonic_decreasing).all()
+
+def test_empty_snapshot_clears_boards(raw_frame):
+    from screener.core import screen
+    df = to_num(raw_frame)
+    empty = screen(df.assign(MaxPain=np.nan))      # no row yields a strategy: only the strategy columns
+    assert empty.empty and 'FuturePrice' not in empty.columns
+    ranker = TopKRanker(k=3).update(empty)
+    assert ranker.leaderboard('Category').empty
+    inc = IncrementalScreener()
+    inc.update(df)
+    ranker.update(inc.out, inc.delta)
+    assert ranker.boards
+    ranker.update(empty)
+    assert ranker.leaderboard('Category').empty
+    assert ranker.last_stats['rows'] == 0
+    inc.update(df.assign(PCR=df['PCR'] * 1.01))      # recovers on the next snapshot
+    ranker.update(inc.out, inc.delta)
+    assert _boards(ranker) == _reference(inc.out, 3)
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from dataclasses import replace
+
+from screener.core import FEATURE_COLS, PRICING_COLS, screen, to_num
+from screener.history import InstrumentHistory
+from screener.params import DEFAULT_PARAMS
+from screener.store import SnapshotStore
+
+def _mixed_day(store, raw_frame):
+    df = to_num(raw_frame)
+    plain = screen(df)
+    hist = InstrumentHistory()
+    hist.append(df, pd.Timestamp('2026-01-05 09:15'))
+    featured = screen(hist.annotate(df))
+    priced = screen(df, replace(DEFAULT_PARAMS, days_to_expiry=5))
+    for i, out in enumerate([plain, featured, priced]):
+        store.write(out, when=pd.Timestamp('2026-01-05 09:15') + pd.Timedelta(minutes=5 * i))
+    return plain, featured, priced
+
+def test_read_unions_schemas(tmp_path, raw_frame):
+    store = SnapshotStore(str(tmp_path))
+    plain, featured, priced = _mixed_day(store, raw_frame)
+    df = store.read()
+    for c in PRICING_COLS + FEATURE_COLS:
+        assert c in df.columns
+    assert len(df) == len(plain) + len(featured) + len(priced)
+    last = df[df['SnapshotTime'] == df['SnapshotTime'].max()]
+    assert last['Delta'].notna().any()
+    assert df[df['SnapshotTime'] == df['SnapshotTime'].min()]['Delta'].isna().all()
+
+def test_compact_keeps_every_column(tmp_path, raw_frame):
+    store = SnapshotStore(str(tmp_path))
+    _mixed_day(store, raw_frame)
+    before = store.read()
+    store.compact('2026-01-05')
+    after = store.read()
+    assert len(list((tmp_path / 'date=2026-01-05').glob('*.parquet'))) == 1
+    assert sorted(after.columns) == sorted(before.columns)
+    key = ['SnapshotTime', 'Instrument']
+    a = before.sort_values(key).reset_index(drop=True)
+    b = after[before.columns].sort_values(key).reset_index(drop=True)
+    for c in PRICING_COLS + FEATURE_COLS:
+        np.testing.assert_array_equal(a[c].to_numpy(dtype=float), b[c].to_numpy(dtype=float))
+
+def test_expiry_is_stored(tmp_path, raw_frame):
+    store = SnapshotStore(str(tmp_path))
+    df = to_num(raw_frame)
+    both = pd.concat([df.assign(Expiry='2026-01-29'), df.assign(Expiry='2026-02-26')], ignore_index=True)
+    out = screen(both)
+    store.write(out, when=pd.Timestamp('2026-01-05 09:15'))
+    back = store.read()
+    assert back.groupby(['Instrument', 'Expiry'], observed=True).size().max() == 1
+    assert len(back) == len(out)
+
+def test_snapshot_keeps_instruments_without_a_strategy(tmp_path, raw_frame):
+    store = SnapshotStore(str(tmp_path))
+    df = to_num(raw_frame)
+    df.loc[:9, 'MaxPain'] = np.nan                    # these rows produce no strategy
+    times = pd.date_range('2026-01-05 09:15', periods=3, freq='5min')
+    out = screen(df)
+    for when in times:
+        store.write(out, when=when, snapshot=df)
+    back = store.read()
+    assert len(back) == 3 * len(df)
+    gaps = back[back['Strategy'].isna()]
+    assert len(gaps) == 3 * (len(df) - len(out)) and gaps['Entry'].isna().all()
+    assert set(df['Instrument'][:10]) <= set(gaps['Instrument'])
+    replayed = InstrumentHistory().replay(back)
+    assert len(replayed) == df['Instrument'].nunique()
+    assert len(replayed.series(df['Instrument'].iloc[0])) == 3
+
+def test_empty_screen_still_stores_the_snapshot(tmp_path, raw_frame):
+    store = SnapshotStore(str(tmp_path))
+    df = to_num(raw_frame).assign(MaxPain=np.nan)
+    store.write(screen(df), when=pd.Timestamp('2026-01-05 09:15'), snapshot=df)
+    back = store.read()
+    assert len(back) == len(df) and back['Strategy'].isna().all()
+
+def test_params_are_part_of_the_digest(tmp_path, raw_frame):
+    from screener.cache import bytes_digest, params_digest
+    store = SnapshotStore(str(tmp_path))
+    df = to_num(raw_frame)
+    key = bytes_digest(raw_frame.to_csv().encode())
+    priced = replace(DEFAULT_PARAMS, days_to_expiry=5)
+    when = pd.Timestamp('2026-01-05 09:15')
+    assert store.write(screen(df), when=when, digest=params_digest(key, DEFAULT_PARAMS)) is not None
+    assert store.write(screen(df), when=when, digest=params_digest(key, DEFAULT_PARAMS)) is None
+    assert store.write(screen(df, priced), when=when + pd.Timedelta(minutes=1),
+                      digest=params_digest(key, priced)) is not None
+    assert 'Delta' in store.read().columns
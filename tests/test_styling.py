@@ -0,0 +1,17 @@
+import pandas as pd
+
+from screener.styling import CATEGORY_COLORS, row_colors, style_frame
+
+def test_row_colors_accept_categorical():
+    cat = pd.Series(['CALL', 'PUT', None, 'OTHER', 'SHORTVOL'], dtype='category')
+    df = pd.DataFrame({'Category': cat, 'Entry': [1.0, 2.0, 3.0, 4.0, 5.0]})
+    colors = row_colors(df)
+    assert colors.tolist() == [CATEGORY_COLORS['CALL'], CATEGORY_COLORS['PUT'], '', '',
+                               CATEGORY_COLORS['SHORTVOL']]
+    assert row_colors(df.astype({'Category': object})).tolist() == colors.tolist()
+    assert CATEGORY_COLORS['CALL'] in style_frame(df).to_html()
+
+def test_row_colors_categorical_with_only_known_categories():
+    # every category maps to a distinct colour, so map() keeps the categorical dtype
+    df = pd.DataFrame({'Category': pd.Series(['CALL', None, 'PUT'], dtype='category')})
+    assert row_colors(df).tolist() == [CATEGORY_COLORS['CALL'], '', CATEGORY_COLORS['PUT']]
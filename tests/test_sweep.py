@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from screener.core import screen, to_num
+from screener.engine import LEAF_STRATEGY, generate_strategies_vec
+from screener.sweep import param_grid, sweep
+from synthetic import synthetic_frame
+
+GRID = {'ivp_high': [40, 60], 'iv_high': [20, 30], 'stop_frac': [0.3, 0.5],
+        'neutral_base_pct': [0.01, 0.03], 'straddle_min_pct': [0.0, 0.02],
+        'debit_mult': [0.5, 0.8], 'rr_risk_frac': [0.0, 0.5]}
+
+@pytest.fixture(scope='module')
+def numeric():
+    return to_num(synthetic_frame(300, seed=3))
+
+def test_matches_generate_strategies_for_every_grid_point(numeric):
+    grid = param_grid(GRID)
+    # a small LRU forces the per-row arrays to be rebuilt part-way through
+    got = sweep(numeric, grid, cache_size=2)
+    assert len(got) == len(grid) == 2 ** len(GRID)
+    for row, p in zip(got.to_dict('records'), grid):
+        table = generate_strategies_vec(numeric, p)
+        assert row['Strategies'] == len(table)
+        counts = table['Strategy'].value_counts()
+        assert [row[name] for name in LEAF_STRATEGY] == [int(counts.get(name, 0)) for name in LEAF_STRATEGY]
+        # sweep aggregates before the per-row 2-decimal rounding
+        assert row['MeanRiskReward'] == pytest.approx(table['RiskReward'].mean(), abs=0.005)
+        assert row['MeanPotentialPoints'] == pytest.approx(table['PotentialPoints'].mean(), abs=0.005)
+
+def test_matches_screen(numeric):
+    for p in param_grid({'ivp_high': [40, 60], 'straddle_min_pct': [0.0, 0.02]}):
+        out = screen(numeric, p)
+        row = sweep(numeric, [p]).iloc[0]
+        assert row['Strategies'] == len(out)
+        assert row['TotalPotentialPoints'] == pytest.approx(out['PotentialPoints'].sum(), abs=0.005 * len(out))
+        assert np.isfinite(row['MeanRiskReward'])